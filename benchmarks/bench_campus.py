@@ -0,0 +1,56 @@
+"""Custom campus index build, cached load and record marking throughput"""
+import argparse
+import csv
+import os
+import tempfile
+import time
+
+from mailprep.campus import CampusIndex
+from mailprep.text_input import read_text_rows
+
+STREETS = ['University Ave', 'N. Park Street', 'Linden Dr', 'Observatory Drive', 'W Dayton St']
+
+
+def write_campus_file(path, entry_count):
+    """Campus entries, every tenth with a name as well as an address"""
+    with open(path, 'w', newline='', encoding='utf-8') as campus_file:
+        writer = csv.writer(campus_file)
+        writer.writerow(['Name', 'Address1', 'Mail Code'])
+        for entry in range(entry_count):
+            name = f'Person {entry}' if entry % 10 == 0 else ''
+            writer.writerow([name, f'{entry} {STREETS[entry % len(STREETS)]}', f'MC{entry % 997}'])
+
+
+def main():
+    """Times building and loading the index of a campus file and marking synthetic records"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--entries', type=int, default=100000, help='Campus file entries')
+    parser.add_argument('--records', type=int, default=1000000, help='Records marked')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'campus.csv')
+        write_campus_file(path, args.entries)
+
+        start = time.perf_counter()
+        index = CampusIndex.load(path, read_text_rows)
+        print(f'build index  {time.perf_counter() - start:8.3f} s  {len(index):,} entries')
+        start = time.perf_counter()
+        index = CampusIndex.load(path, read_text_rows)
+        print(f'cached load  {time.perf_counter() - start:8.3f} s')
+
+        # Half of the addresses are on campus, spelled differently than in the campus file
+        addresses = [
+            f'{record % (args.entries * 2)} {STREETS[record % len(STREETS)].upper()}'
+            for record in range(args.records)]
+        names = [f'Person {record}' for record in range(args.records)]
+        start = time.perf_counter()
+        marks = index.mark_values(addresses, names)
+        seconds = time.perf_counter() - start
+        marked = sum(1 for mark in marks if mark)
+        print(f'mark records {seconds:8.3f} s  {args.records / seconds:12,.0f} records/s  '
+              f'{marked:,} marked')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+"""Micro-benchmark of CaseInsensitiveDict operations against the original implementation"""
+import argparse
+import collections.abc
+import timeit
+import unicodedata
+
+from utils.mapping import CaseInsensitiveDict
+
+
+class OriginalCaseInsensitiveDict(collections.abc.MutableMapping):
+    """Original implementation normalizing every key on every operation"""
+
+    def __init__(self, *args, **kwargs):
+        self.store = dict()
+        self.update(*args, **kwargs)
+
+    def __getitem__(self, key):
+        return self.store[self.keytransform(key)]
+
+    def __setitem__(self, key, value):
+        if isinstance(value, dict):
+            self.store[self.keytransform(key)] = OriginalCaseInsensitiveDict(value)
+        else:
+            self.store[self.keytransform(key)] = value
+
+    def __delitem__(self, key):
+        del self.store[self.keytransform(key)]
+
+    def __iter__(self):
+        return iter(self.store)
+
+    def __len__(self):
+        return len(self.store)
+
+    def keytransform(self, key):
+        if isinstance(key, str):
+            return ' '.join(unicodedata.normalize("NFKD", key.casefold()).strip().split())
+        return key
+
+
+KEYS = ['Customer', 'Department', 'Use Custom Campus', 'Custom Campus Path', 'Properties']
+
+
+def main():
+    """Times lookups, membership checks and sets for both implementations"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--number', type=int, default=1000000, help='Operations per measurement')
+    args = parser.parse_args()
+
+    for dict_class in (OriginalCaseInsensitiveDict, CaseInsensitiveDict):
+        test_dict = dict_class({key: index for index, key in enumerate(KEYS)})
+        # Cycle through keys with different casing as the property editor would use them
+        keys = [key.upper() if index % 2 else key for index, key in enumerate(KEYS * 20)]
+        key_count = len(keys)
+        loops = max(1, args.number // key_count)
+        operations = {
+            'get': lambda: [test_dict[key] for key in keys],
+            'in': lambda: [key in test_dict for key in keys],
+            'set': lambda: [test_dict.__setitem__(key, 0) for key in keys],
+        }
+        for name, operation in operations.items():
+            seconds = timeit.timeit(operation, number=loops)
+            print(f'{dict_class.__name__:<28} {name:<4} {loops * key_count:>9,} ops  {seconds:6.3f} s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+"""Benchmark of default header mapping inference against the original per-mapper implementation"""
+import argparse
+import collections
+import timeit
+
+from mailprep.merge import (
+    create_map_dict, field_mapping_blacklist, field_mapping_definitions, _wrap_in_braces)
+
+
+def sequential_create_map_dict(headers):
+    """Original implementation running every FieldMapper over the shrinking unhandled headers"""
+    unhandled_headers = [header for header in headers if header not in field_mapping_blacklist]
+    mapped_fields = collections.OrderedDict()
+    for field_mapper in field_mapping_definitions:
+        map_fields = [
+            header for header in unhandled_headers
+            if field_mapper.is_match(header)
+        ]
+        map_fields.sort()
+        if map_fields:
+            mapped_fields[field_mapper.output_field_name] = field_mapper.get_mapping_string(map_fields)
+        unhandled_headers = [header for header in unhandled_headers if header not in map_fields]
+    for field in unhandled_headers:
+        mapped_fields[field] = _wrap_in_braces(field)
+    return mapped_fields
+
+
+def synthetic_headers(column_count):
+    """Vendor style header row with the usual address columns followed by many extra columns"""
+    headers = [
+        'index', 'mr', 'ID1', 'ID2', 'name1', 'name9', 'Title', 'title2', 'Firm', 'company',
+        'Line1', 'Line2', 'City', 'State', 'Zip', 'list_id',
+    ]
+    headers.extend(f'extra_field_{i}' for i in range(column_count - len(headers)))
+    return headers
+
+
+def main():
+    """Times both implementations over synthetic header rows of increasing width"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--repeat', type=int, default=20, help='Calls timed per header width')
+    args = parser.parse_args()
+
+    for column_count in (20, 200, 2000):
+        headers = synthetic_headers(column_count)
+        assert sequential_create_map_dict(headers) == create_map_dict(headers)
+        for name, func in (('sequential', sequential_create_map_dict), ('classifier', create_map_dict)):
+            seconds = min(timeit.repeat(lambda: func(headers), number=args.repeat, repeat=3))
+            per_call_ms = seconds / args.repeat * 1000
+            print(f'{column_count:>6} columns  {name:<12} {per_call_ms:10.3f} ms/call')
+
+
+if __name__ == '__main__':
+    main()
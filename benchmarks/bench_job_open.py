@@ -0,0 +1,52 @@
+"""Benchmark of opening a large job definition file with and without its settings cache"""
+import argparse
+import json
+import os
+import tempfile
+import timeit
+
+from mailprepgui.model.settings.job_settings import JobSettings, job_cache_path
+
+
+def create_job_contents(file_count):
+    """Returns job file contents with per-file mappings and processing history"""
+    return {
+        'Properties': {'Customer': 'Customer', 'Department': 'Department'},
+        'Files': {
+            f'Input {index}.xlsx': {
+                'Selected': True,
+                'Type': 'Normal',
+                'List ID': f'UW#{index:03}',
+                'Mapping': {f'Field {field}': f'{{Column {field}}}' for field in range(20)},
+                'History': [{'Run': run, 'Records': 1000 + run} for run in range(5)],
+            }
+            for index in range(file_count)
+        },
+    }
+
+
+def main():
+    """Times cold opens (parsing the JSON) against warm opens (loading the cache)"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--files', type=int, default=2000, help='Input files defined in the job')
+    parser.add_argument('--number', type=int, default=10, help='Opens per measurement')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        job_file_path = os.path.join(directory, 'job.mpjob')
+        with open(job_file_path, 'w') as job_file:
+            json.dump(create_job_contents(args.files), job_file)
+        print(f'Job file: {os.path.getsize(job_file_path):,} bytes, {args.files:,} input files')
+
+        cold = timeit.timeit(
+            lambda: JobSettings.from_path(job_file_path, use_cache=False), number=args.number)
+        JobSettings.from_path(job_file_path)
+        print(f'Cache file: {os.path.getsize(job_cache_path(job_file_path)):,} bytes')
+        warm = timeit.timeit(lambda: JobSettings.from_path(job_file_path), number=args.number)
+
+    print(f'cold open {cold / args.number * 1000:8.2f} ms')
+    print(f'warm open {warm / args.number * 1000:8.2f} ms  ({cold / warm:.1f}x)')
+
+
+if __name__ == '__main__':
+    main()
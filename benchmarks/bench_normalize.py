@@ -0,0 +1,67 @@
+"""Per million field cost of bulk text normalization against a chain of calls per field"""
+import argparse
+import time
+import unicodedata
+
+from mailprep.normalize import upper_case_normalizer, usps_normalizer
+from mailprep.record_store import BLOCK_ROWS
+from utils.mapping import KEY_NORMAL_FORM
+
+STREETS = ['N. Park  Street', 'University Ave.', 'O’Neil St, Apt #4', ' Linden Dr ', 'W Dayton St']
+ACCENTED = ['Zoë', 'Café Straße', 'Ørsted  Hall', 'José  Núñez']
+
+
+def synthetic_fields(field_count, accented_percent):
+    """Address-like values, accented_percent of them with non-ASCII letters"""
+    accented_every = int(100 / accented_percent) if accented_percent else 0
+    return [
+        f'{ACCENTED[index % len(ACCENTED)]} {index}'
+        if accented_every and index % accented_every == 0
+        else f'{index} {STREETS[index % len(STREETS)]}'
+        for index in range(field_count)
+    ]
+
+
+def normalize_per_field(values):
+    """The same normalization done per field with a chain of calls"""
+    table = usps_normalizer.table
+    return [
+        ' '.join(unicodedata.normalize(KEY_NORMAL_FORM, value).translate(table).upper().split())
+        for value in values
+    ]
+
+
+def upper_per_field(values):
+    return [value.upper().strip() for value in values]
+
+
+def seconds_per_million(function, values):
+    start = time.perf_counter()
+    results = []
+    for block_start in range(0, len(values), BLOCK_ROWS):
+        results.extend(function(values[block_start:block_start + BLOCK_ROWS]))
+    return (time.perf_counter() - start) * 1e6 / len(values), results
+
+
+def main():
+    """Times normalizing record store sized column blocks of synthetic fields"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--fields', type=int, default=1000000, help='Fields normalized')
+    args = parser.parse_args()
+
+    for accented_percent in (0, 5, 100):
+        values = synthetic_fields(args.fields, accented_percent)
+        batch_seconds, batch_results = seconds_per_million(usps_normalizer.normalize_values, values)
+        field_seconds, field_results = seconds_per_million(normalize_per_field, values)
+        assert batch_results == field_results, 'Normalized values differ'
+        print(f'{accented_percent:3}% accented  normalize: batch {batch_seconds:6.3f} s  '
+              f'per field {field_seconds:6.3f} s  (per million fields)')
+    values = synthetic_fields(args.fields, 5)
+    batch_seconds, _ = seconds_per_million(upper_case_normalizer.normalize_values, values)
+    field_seconds, _ = seconds_per_million(upper_per_field, values)
+    print(f'  5% accented  upper:     batch {batch_seconds:6.3f} s  '
+          f'.upper().strip() {field_seconds:6.3f} s  (per million fields)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+"""Passes over merged records in a record store against re-reading and re-merging the source"""
+import argparse
+import os
+import tempfile
+import time
+
+from bench_text_input import write_delimited
+from mailprep.merge import RecordMerger, create_map_dict
+from mailprep.record_store import RecordStore, RecordStoreWriter
+from mailprep.text_input import read_text_rows
+
+
+def merged_records(path):
+    headers, rows = read_text_rows(path)
+    mappings = create_map_dict(headers)
+    return list(mappings), RecordMerger(mappings).merge(rows, headers)
+
+
+def timed(name, function, passes, row_count):
+    start = time.perf_counter()
+    for _ in range(passes):
+        function()
+    seconds = (time.perf_counter() - start) / passes
+    print(f'{name:<30} {seconds:8.2f} s/pass  {row_count / seconds:12,.0f} records/s')
+
+
+def main():
+    """Times a pass over every record, and over a single field, from CSV and from the store"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=1000000, help='Rows in the source CSV file')
+    parser.add_argument('--passes', type=int, default=3, help='Passes timed of each kind')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        csv_path = os.path.join(directory, 'list.csv')
+        store_path = os.path.join(directory, 'records.mprs')
+        write_delimited(csv_path, args.rows, ',')
+
+        start = time.perf_counter()
+        fields, records = merged_records(csv_path)
+        with RecordStoreWriter(store_path, fields) as writer:
+            writer.write_rows(records)
+        print(f'Merged and stored {writer.row_count:,} records in '
+              f'{time.perf_counter() - start:.2f} s, {os.path.getsize(store_path) / 1e6:.1f} MB '
+              f'(CSV {os.path.getsize(csv_path) / 1e6:.1f} MB, fields {", ".join(fields)})')
+
+        def rescan_csv():
+            for _ in merged_records(csv_path)[1]:
+                pass
+
+        with RecordStore(store_path) as store:
+            def scan_store():
+                for _ in store.rows():
+                    pass
+
+            def scan_field():
+                for _ in store.column(fields[0]):
+                    pass
+
+            def upper_case():
+                store.map_columns(
+                    f'{store_path}.upper',
+                    {field: lambda values: [value.upper() for value in values] for field in fields})
+
+            timed('re-read and merge CSV', rescan_csv, args.passes, args.rows)
+            timed('scan store records', scan_store, args.passes, args.rows)
+            timed(f'scan store field {fields[0]!r}', scan_field, args.passes, args.rows)
+            timed('upper case pass (rewrite)', upper_case, args.passes, args.rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+"""Throughput of the chunked CSV, TSV and fixed-width readers next to the .xlsx row reader"""
+import argparse
+import csv
+import itertools
+import os
+import tempfile
+import time
+
+from bench_xlsx_reader import CITIES, HEADERS, write_workbook
+from mailprep.merge import RecordMerger, create_map_dict
+from mailprep.spreadsheet import read_xlsx_rows
+from mailprep.text_input import detect_format, read_text_batches
+
+# Widths of the fixed-width columns, in the order of HEADERS
+FIXED_WIDTHS = [8, 8, 14, 14, 20, 10, 12, 6, 6]
+
+
+def synthetic_rows(row_count):
+    """The same records as bench_xlsx_reader.write_workbook writes"""
+    for record in range(1, row_count + 1):
+        yield (
+            str(record), str(100000 + record), f'First{record}', f'Last{record}',
+            f'{record} Main St', '', CITIES[record % len(CITIES)], 'WI', str(53700 + record % 100),
+        )
+
+
+def write_delimited(path, row_count, delimiter):
+    with open(path, 'w', newline='', encoding='utf-8') as text_file:
+        writer = csv.writer(text_file, delimiter=delimiter)
+        writer.writerow(HEADERS)
+        writer.writerows(synthetic_rows(row_count))
+
+
+def write_fixed_width(path, row_count):
+    line_format = ''.join(f'{{:<{width}}}' for width in FIXED_WIDTHS) + '\n'
+    with open(path, 'w', encoding='utf-8') as text_file:
+        text_file.write(line_format.format(*HEADERS))
+        for row in synthetic_rows(row_count):
+            text_file.write(line_format.format(*row))
+
+
+def read_batches(path, batch_size):
+    if path.endswith('.xlsx'):
+        headers, rows = read_xlsx_rows(path)
+        return headers, iter(lambda: list(itertools.islice(rows, batch_size)), [])
+    return read_text_batches(path, batch_size)
+
+
+def main():
+    """Times reading each format in batches, and reading plus merging the batches"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=1000000, help='Data rows in each file')
+    parser.add_argument('--batch-size', type=int, default=10000, help='Rows per text batch')
+    parser.add_argument('--skip-xlsx', action='store_true', help='Leave out the .xlsx reader')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        paths = {
+            'csv': os.path.join(directory, 'list.csv'),
+            'tsv': os.path.join(directory, 'list.tsv'),
+            'fixed-width': os.path.join(directory, 'list.prn'),
+        }
+        write_delimited(paths['csv'], args.rows, ',')
+        write_delimited(paths['tsv'], args.rows, '\t')
+        write_fixed_width(paths['fixed-width'], args.rows)
+        if not args.skip_xlsx:
+            paths['xlsx'] = os.path.join(directory, 'list.xlsx')
+            write_workbook(paths['xlsx'], args.rows)
+
+        start = time.perf_counter()
+        detect_format(paths['csv'])
+        print(f'detect format {(time.perf_counter() - start) * 1000:.1f} ms, '
+              f'batch size {args.batch_size:,}')
+        for name, path in paths.items():
+            start = time.perf_counter()
+            headers, batches = read_batches(path, args.batch_size)
+            row_count = sum(len(batch) for batch in batches)
+            read_seconds = time.perf_counter() - start
+
+            start = time.perf_counter()
+            headers, batches = read_batches(path, args.batch_size)
+            merger = RecordMerger(create_map_dict(headers))
+            record_count = sum(len(list(merger.merge(batch, headers))) for batch in batches)
+            merge_seconds = time.perf_counter() - start
+            assert row_count == record_count == args.rows, 'Rows were lost'
+            print(f'{name:<12} {os.path.getsize(path) / 1e6:6.1f} MB  '
+                  f'read {row_count / read_seconds:10,.0f} rows/s  '
+                  f'read+merge {record_count / merge_seconds:10,.0f} rows/s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,127 @@
+"""Throughput and memory benchmark of the streaming .xlsx row reader on a synthetic workbook"""
+import argparse
+import gc
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+import zipfile
+
+from mailprep.batch import GC_THRESHOLDS
+from mailprep.merge import RecordMerger, create_map_dict
+from mailprep.spreadsheet import read_header, read_xlsx_rows
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+
+MAIN_NAMESPACE = 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'
+HEADERS = ['index', 'ID1', 'name1', 'name2', 'Address1', 'Address2', 'City', 'State', 'Zip']
+TYPE_ATTRIBUTES = {'s': ' t="s"', 'n': ''}
+CITIES = ['Madison', 'Verona', 'Middleton', 'Sun Prairie', 'Fitchburg', 'Monona']
+
+
+def column_letters(column_index):
+    letters = ''
+    column_index += 1
+    while column_index:
+        column_index, remainder = divmod(column_index - 1, 26)
+        letters = chr(65 + remainder) + letters
+    return letters
+
+
+def write_workbook(path, row_count):
+    """Writes a workbook with row_count rows, streaming the sheet XML into the archive
+
+    Names and addresses are unique shared strings, cities and states are repeated shared strings
+    and index, ID and zip are numbers, as in a typical exported mailing list.
+    """
+    shared_strings = {}
+
+    def shared(value):
+        return shared_strings.setdefault(value, len(shared_strings))
+
+    letters = [column_letters(column_index) for column_index in range(len(HEADERS))]
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as archive:
+        with archive.open('xl/worksheets/sheet1.xml', 'w', force_zip64=True) as sheet_file:
+            sheet_file.write(f'<worksheet xmlns="{MAIN_NAMESPACE}"><sheetData>'.encode())
+            for row_number in range(1, row_count + 2):
+                if row_number == 1:
+                    cells = [('s', shared(header)) for header in HEADERS]
+                else:
+                    record = row_number - 1
+                    cells = [
+                        ('n', record), ('n', 100000 + record), ('s', shared(f'First{record}')),
+                        ('s', shared(f'Last{record}')), ('s', shared(f'{record} Main St')), None,
+                        ('s', shared(CITIES[record % len(CITIES)])), ('s', shared('WI')),
+                        ('n', 53700 + record % 100),
+                    ]
+                row = ''.join(
+                    f'<c r="{letters[column_index]}{row_number}"{TYPE_ATTRIBUTES[cell[0]]}>'
+                    f'<v>{cell[1]}</v></c>'
+                    for column_index, cell in enumerate(cells) if cell is not None)
+                sheet_file.write(f'<row r="{row_number}">{row}</row>'.encode())
+            sheet_file.write(b'</sheetData></worksheet>')
+        with archive.open('xl/sharedStrings.xml', 'w', force_zip64=True) as strings_file:
+            strings_file.write(f'<sst xmlns="{MAIN_NAMESPACE}">'.encode())
+            for value in shared_strings:
+                strings_file.write(f'<si><t>{value}</t></si>'.encode())
+            strings_file.write(b'</sst>')
+
+
+def max_rss_mb():
+    """Peak resident memory of this process in MB, if the platform reports it"""
+    if resource is None:
+        return float('nan')
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return max_rss / (1024 * 1024) if sys.platform == 'darwin' else max_rss / 1024
+
+
+def main():
+    """Times header sniffing, row reading and read plus merge of a synthetic workbook"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=1000000, help='Data rows in the workbook')
+    parser.add_argument('--path', help='Existing workbook to read instead of a synthetic one')
+    parser.add_argument(
+        '--default-gc', action='store_true',
+        help='Keep the default garbage collector thresholds instead of those of mailprep-batch')
+    args = parser.parse_args()
+    if not args.default_gc:
+        gc.set_threshold(*GC_THRESHOLDS)
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = args.path
+        if path is None:
+            path = os.path.join(directory, 'list.xlsx')
+            start = time.perf_counter()
+            # Written in a child process so peak memory below is the reader's own
+            writer = multiprocessing.Process(target=write_workbook, args=(path, args.rows))
+            writer.start()
+            writer.join()
+            print(f'Wrote {args.rows:,} rows in {time.perf_counter() - start:.1f} s')
+        print(f'Workbook: {os.path.getsize(path) / 1e6:.1f} MB, peak memory {max_rss_mb():.0f} MB')
+
+        start = time.perf_counter()
+        headers = read_header(path)
+        print(f'header      {(time.perf_counter() - start) * 1000:8.1f} ms')
+
+        start = time.perf_counter()
+        headers, rows = read_xlsx_rows(path)
+        row_count = sum(1 for _ in rows)
+        seconds = time.perf_counter() - start
+        print(f'read rows   {seconds:8.2f} s  {row_count / seconds:10,.0f} rows/s  '
+              f'peak memory {max_rss_mb():.0f} MB')
+
+        start = time.perf_counter()
+        headers, rows = read_xlsx_rows(path)
+        record_count = sum(1 for _ in RecordMerger(create_map_dict(headers)).merge(rows, headers))
+        seconds = time.perf_counter() - start
+        print(f'read+merge  {seconds:8.2f} s  {record_count / seconds:10,.0f} rows/s  '
+              f'peak memory {max_rss_mb():.0f} MB')
+
+
+if __name__ == '__main__':
+    main()
@@ -62,6 +62,7 @@ setuptools.setup(
     entry_points={
         'console_scripts': [
             'mailprep = mailprepgui:main',
+            'mailprep-batch = mailprep.batch:main',
         ],
     },
 )
@@ -0,0 +1,408 @@
+"""Headless batch processing of MailPrep jobs (header inference, mapping and merge) without Qt"""
+import gc
+import os
+import csv
+import sys
+import json
+import time
+import logging
+import argparse
+import functools
+import collections
+import concurrent.futures
+
+from mailprep.campus import ADDRESS_FIELD, MARK_FIELD, NAME_FIELD, CampusIndex
+from mailprep.job_runner import JobRunner
+from mailprep.mapping_cache import MappingCache
+from mailprep.merge import ConfigMergeMapping
+from mailprep.normalize import upper_case_normalizer, usps_normalizer
+from mailprep.record_store import BLOCK_ROWS, RecordStore, RecordStoreError, RecordStoreWriter
+from mailprep.spreadsheet import (
+    SpreadsheetError, header_readers, read_header, read_xls_rows, read_xlsx_rows)
+from mailprep.text_input import read_text_header, read_text_rows, text_file_extensions
+from utils.mapping import normalize_key
+
+
+log = logging.getLogger(__name__)
+
+
+JOB_FILE_EXTENSION = '.mpjob'
+# Appended to the job file's base name for the merged output written next to it
+OUTPUT_FILE_SUFFIX = ' merged.csv'
+# Appended to the output path for the record store the passes over merged records run on
+RECORD_STORE_SUFFIX = '.mprs'
+# Rows merged per JobRunner chunk, written to the record store as each chunk arrives so memory
+# use does not grow with the size of input files
+MERGE_CHUNK_SIZE = BLOCK_ROWS
+# Garbage collector thresholds of the command's process (forked workers inherit them). Reading
+# spreadsheets creates hundreds of thousands of short lived objects per batch, which with the
+# default first generation threshold of 700 trigger collections taking a third of the read time.
+GC_THRESHOLDS = (100000, 50, 100)
+
+# Input file of a batch job, with the same attributes as InputFile used by JobRunner
+BatchInputFile = collections.namedtuple('BatchInputFile', ['file_name', 'priority', 'mapping'])
+
+
+class BatchError(Exception):
+    """Raised when a job cannot be processed"""
+
+
+# Row readers by lower case file extension, called with a path and returning (headers, rows)
+input_readers = {
+    '.xlsx': read_xlsx_rows,
+    '.xls': read_xls_rows,
+}
+input_readers.update((extension, read_text_rows) for extension in text_file_extensions)
+
+
+def read_input_rows(path):
+    """Reads an input file with the row reader for its extension (picklable for JobRunner)"""
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in input_readers:
+        raise SpreadsheetError(f'No row reader for input file {path}')
+    return input_readers[extension](path)
+
+
+def read_input_header(path):
+    """Reads only the header row of an input file"""
+    extension = os.path.splitext(path)[1].lower()
+    if extension in header_readers:
+        return read_header(path)
+    if extension in text_file_extensions:
+        return read_text_header(path)
+    headers, rows = read_input_rows(path)
+    if hasattr(rows, 'close'):
+        rows.close()
+    return headers
+
+
+def is_job_file(file_name):
+    """Returns whether a file name is that of a job file"""
+    return os.path.splitext(file_name)[1].lower() == JOB_FILE_EXTENSION
+
+
+def find_job_files(paths):
+    """Returns the job files given directly or found (recursively) in the given directories"""
+    job_files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, directories, file_names in os.walk(path):
+                directories.sort()
+                job_files.extend(
+                    os.path.join(root, file_name) for file_name in sorted(file_names)
+                    if is_job_file(file_name))
+        else:
+            job_files.append(path)
+    return job_files
+
+
+def get_output_path(job_file_path, output_directory=None):
+    """Returns the path of the merged output file of a job"""
+    directory, file_name = os.path.split(job_file_path)
+    file_base_name = os.path.splitext(file_name)[0]
+    return os.path.join(output_directory or directory, file_base_name + OUTPUT_FILE_SUFFIX)
+
+
+def load_job(job_file_path):
+    """Returns the settings of a job file with top level keys in lower case"""
+    try:
+        with open(job_file_path, 'rb') as job_file:
+            settings = json.loads(job_file.read())
+    except (OSError, ValueError) as error:
+        raise BatchError(f'Unable to read job file {job_file_path}: {error}') from error
+    if not isinstance(settings, dict):
+        raise BatchError(f'Job file {job_file_path} does not contain a JSON object')
+    return {key.lower(): value for key, value in settings.items()}
+
+
+def get_input_files(job_file_path, settings, excluded_paths=()):
+    """Returns a job's BatchInputFiles
+
+    Files are taken from the job's optional 'files' section ({file name: {'selected', 'priority',
+    'mapping'}}). Otherwise every readable input file in the job directory is used with mappings
+    inferred from its headers, except the excluded ones (such as the campus file) and merged
+    outputs of any job. Subdirectories holding job files of their own belong to those jobs.
+    """
+    directory = os.path.dirname(job_file_path)
+    file_settings = settings.get('files')
+    if file_settings:
+        input_files = []
+        for priority, (file_name, info) in enumerate(file_settings.items()):
+            info = {key.lower(): value for key, value in (info or {}).items()}
+            if info.get('selected', True):
+                input_files.append(BatchInputFile(
+                    file_name, info.get('priority', priority), info.get('mapping')))
+        return input_files
+
+    extensions = set(input_readers) | set(header_readers)
+    excluded = {os.path.normcase(os.path.abspath(path)) for path in excluded_paths if path}
+    output_suffix = OUTPUT_FILE_SUFFIX.lower()
+    relative_paths = []
+    for root, directories, file_names in os.walk(directory):
+        if root != directory and any(is_job_file(file_name) for file_name in file_names):
+            directories.clear()
+            continue
+        directories.sort()
+        for file_name in sorted(file_names):
+            path = os.path.join(root, file_name)
+            if (os.path.splitext(file_name)[1].lower() in extensions
+                    and not file_name.lower().endswith(output_suffix)
+                    and os.path.normcase(os.path.abspath(path)) not in excluded):
+                relative_paths.append(os.path.relpath(path, directory))
+    return [
+        BatchInputFile(relative_path, priority, None)
+        for priority, relative_path in enumerate(relative_paths)
+    ]
+
+
+def run_job(job_file_path, dry_run=False, workers=1, output_directory=None):
+    """Infers mappings for and merges all input files of a job, returning a JSON-able report"""
+    start = time.perf_counter()
+    report = collections.OrderedDict([
+        ('job', job_file_path), ('output', None), ('records', 0), ('files', []),
+        ('seconds', collections.OrderedDict()), ('error', None),
+    ])
+    try:
+        settings = load_job(job_file_path)
+        directory = os.path.dirname(job_file_path)
+        output_path = get_output_path(job_file_path, output_directory)
+
+        phase_start = time.perf_counter()
+        mapping_cache = MappingCache.for_job(job_file_path)
+        merge_mapping = ConfigMergeMapping()
+        merge_files = []
+        file_reports = {}
+        campus_file_path = get_custom_campus_path(job_file_path, settings)
+        excluded_paths = [output_path, campus_file_path]
+        for input_file in get_input_files(job_file_path, settings, excluded_paths):
+            file_report = file_reports[input_file.file_name] = collections.OrderedDict([
+                ('file', input_file.file_name), ('priority', input_file.priority),
+                ('mapping', None), ('records', None), ('error', None),
+            ])
+            report['files'].append(file_report)
+            extension = os.path.splitext(input_file.file_name)[1].lower()
+            if not dry_run and extension not in input_readers:
+                file_report['error'] = f'No row reader for input file {input_file.file_name}'
+                continue
+            mapping = input_file.mapping
+            if mapping is None:
+                try:
+                    headers = read_input_header(os.path.join(directory, input_file.file_name))
+                except (SpreadsheetError, OSError) as error:
+                    file_report['error'] = str(error)
+                    continue
+                mapping = mapping_cache.create_map_dict(headers)
+            file_report['mapping'] = dict(mapping)
+            merge_mapping.set_file_mappings(input_file.file_name, mapping)
+            merge_files.append(input_file)
+        mapping_cache.save()
+        report['seconds']['infer'] = time.perf_counter() - phase_start
+
+        if not dry_run:
+            phase_start = time.perf_counter()
+            runner = JobRunner(
+                merge_mapping, read_input_rows, workers=workers, chunk_size=MERGE_CHUNK_SIZE,
+                directory=directory)
+            store_path = output_path + RECORD_STORE_SUFFIX
+            try:
+                report['records'] = write_record_store(
+                    store_path, merge_mapping, runner.run(merge_files), file_reports)
+                report['seconds']['merge'] = time.perf_counter() - phase_start
+
+                phase_start = time.perf_counter()
+                run_record_passes(store_path, get_record_passes(settings, campus_file_path))
+                report['seconds']['passes'] = time.perf_counter() - phase_start
+
+                phase_start = time.perf_counter()
+                with RecordStore(store_path) as store:
+                    write_output(output_path, store)
+                report['output'] = output_path
+                report['seconds']['output'] = time.perf_counter() - phase_start
+            finally:
+                if os.path.exists(store_path):
+                    os.remove(store_path)
+    except (BatchError, SpreadsheetError, RecordStoreError, OSError, KeyError, ValueError) as error:
+        log.debug('Job %s failed', job_file_path, exc_info=True)
+        report['error'] = str(error)
+    report['seconds']['total'] = time.perf_counter() - start
+    return report
+
+
+def write_record_store(store_path, merge_mapping, merged_files, file_reports):
+    """Writes merged records of all files to a record store with the union of their output fields
+
+    merged_files yields (input_file, records) once per file or per chunk of a file, and each
+    chunk is written as it arrives. Returns the number of records written.
+    """
+    output_fields = list(collections.OrderedDict.fromkeys(
+        field
+        for file_name in merge_mapping.get_files()
+        for field in merge_mapping.get_mappings(file_name)))
+    field_positions = {field: position for position, field in enumerate(output_fields)}
+    with RecordStoreWriter(store_path, output_fields) as writer:
+        for input_file, records in merged_files:
+            mappings = merge_mapping.get_mappings(input_file.file_name)
+            positions = [field_positions[field] for field in mappings]
+            if positions == list(range(len(output_fields))):
+                writer.write_rows(records)
+            else:
+                empty_row = [''] * len(output_fields)
+                output_rows = []
+                for record in records:
+                    output_row = empty_row.copy()
+                    for position, value in zip(positions, record):
+                        output_row[position] = value
+                    output_rows.append(output_row)
+                writer.write_rows(output_rows)
+            file_report = file_reports[input_file.file_name]
+            file_report['records'] = (file_report['records'] or 0) + len(records)
+    return writer.row_count
+
+
+def get_job_property(settings, name, default=None):
+    """Returns a property of a job's settings (as set in the job properties editor)"""
+    properties = {
+        normalize_key(key): value for key, value in (settings.get('properties') or {}).items()}
+    return properties.get(normalize_key(name), default)
+
+
+def normalize_pass(normalizer, store, path):
+    """Record pass normalizing the text of every field with a TextNormalizer"""
+    store.map_columns(path, dict.fromkeys(store.fields, normalizer.normalize_values))
+
+
+def get_custom_campus_path(job_file_path, settings):
+    """Returns the path of the custom campus file if the job marks custom campus records"""
+    campus_file_path = get_job_property(settings, 'Custom Campus Path')
+    if not get_job_property(settings, 'Use Custom Campus', False) or not campus_file_path:
+        return None
+    # Relative to the job directory like input files, absolute paths are kept by join
+    return os.path.join(os.path.dirname(job_file_path), campus_file_path)
+
+
+def custom_campus_pass(campus_index, store, path):
+    """Record pass adding a campus field with the marks of records in the custom campus file"""
+    if ADDRESS_FIELD not in store.field_indexes:
+        raise BatchError(f'Custom campus marking requires an {ADDRESS_FIELD!r} output field')
+    if NAME_FIELD in store.field_indexes:
+        store.with_column(path, MARK_FIELD, campus_index.mark_values, [ADDRESS_FIELD, NAME_FIELD])
+    else:
+        store.with_column(path, MARK_FIELD, campus_index.mark_values, [ADDRESS_FIELD])
+
+
+def get_record_passes(settings, campus_file_path=None):
+    """Returns the passes over the merged records enabled in a job's settings
+
+    Passes are functions called with the RecordStore of the records and a path to write the
+    store of updated records to. The custom campus index is loaded here (from its cache if the
+    campus file is unchanged).
+    """
+    record_passes = []
+    if campus_file_path is not None:
+        campus_index = CampusIndex.load(campus_file_path, read_input_rows)
+        log.debug('Loaded %s from %s', campus_index, campus_file_path)
+        record_passes.append(functools.partial(custom_campus_pass, campus_index))
+    # Normalizing text includes converting it to upper case
+    if get_job_property(settings, 'Normalize Text', False):
+        record_passes.append(functools.partial(normalize_pass, usps_normalizer))
+    elif get_job_property(settings, 'Convert To Upper', False):
+        record_passes.append(functools.partial(normalize_pass, upper_case_normalizer))
+    return record_passes
+
+
+def run_record_passes(store_path, record_passes):
+    """Applies passes in order, each replacing the record store with the one it wrote"""
+    temp_path = f'{store_path}.pass'
+    for record_pass in record_passes:
+        with RecordStore(store_path) as store:
+            record_pass(store, temp_path)
+        os.replace(temp_path, store_path)
+
+
+def write_output(output_path, store):
+    """Writes the records of a record store to a CSV file with a header row of its fields"""
+    temp_path = f'{output_path}.tmp'
+    with open(temp_path, 'w', newline='', encoding='utf-8') as output_file:
+        writer = csv.writer(output_file)
+        writer.writerow(store.fields)
+        writer.writerows(store.rows())
+    os.replace(temp_path, output_path)
+
+
+def run_jobs(job_files, dry_run=False, workers=1, output_directory=None):
+    """Runs jobs in parallel worker processes, or a single job with parallel files"""
+    workers = max(1, workers)
+    job_workers = min(workers, len(job_files))
+    if job_workers > 1:
+        run = functools.partial(
+            run_job, dry_run=dry_run, workers=1, output_directory=output_directory)
+        try:
+            executor = concurrent.futures.ProcessPoolExecutor(job_workers)
+        except (NotImplementedError, OSError, ImportError):
+            log.warning('Process pool unavailable, running jobs serially', exc_info=True)
+        else:
+            with executor:
+                return list(executor.map(run, job_files))
+    # Workers are left to the files of a job when there is nothing to run jobs in parallel with
+    file_workers = workers if len(job_files) == 1 else 1
+    return [run_job(job_file, dry_run, file_workers, output_directory) for job_file in job_files]
+
+
+def parse_args(argv=None):
+    """Returns the argument parser and the parsed command line arguments"""
+    parser = argparse.ArgumentParser(prog='mailprep-batch', description=__doc__)
+    parser.add_argument(
+        'paths', nargs='+', help='Job files (.mpjob) or directories containing them')
+    parser.add_argument(
+        '--workers', type=int, default=os.cpu_count() or 1,
+        help='Worker processes for jobs, or for the files of a single job (default: CPU count)')
+    parser.add_argument(
+        '--dry-run', action='store_true', help='Only infer and report mappings, do not merge')
+    parser.add_argument(
+        '--output-dir', help='Directory for merged output files (default: next to each job file)')
+    parser.add_argument(
+        '--json', nargs='?', const='-', metavar='PATH',
+        help='Write the report with timings as JSON to PATH, or stdout if no path is given')
+    parser.add_argument('--verbose', '-v', action='store_true', help='Log debug messages')
+    return parser, parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Entry point of the mailprep-batch command, returns the exit code"""
+    parser, args = parse_args(argv)
+    gc.set_threshold(*GC_THRESHOLDS)
+    logging.basicConfig(
+        level=logging.DEBUG if args.verbose else logging.WARNING,
+        format="%(asctime)s [%(levelname)s] %(name)s: %(message)s")
+    job_files = find_job_files(args.paths)
+    if not job_files:
+        parser.error('no job files found')
+
+    start = time.perf_counter()
+    reports = run_jobs(job_files, args.dry_run, args.workers, args.output_dir)
+    summary = collections.OrderedDict([
+        ('workers', max(1, args.workers)), ('dry_run', args.dry_run),
+        ('total_seconds', time.perf_counter() - start), ('jobs', reports),
+    ])
+
+    if args.json == '-':
+        json.dump(summary, sys.stdout, indent=2)
+        sys.stdout.write('\n')
+    else:
+        if args.json is not None:
+            with open(args.json, 'w', encoding='utf-8') as json_file:
+                json.dump(summary, json_file, indent=2)
+        for report in reports:
+            if report['error']:
+                status = 'failed: ' + report['error']
+            else:
+                status = f'{report["records"]} records'
+            print(f'{report["job"]}: {status} ({report["seconds"]["total"]:.3f} s)')
+            for file_report in report['files']:
+                if file_report['error']:
+                    print(f'  {file_report["file"]}: {file_report["error"]}')
+    return 1 if any(report['error'] for report in reports) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
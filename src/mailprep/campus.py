@@ -0,0 +1,187 @@
+"""Marking of merged records whose address (or name and address) is in a custom campus file"""
+import os
+import string
+import marshal
+import logging
+import unicodedata
+
+from mailprep.merge import RecordMerger, create_map_dict
+from mailprep.normalize import ACCENT_TABLE, UNICODE_PUNCTUATION
+from utils.mapping import KEY_NORMAL_FORM, normalize_key
+
+
+log = logging.getLogger(__name__)
+
+
+# Merged record fields matched against the campus file, and the field the marks are written to
+NAME_FIELD = 'first'
+ADDRESS_FIELD = 'address'
+MARK_FIELD = 'campus'
+# Mark of matching records if the campus file has no campus code column
+DEFAULT_MARK = 'Y'
+# Headers (normalized) of a campus file column holding the mark of each entry
+CAMPUS_CODE_HEADERS = ('campus', 'campus code', 'mail code', 'mailcode')
+
+# Index cache written next to the campus file
+INDEX_CACHE_EXTENSION = '.mpcampus'
+# Increased whenever key normalization changes, so cached indexes are rebuilt
+INDEX_FORMAT_VERSION = 2
+
+# Separates the name and address of a key, and cannot be left by normalization
+KEY_SEPARATOR = '\x1f'
+# Removes accents and punctuation of other text once decomposed (and case folded)
+UNICODE_FOLD = {
+    **ACCENT_TABLE,
+    **{ord(character): ' ' for character in string.punctuation + ''.join(UNICODE_PUNCTUATION)},
+}
+# Same for ASCII text as bytes, also lower casing, since bytes.translate is several times faster
+ASCII_FOLD = bytes.maketrans(
+    (string.punctuation + string.ascii_uppercase).encode(),
+    (' ' * len(string.punctuation) + string.ascii_lowercase).encode())
+
+# USPS standard abbreviations of address words, so spelled out and abbreviated forms match
+ADDRESS_ABBREVIATIONS = {
+    'avenue': 'ave', 'boulevard': 'blvd', 'circle': 'cir', 'court': 'ct', 'drive': 'dr',
+    'highway': 'hwy', 'lane': 'ln', 'parkway': 'pkwy', 'place': 'pl', 'road': 'rd',
+    'square': 'sq', 'street': 'st', 'terrace': 'ter', 'way': 'wy',
+    'north': 'n', 'south': 's', 'east': 'e', 'west': 'w',
+    'northeast': 'ne', 'northwest': 'nw', 'southeast': 'se', 'southwest': 'sw',
+    'apartment': 'apt', 'building': 'bldg', 'floor': 'fl', 'room': 'rm', 'suite': 'ste',
+}
+
+
+def _normalized_words(value):
+    """Words of a value without punctuation, folded like utils.mapping.normalize_key
+
+    normalize_key itself is not used, as its cache of raw keys would only churn on millions of
+    distinct addresses.
+    """
+    if value.isascii():
+        return value.encode('ascii').translate(ASCII_FOLD).decode('ascii').split()
+    # Decomposed first, so accents are separate characters and e.g. fullwidth punctuation ASCII
+    value = unicodedata.normalize(KEY_NORMAL_FORM, value.casefold())
+    return value.translate(UNICODE_FOLD).split()
+
+
+def normalize_address(address):
+    """Returns the matching key of an address, e.g. '1 N. Park Street' -> '1 n park st'"""
+    return ' '.join([ADDRESS_ABBREVIATIONS.get(word, word) for word in _normalized_words(address)])
+
+
+def normalize_name(name):
+    """Returns the matching key of a name"""
+    return ' '.join(_normalized_words(name))
+
+
+def index_cache_path(campus_file_path):
+    """Returns the path of the index cache of a campus file"""
+    return campus_file_path + INDEX_CACHE_EXTENSION
+
+
+class CampusIndex:
+    """Hash index of campus entries by normalized address, or normalized name and address
+
+    Entries with a name only match records with the same name and address, entries without one
+    match any record at the address. Matching a record takes at most two dict lookups.
+    """
+
+    def __init__(self, entries=None):
+        self.entries = {} if entries is None else entries  # Key to mark
+        # Names of records are only normalized if any entry has one
+        self.has_names = any(KEY_SEPARATOR in key for key in self.entries)
+
+    def add(self, address, name='', mark=DEFAULT_MARK):
+        """Adds an entry, returning False if its address is blank"""
+        address_key = normalize_address(address)
+        if not address_key:
+            return False
+        name_key = normalize_name(name)
+        if name_key:
+            key = f'{name_key}{KEY_SEPARATOR}{address_key}'
+            self.has_names = True
+        else:
+            key = address_key
+        self.entries[key] = mark or DEFAULT_MARK
+        return True
+
+    def match(self, address, name=''):
+        """Returns the mark of the entry matching a record, or '' if there is none"""
+        return self.mark_values([address], [name])[0]
+
+    def mark_values(self, addresses, names=None):
+        """Returns the marks of records given as lists of their addresses and names"""
+        entries = self.entries
+        marks = []
+        if names is None or not self.has_names:
+            for address in addresses:
+                marks.append(entries.get(normalize_address(address), ''))
+            return marks
+        for address, name in zip(addresses, names):
+            address_key = normalize_address(address)
+            if not address_key:
+                marks.append('')
+                continue
+            name_key = normalize_name(name)
+            mark = entries.get(f'{name_key}{KEY_SEPARATOR}{address_key}') if name_key else None
+            marks.append(mark or entries.get(address_key, ''))
+        return marks
+
+    @classmethod
+    def from_rows(cls, headers, rows):
+        """Builds an index from the rows of a campus file
+
+        Name and address columns are found by the same header mapping as input files, and the
+        mark of each entry is taken from a campus code column if there is one.
+        """
+        mappings = create_map_dict(headers)
+        if ADDRESS_FIELD not in mappings:
+            raise ValueError(f'Campus file has no address column (headers: {", ".join(headers)})')
+        merge_mappings = {
+            ADDRESS_FIELD: mappings[ADDRESS_FIELD], NAME_FIELD: mappings.get(NAME_FIELD, '')}
+        code_header = next(
+            (header for header in headers if normalize_key(header) in CAMPUS_CODE_HEADERS), None)
+        merge_mappings[MARK_FIELD] = '{' + code_header + '}' if code_header is not None else ''
+
+        index = cls()
+        for address, name, mark in RecordMerger(merge_mappings).merge(rows, headers):
+            index.add(address, name, mark)
+        return index
+
+    @classmethod
+    def load(cls, campus_file_path, read_rows, use_cache=True):
+        """Loads the index of a campus file, from its cache if the file is unchanged
+
+        read_rows is called with the path and must return (headers, rows) as for JobRunner.
+        A rebuilt index is written to the cache next to the campus file.
+        """
+        stat_result = os.stat(campus_file_path)
+        cache_key = [INDEX_FORMAT_VERSION, stat_result.st_mtime_ns, stat_result.st_size]
+        cache_path = index_cache_path(campus_file_path)
+        if use_cache:
+            try:
+                with open(cache_path, 'rb') as cache_file:
+                    cached_key, entries = marshal.loads(cache_file.read())
+                if cached_key == cache_key:
+                    return cls(entries)
+            except FileNotFoundError:
+                pass
+            except (OSError, ValueError, EOFError, TypeError):
+                log.warning('Ignoring unreadable campus index %s', cache_path, exc_info=True)
+
+        headers, rows = read_rows(campus_file_path)
+        index = cls.from_rows(headers, rows)
+        if use_cache:
+            temp_path = f'{cache_path}.tmp'
+            try:
+                with open(temp_path, 'wb') as cache_file:
+                    cache_file.write(marshal.dumps((cache_key, index.entries)))
+                os.replace(temp_path, cache_path)
+            except OSError:
+                log.warning('Unable to write campus index %s', cache_path, exc_info=True)
+        return index
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __repr__(self):
+        return f'<CampusIndex(entries={len(self.entries)})>'
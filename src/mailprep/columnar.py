@@ -0,0 +1,113 @@
+"""Optional NumPy backend merging whole columns at once instead of one row at a time"""
+import collections
+import collections.abc
+
+from mailprep.merge import MergeTemplate, _cell_text
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+def is_available():
+    """Returns whether NumPy is installed and the columnar backend can be used"""
+    return numpy is not None
+
+
+def _require_numpy():
+    if numpy is None:
+        raise ImportError('The columnar merge backend requires NumPy (pip install numpy)')
+
+
+def _to_text(values):
+    # Element-wise ufuncs over object arrays keep the exact str semantics of the row-wise path
+    return numpy.frompyfunc(_cell_text, 1, 1)(values)
+
+
+def _strip(values):
+    return numpy.frompyfunc(str.strip, 1, 1)(values)
+
+
+def load_columns(rows, headers, fields=None):
+    """Transposes row sequences into an OrderedDict of header to object arrays of cell text
+
+    If fields are given, only the columns of those headers are loaded. Rows shorter than the
+    headers are padded with '' like the spreadsheet and text readers pad them.
+    """
+    _require_numpy()
+    if not isinstance(rows, collections.abc.Sequence):
+        rows = list(rows)
+    loaded = collections.OrderedDict()
+    for index, header in enumerate(headers):
+        if header in loaded or (fields is not None and header not in fields):
+            continue
+        column = numpy.empty(len(rows), dtype=object)
+        column[:] = [row[index] if index < len(row) else '' for row in rows]
+        loaded[header] = _to_text(column) if len(rows) else column
+    return loaded
+
+
+class ColumnarMerger:
+    """Merges input columns into output columns using a file's field mappings
+
+    Produces exactly the same output as mailprep.merge.RecordMerger. Each template is evaluated
+    as vectorized concatenation of its separators and field columns, with blank fields masked
+    out together with the separator in front of them.
+    """
+
+    def __init__(self, mappings):
+        _require_numpy()
+        self.output_fields = list(mappings.keys())
+        self.templates = [MergeTemplate(template) for template in mappings.values()]
+
+    def merge_columns(self, columns, row_count=None):
+        """Returns an OrderedDict of output field to object array of output text
+
+        Columns is a mapping of input field name to an object array of cell text, such as
+        returned by load_columns. The row count is only needed if no columns are given.
+        """
+        if row_count is None:
+            row_count = len(next(iter(columns.values()))) if columns else 0
+        # Blank masks are shared by every template using the same field
+        present_masks = {}
+        merged = collections.OrderedDict()
+        for output_field, template in zip(self.output_fields, self.templates):
+            merged[output_field] = self._merge_template(template, columns, present_masks, row_count)
+        return merged
+
+    def merge(self, rows, headers):
+        """Returns an iterator of output value tuples for each row, like RecordMerger.merge"""
+        missing_fields = [
+            field
+            for template in self.templates for field in template.fields
+            if field not in headers
+        ]
+        if missing_fields:
+            raise KeyError(f'Mapped fields not found in headers: {", ".join(missing_fields)}')
+        fields = {field for template in self.templates for field in template.fields}
+        rows = list(rows)
+        if not self.templates:
+            return iter([()] * len(rows))
+        merged = self.merge_columns(load_columns(rows, headers, fields), len(rows))
+        return zip(*merged.values())
+
+    @staticmethod
+    def _merge_template(template, columns, present_masks, row_count):
+        if not template.fields:
+            return numpy.full(row_count, template.template, dtype=object)
+        result = numpy.full(row_count, '', dtype=object)
+        # Rows where a value has been written, after which separators are used over the prefix
+        started = numpy.zeros(row_count, dtype=bool)
+        for field, separator in zip(template.fields, template.separators):
+            text = columns[field]
+            if field not in present_masks:
+                present_masks[field] = _strip(text).astype(bool)
+            present = present_masks[field]
+            leading = numpy.where(started, separator, template.prefix).astype(object)
+            result = numpy.where(present, result + leading + text, result)
+            started |= present
+        return numpy.where(started, result + template.suffix, '').astype(object)
+
+    def __repr__(self):
+        return f'<ColumnarMerger(output_fields={self.output_fields})>'
@@ -0,0 +1,169 @@
+"""Persistent index of sniffed spreadsheet headers, mappings and file types in a job directory"""
+import os
+import json
+import logging
+import tempfile
+
+from mailprep.mapping_cache import MappingCache
+from mailprep.model.application.app_settings import AppSettings
+from mailprep.spreadsheet import SpreadsheetError, header_readers, read_header
+
+
+log = logging.getLogger(__name__)
+
+
+# Index file written in the job directory (next to the .mpjob file)
+INDEX_FILE_NAME = '.mpindex'
+INDEX_FORMAT_VERSION = 1
+
+
+def guess_file_type(headers, file_types=None):
+    """Returns the name of the first input file type whose pattern matches the header row"""
+    file_types = AppSettings.get_input_file_types() if file_types is None else file_types
+    header_line = '\t'.join(headers)
+    for file_type in file_types:
+        if file_type['Pattern'].search(header_line):
+            return file_type['Name']
+    return None
+
+
+class HeaderIndexEntry:
+    """Sniffed header details of a single file, valid while its mtime and size are unchanged"""
+
+    __slots__ = ('mtime', 'size', 'headers', 'mapping', 'file_type', 'error')
+
+    def __init__(self, mtime, size, headers=None, mapping=None, file_type=None, error=None):
+        self.mtime = mtime
+        self.size = size
+        self.headers = headers
+        self.mapping = mapping
+        self.file_type = file_type
+        self.error = error
+
+    def is_current(self, stat_result):
+        """Returns whether the entry still describes the file with the given os.stat result"""
+        return self.mtime == stat_result.st_mtime_ns and self.size == stat_result.st_size
+
+    def to_json(self):
+        """Returns the entry as a JSON serializable dict"""
+        return {slot: getattr(self, slot) for slot in self.__slots__}
+
+    @classmethod
+    def from_json(cls, contents):
+        """Creates an entry from a dict created by to_json"""
+        return cls(**contents)
+
+    def __repr__(self):
+        return f'<HeaderIndexEntry(file_type={self.file_type}, headers={self.headers})>'
+
+
+class HeaderIndex:
+    """Headers, default mapping and guessed file type of every spreadsheet in a directory
+
+    Entries are keyed by path relative to the directory and only re-read when a file's
+    modification time or size changes, so reopening a job only sniffs changed files. Each index
+    has its own mapping cache unless one is given, so scans on different threads share no state.
+    """
+
+    def __init__(self, directory, mapping_cache=None):
+        self.directory = directory
+        self.index_path = os.path.join(directory, INDEX_FILE_NAME)
+        self.mapping_cache = MappingCache() if mapping_cache is None else mapping_cache
+        self.entries = {}
+        self.is_dirty = False
+
+    def load(self):
+        """Loads entries from the index file if it exists and is readable"""
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as index_file:
+                contents = json.load(index_file)
+        except FileNotFoundError:
+            return self
+        except (OSError, ValueError):
+            log.warning('Ignoring unreadable header index %s', self.index_path, exc_info=True)
+            return self
+        if contents.get('version') == INDEX_FORMAT_VERSION:
+            self.entries = {
+                path: HeaderIndexEntry.from_json(entry)
+                for path, entry in contents.get('entries', {}).items()
+            }
+        self.is_dirty = False
+        return self
+
+    def save(self):
+        """Writes the entries to the index file if any changed"""
+        if not self.is_dirty:
+            return
+        contents = {
+            'version': INDEX_FORMAT_VERSION,
+            'entries': {path: entry.to_json() for path, entry in self.entries.items()},
+        }
+        # A unique temporary file, so concurrent saves of the same directory never mix writes
+        temp_fd, temp_path = tempfile.mkstemp(
+            prefix=f'{INDEX_FILE_NAME}.', suffix='.tmp', dir=self.directory)
+        try:
+            with open(temp_fd, 'w', encoding='utf-8') as index_file:
+                json.dump(contents, index_file)
+            os.replace(temp_path, self.index_path)
+        except BaseException:
+            os.remove(temp_path)
+            raise
+        self.is_dirty = False
+
+    def get(self, relative_path):
+        """Returns the entry for a path relative to the directory, or None if not indexed"""
+        return self.entries.get(os.path.normcase(relative_path))
+
+    def find_spreadsheets(self):
+        """Returns paths relative to the directory of all readable spreadsheet files in it"""
+        relative_paths = []
+        for root, _, file_names in os.walk(self.directory):
+            for file_name in file_names:
+                if os.path.splitext(file_name)[1].lower() in header_readers:
+                    path = os.path.join(root, file_name)
+                    relative_paths.append(os.path.relpath(path, self.directory))
+        return sorted(relative_paths)
+
+    def scan(self, relative_paths=None, is_cancelled=None, report_progress=None):
+        """Updates entries of changed files, returning the relative paths that were re-read
+
+        Entries of files that no longer exist are removed. is_cancelled and report_progress
+        are optional callbacks for running the scan as a background task.
+        """
+        relative_paths = self.find_spreadsheets() if relative_paths is None else relative_paths
+        keys = {os.path.normcase(path): path for path in relative_paths}
+        for removed_key in set(self.entries) - set(keys):
+            del self.entries[removed_key]
+            self.is_dirty = True
+
+        updated_paths = []
+        for scanned_count, (key, relative_path) in enumerate(sorted(keys.items())):
+            if is_cancelled is not None and is_cancelled():
+                break
+            if report_progress is not None:
+                report_progress(scanned_count, len(keys))
+            try:
+                stat_result = os.stat(os.path.join(self.directory, relative_path))
+            except OSError:
+                continue
+            entry = self.entries.get(key)
+            if entry is None or not entry.is_current(stat_result):
+                self.entries[key] = self._sniff(relative_path, stat_result)
+                self.is_dirty = True
+                updated_paths.append(relative_path)
+        return updated_paths
+
+    def _sniff(self, relative_path, stat_result):
+        entry = HeaderIndexEntry(stat_result.st_mtime_ns, stat_result.st_size)
+        try:
+            entry.headers = read_header(os.path.join(self.directory, relative_path))
+        except (SpreadsheetError, OSError) as error:
+            # Failures are kept so unreadable files are not retried until they change
+            entry.error = str(error)
+            return entry
+        entry.mapping = dict(self.mapping_cache.create_map_dict(entry.headers))
+        entry.file_type = guess_file_type(entry.headers)
+        return entry
+
+    def __repr__(self):
+        return f'<HeaderIndex(directory={self.directory!r}, entries={len(self.entries)})>'
@@ -0,0 +1,153 @@
+"""Runs the merge for all input files of a job, in parallel worker processes where possible"""
+import os
+import pickle
+import logging
+import itertools
+import collections
+import concurrent.futures
+import concurrent.futures.process
+
+from mailprep.merge import RecordMerger
+from utils.common import coalesce
+
+
+log = logging.getLogger(__name__)
+
+
+def _merge_file(merger_class, read_rows, path, mappings):
+    """Worker task reading and merging an entire file, returning the list of output records"""
+    headers, rows = read_rows(path)
+    return list(merger_class(mappings).merge(rows, headers))
+
+
+def _merge_chunk(merger_class, mappings, headers, rows):
+    """Worker task merging a chunk of rows already read by the parent process"""
+    return list(merger_class(mappings).merge(rows, headers))
+
+
+def _chunks(rows, chunk_size):
+    """Splits an iterable of rows into lists of at most chunk_size rows"""
+    rows = iter(rows)
+    while True:
+        chunk = list(itertools.islice(rows, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+class JobRunner:
+    """Merges a job's input files with their file mappings, ordered by InputFile.priority
+
+    read_rows is called with the path of an input file and must return a (headers, rows) tuple.
+    With more than one worker it has to be picklable (i.e. a module level function), as each
+    file, or each chunk of chunk_size rows of a file, is merged in a worker process. A single
+    worker, or a platform without process pool support, merges serially in this process.
+
+    merger_class selects the merge backend, e.g. mailprep.columnar.ColumnarMerger in place of
+    the default row-wise RecordMerger.
+    """
+
+    def __init__(
+            self, merge_mapping, read_rows, workers=None, chunk_size=None, directory=None,
+            merger_class=RecordMerger):
+        self.merge_mapping = merge_mapping  # ConfigMergeMapping instance
+        self.read_rows = read_rows
+        self.merger_class = merger_class
+        self.workers = coalesce(workers, os.cpu_count(), 1)
+        self.chunk_size = chunk_size
+        self.directory = directory
+
+    def run(self, input_files):
+        """Generator of (input_file, records) tuples in priority order
+
+        Records are lists of output value tuples. A file is yielded once with all of its records,
+        or once per chunk if a chunk size was given.
+        """
+        # Sort is stable, so files with equal priority keep the order they were given in
+        ordered_files = sorted(input_files, key=lambda input_file: input_file.priority)
+        # Number of results already yielded per file position, so a fallback can resume
+        yielded = collections.Counter()
+        if self.workers > 1 and self._is_picklable():
+            try:
+                executor = concurrent.futures.ProcessPoolExecutor(self.workers)
+            except (NotImplementedError, OSError, ImportError):
+                log.warning('Process pool unavailable, merging job files serially', exc_info=True)
+            else:
+                try:
+                    with executor:
+                        for position, input_file, records in self._run_parallel(
+                                executor, ordered_files):
+                            yield input_file, records
+                            yielded[position] += 1
+                    return
+                except (concurrent.futures.process.BrokenProcessPool, pickle.PicklingError):
+                    log.warning(
+                        'Process pool failed, merging remaining files serially', exc_info=True)
+        yield from self._run_serial(ordered_files, yielded)
+
+    def _is_picklable(self):
+        # Checked up front, as a task failing to pickle can hang the pool's shutdown on Python 3.7
+        try:
+            pickle.dumps((self.merger_class, self.read_rows))
+        except (pickle.PicklingError, AttributeError, TypeError):
+            log.warning(
+                'Merge functions cannot be pickled, merging job files serially', exc_info=True)
+            return False
+        return True
+
+    def _run_serial(self, ordered_files, yielded):
+        for position, input_file in enumerate(ordered_files):
+            if self.chunk_size is None and yielded[position]:
+                continue
+            headers, rows = self.read_rows(self._get_path(input_file))
+            mappings = self._get_mappings(input_file)
+            if self.chunk_size is None:
+                yield input_file, _merge_chunk(self.merger_class, mappings, headers, rows)
+            else:
+                chunks = itertools.islice(
+                    _chunks(rows, self.chunk_size), yielded[position], None)
+                for chunk in chunks:
+                    yield input_file, _merge_chunk(self.merger_class, mappings, headers, chunk)
+
+    def _run_parallel(self, executor, ordered_files):
+        # Futures are collected in submission order and resolved from the front, so results are
+        # yielded in a deterministic order no matter which worker finishes first. Only a bounded
+        # number of tasks is in flight to keep chunks of large files from piling up in memory.
+        max_pending = self.workers * 2
+        pending = collections.deque()
+        try:
+            for task in self._submit_tasks(executor, ordered_files):
+                pending.append(task)
+                if len(pending) >= max_pending:
+                    position, input_file, future = pending.popleft()
+                    yield position, input_file, future.result()
+            while pending:
+                position, input_file, future = pending.popleft()
+                yield position, input_file, future.result()
+        finally:
+            for _, _, future in pending:
+                future.cancel()
+
+    def _submit_tasks(self, executor, ordered_files):
+        for position, input_file in enumerate(ordered_files):
+            path = self._get_path(input_file)
+            mappings = self._get_mappings(input_file)
+            if self.chunk_size is None:
+                yield position, input_file, executor.submit(
+                    _merge_file, self.merger_class, self.read_rows, path, mappings)
+            else:
+                headers, rows = self.read_rows(path)
+                for chunk in _chunks(rows, self.chunk_size):
+                    yield position, input_file, executor.submit(
+                        _merge_chunk, self.merger_class, mappings, headers, chunk)
+
+    def _get_path(self, input_file):
+        if self.directory is None:
+            return input_file.file_name
+        return os.path.join(self.directory, input_file.file_name)
+
+    def _get_mappings(self, input_file):
+        return self.merge_mapping.get_mappings(input_file.file_name)
+
+    def __repr__(self):
+        return f'<JobRunner(workers={self.workers}, chunk_size={self.chunk_size})>'
@@ -0,0 +1,129 @@
+"""LRU cache of default header mappings, optionally persisted next to a job definition file"""
+import os
+import json
+import logging
+import collections
+
+from mailprep import merge
+from utils.common import coalesce
+
+
+log = logging.getLogger(__name__)
+
+
+# Extension replacing .mpjob for the mapping cache file stored beside the job definition file
+CACHE_FILE_EXTENSION = '.mapcache'
+
+CacheInfo = collections.namedtuple('CacheInfo', ['hits', 'misses', 'maxsize', 'currsize'])
+
+
+class MappingCache:
+    """Caches create_map_dict results keyed by the exact tuple of headers
+
+    Headers are not case folded or stripped for the key, as their original text is part of the
+    mapping strings. Every cached mapping is tagged with the version hash of the header
+    classifier, so changes to the field mapping definitions or blacklist discard old mappings.
+    """
+
+    def __init__(self, maxsize=128, path=None, classifier=None):
+        self.maxsize = maxsize  # None for an unbounded cache
+        self.path = path
+        # Looked up on use when not given, so a rebuilt default classifier is picked up
+        self.classifier = classifier
+        self.entries = collections.OrderedDict()
+        self.version = None
+        self.hits = 0
+        self.misses = 0
+        self.is_dirty = False
+        if self.path is not None:
+            self.load()
+
+    @classmethod
+    def for_job(cls, job_file_path, **kwargs):
+        """Creates a cache persisted beside the given .mpjob file"""
+        cache_path = os.path.splitext(job_file_path)[0] + CACHE_FILE_EXTENSION
+        return cls(path=cache_path, **kwargs)
+
+    def get_classifier(self):
+        """Returns the HeaderClassifier used to create mappings on a cache miss"""
+        return coalesce(self.classifier, merge.default_header_classifier)
+
+    def create_map_dict(self, headers):
+        """Returns a copy of the cached mapping for the headers, creating it on a miss"""
+        classifier = self.get_classifier()
+        self._check_version(classifier.version)
+        key = tuple(headers)
+        mapping = self.entries.get(key)
+        if mapping is None:
+            self.misses += 1
+            mapping = classifier.classify(key)
+            self._add_entry(key, mapping)
+        else:
+            self.hits += 1
+            self.entries.move_to_end(key)
+        return collections.OrderedDict(mapping)
+
+    def cache_info(self):
+        """Reports hit and miss counts like functools.lru_cache"""
+        return CacheInfo(self.hits, self.misses, self.maxsize, len(self.entries))
+
+    def clear(self):
+        """Removes all cached mappings (hit and miss counts are kept)"""
+        self.entries.clear()
+        self.is_dirty = True
+
+    def load(self):
+        """Loads cached mappings from the cache file, ignoring it if unreadable or outdated"""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as cache_file:
+                contents = json.load(cache_file)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError):
+            log.warning('Ignoring unreadable mapping cache %s', self.path, exc_info=True)
+            return
+        self._check_version(self.get_classifier().version)
+        if contents.get('version') != self.version:
+            log.debug('Ignoring outdated mapping cache %s', self.path)
+            return
+        for entry in contents.get('entries', []):
+            self._add_entry(tuple(entry['headers']), collections.OrderedDict(entry['mapping']))
+        self.is_dirty = False
+
+    def save(self):
+        """Writes the cached mappings to the cache file if any changed since last load or save"""
+        if self.path is None or not self.is_dirty:
+            return
+        contents = {
+            'version': self.version,
+            'entries': [
+                {'headers': list(headers), 'mapping': list(mapping.items())}
+                for headers, mapping in self.entries.items()
+            ],
+        }
+        # Write to a temporary file first so an interrupted save never corrupts the cache
+        temp_path = f'{self.path}.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as cache_file:
+            json.dump(contents, cache_file)
+        os.replace(temp_path, self.path)
+        self.is_dirty = False
+
+    def _check_version(self, version):
+        if version != self.version:
+            if self.entries:
+                log.debug('Header mapping definitions changed, clearing mapping cache')
+                self.clear()
+            self.version = version
+
+    def _add_entry(self, key, mapping):
+        self.entries[key] = mapping
+        self.is_dirty = True
+        if self.maxsize is not None and len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    def __repr__(self):
+        return f'<MappingCache(path={self.path!r}, {self.cache_info()})>'
+
+
+# Shared in-memory cache for callers without a job file
+default_mapping_cache = MappingCache()
@@ -1,9 +1,16 @@
 """Mappings for common field and merging data into columns using a given mapping"""
 import re
+import logging
+import hashlib
+import operator
 import collections
 import configparser
 
 from utils.common import coalesce, pad_right
+from utils.logging_decorators import log_call
+
+
+log = logging.getLogger(__name__)
 
 
 class ConfigMergeMapping:
@@ -66,11 +73,12 @@ class FieldMapper:
     def __init__(self, output_field_name, input_field_patterns, join_string=' '):
         self.output_field_name = output_field_name
         self.pattern = self._build_pattern(input_field_patterns)
+        self.regex = re.compile(self.pattern, re.IGNORECASE)
         self.join_string = join_string
 
     def is_match(self, value):
         """Checks if the given string matches the pattern for this FieldMapper instance"""
-        return re.match(self.pattern, value.strip(), re.IGNORECASE) is not None
+        return self.regex.match(value.strip()) is not None
 
     def get_matching_headers(self, headers):
         """Returns a list of all given headers that match for this FieldMapper instance"""
@@ -107,47 +115,223 @@ class NameFieldMapper(FieldMapper):
         return re.sub(name9_pattern, ", ", base_mapping, re.IGNORECASE)
 
 
+class HeaderClassifier:
+    """Assigns headers to the output fields of a list of FieldMappers in a single pass
+
+    All FieldMapper patterns are combined into one precompiled regex with a named group per
+    mapper. Alternatives are tried in order, so the matching group is always the first mapper
+    (in definition order) that would have matched the header on its own.
+    """
+
+    def __init__(self, field_mappers, blacklist=()):
+        self.field_mappers = list(field_mappers)
+        self.blacklist = frozenset(blacklist)
+        self.group_indexes = {}
+        group_patterns = []
+        for mapper_index, field_mapper in enumerate(self.field_mappers):
+            group_name = f'm{mapper_index}'
+            self.group_indexes[group_name] = mapper_index
+            group_patterns.append(f'(?P<{group_name}>{field_mapper.pattern})')
+        self.regex = re.compile('|'.join(group_patterns), re.IGNORECASE)
+        self.version = self._build_version()
+
+    def _build_version(self):
+        """Hash of everything affecting classification, to invalidate mappings cached elsewhere"""
+        definition = repr((
+            [
+                (
+                    type(mapper).__name__, mapper.output_field_name, mapper.pattern,
+                    mapper.join_string)
+                for mapper in self.field_mappers
+            ],
+            sorted(self.blacklist),
+        ))
+        return hashlib.sha1(definition.encode('utf-8')).hexdigest()
+
+    def classify(self, headers):
+        """Returns an OrderedDict mapping output fields to mapping strings for the given headers"""
+        # One bucket of matched headers per field mapper, plus headers no mapper handles
+        matched_headers = [[] for _ in self.field_mappers]
+        unhandled_headers = []
+        match = self.regex.match
+        for header in headers:
+            if header in self.blacklist:
+                continue
+            header_match = match(header.strip())
+            if header_match is None:
+                unhandled_headers.append(header)
+            else:
+                # The mapper group encloses any groups in its own pattern, so it closes last
+                matched_headers[self.group_indexes[header_match.lastgroup]].append(header)
+
+        # New dictionary to return mapping (orderd for consistency)
+        mapped_fields = collections.OrderedDict()
+        for field_mapper, map_fields in zip(self.field_mappers, matched_headers):
+            if map_fields:
+                # Lexegraphically sort the matching fields
+                # (mostly to order numbered fields correctly)
+                map_fields.sort()
+                output_field = field_mapper.output_field_name
+                mapped_fields[output_field] = field_mapper.get_mapping_string(map_fields)
+
+        # Add any remaining fields directly as their original name
+        # (basically just includes the columns entirely unchanged in the mapping)
+        for field in unhandled_headers:
+            mapped_fields[field] = _wrap_in_braces(field)
+
+        return mapped_fields
+
+
+# List of mappings to match input headers and return output fields with defined join string
+field_mapping_definitions = [
+    FieldMapper('id', [r'id\d?'], join_string=':'),
+    NameFieldMapper('first', [r'name\d?', r'name_?line', r'first', r'suffix', r'_prefix']),
+    FieldMapper('title', [r'title\d?'], join_string=', '),
+    FieldMapper('company', [r'firm\d?', r'company\d?'], join_string=', '),
+    FieldMapper('address', [r'address1?', r'line1?']),
+    FieldMapper('address2', [r'address2', r'line2']),
+    FieldMapper('city', [r'city', r'last_?line', r'st(ate)?\d?', r'zip']),
+    FieldMapper('salline', [
+        r'dr', r'mrs?',
+        r'nameprefix', r'nametitle',
+        r'sal', r'salutation', r'salutation_line']),
+]
+# List of fields to be ignore regardless of their presence
+field_mapping_blacklist = ['index']
+
+# Built once at import so every call reuses the same compiled classifier
+default_header_classifier = HeaderClassifier(field_mapping_definitions, field_mapping_blacklist)
+
+
+@log_call(log, timed=True)
 def create_map_dict(headers):
     """ Creates a dictionary of default mappings for the map file """
-    # List of mappings to match input headers and return output fields with defined join string
-    field_mapping_definitions = [
-        FieldMapper('id', [r'id\d?'], join_string=':'),
-        NameFieldMapper('first', [r'name\d?', r'name_?line', r'first', r'suffix', r'_prefix']),
-        FieldMapper('title', [r'title\d?'], join_string=', '),
-        FieldMapper('company', [r'firm\d?', r'company\d?'], join_string=', '),
-        FieldMapper('address', [r'address1?', r'line1?']),
-        FieldMapper('address2', [r'address2', r'line2']),
-        FieldMapper('city', [r'city', r'last_?line', r'st(ate)?\d?', r'zip']),
-        FieldMapper('salline', [
-            r'dr', r'mrs?',
-            r'nameprefix', r'nametitle',
-            r'sal', r'salutation', r'salutation_line']),
-    ]
-    # List of fields to be ignore regardless of their presence
-    field_mapping_blacklist = ['index']
-
-    # Create a copy of all headers to mutate without affecting input list
-    unhandled_headers = [header for header in headers if header not in field_mapping_blacklist]
-    # New dictionary to return mapping (orderd for consistency)
-    mapped_fields = collections.OrderedDict()
-
-    for field_mapper in field_mapping_definitions:
-        # Get all fields that match the current field_mapper
-        map_fields = field_mapper.get_matching_headers(unhandled_headers)
-        # Lexegraphically sort the matching fields (mostly to order numbered fields correctly)
-        map_fields.sort()
-
-        # If any fields matched, add the mapping string to the mapped fields to be returned
-        if map_fields:
-            output_field = field_mapper.output_field_name
-            mapped_fields[output_field] = field_mapper.get_mapping_string(map_fields)
-
-        # Remove mapped fields from total field list as they are now handled
-        unhandled_headers = [header for header in unhandled_headers if header not in map_fields]
-
-    # Add any remaining fields directly as their original name
-    # (basically just includes the columns entirely unchanged in the mapping)
-    for field in unhandled_headers:
-        mapped_fields[field] = _wrap_in_braces(field)
-
-    return mapped_fields
+    return default_header_classifier.classify(headers)
+
+
+# Matches a single '{field}' placeholder in a mapping string
+_template_field_regex = re.compile(r'\{([^{}]*)\}')
+
+
+def _cell_text(value):
+    """Converts a cell value to output text (None is an empty cell)"""
+    if value is None:
+        return ''
+    if value.__class__ is str:
+        return value
+    return str(value)
+
+
+class MergeTemplate:
+    """Mapping string (e.g. '{City} {State} {Zip}') compiled once into fields and separators
+
+    Blank fields are dropped together with the separator in front of them, so a blank 'name9'
+    in '{name1}, {name9}' produces 'name1' rather than 'name1, '.
+    """
+
+    def __init__(self, template):
+        self.template = template
+        self.fields = []
+        # separators[i] is the literal text directly before fields[i]
+        self.separators = []
+        position = 0
+        for field_match in _template_field_regex.finditer(template):
+            self.separators.append(template[position:field_match.start()])
+            self.fields.append(field_match.group(1))
+            position = field_match.end()
+        self.suffix = template[position:]
+        self.prefix = self.separators[0] if self.separators else self.suffix
+        # Printf style format string used when no field is blank (the common case)
+        self.format_string = ''.join(
+            separator.replace('%', '%%') + '%s' for separator in self.separators
+        ) + self.suffix.replace('%', '%%')
+
+    def render(self, values):
+        """Renders the template from field values given in the same order as self.fields"""
+        texts = tuple([value if value.__class__ is str else _cell_text(value) for value in values])
+        if all(map(str.strip, texts)):
+            return self.format_string % texts
+        if not self.fields:
+            return self.template
+        parts = []
+        for separator, text in zip(self.separators, texts):
+            if text.strip():
+                # The first value present is preceded by the template prefix, not its separator
+                parts.append(separator if parts else self.prefix)
+                parts.append(text)
+        if not parts:
+            return ''
+        parts.append(self.suffix)
+        return ''.join(parts)
+
+    def __repr__(self):
+        return f'<MergeTemplate({self.template!r})>'
+
+
+def _item_getter(keys):
+    """Returns a function getting a tuple of the given keys from a row (even for 0 or 1 keys)"""
+    if not keys:
+        return lambda row: ()
+    if len(keys) == 1:
+        key = keys[0]
+        return lambda row: (row[key],)
+    return operator.itemgetter(*keys)
+
+
+class RecordMerger:
+    """Merges input rows into output records using a file's field mappings
+
+    Templates are compiled once on creation. Rows are processed lazily one at a time, so memory
+    use does not depend on the number of rows merged.
+    """
+
+    def __init__(self, mappings):
+        self.output_fields = list(mappings.keys())
+        self.templates = [MergeTemplate(template) for template in mappings.values()]
+        self.field_getters = self.bind()
+
+    def input_fields(self):
+        """Returns all distinct input fields referenced by the templates in first use order"""
+        return list(collections.OrderedDict.fromkeys(
+            field for template in self.templates for field in template.fields))
+
+    def merge_row(self, row):
+        """Returns a tuple of output values (ordered as self.output_fields) for a single row dict"""
+        return tuple([
+            template.render(getter(row))
+            for template, getter in zip(self.templates, self.field_getters)
+        ])
+
+    def merge(self, rows, headers=None):
+        """Returns a generator of output value tuples for each row
+
+        Rows are mappings keyed by input field name, or sequences if headers are given, in which
+        case every field is resolved to its column index once before the first row is merged.
+        """
+        getters = self.field_getters if headers is None else self.bind(headers)
+        return self._merge_rows(rows, list(zip(self.templates, getters)))
+
+    @staticmethod
+    def _merge_rows(rows, bound_templates):
+        for row in rows:
+            yield tuple([template.render(getter(row)) for template, getter in bound_templates])
+
+    def bind(self, headers=None):
+        """Returns a value getter per template, by column index if headers are given else by name"""
+        if headers is None:
+            return [_item_getter(template.fields) for template in self.templates]
+        column_indexes = {}
+        for column_index, header in enumerate(headers):
+            column_indexes.setdefault(header, column_index)
+        missing_fields = [field for field in self.input_fields() if field not in column_indexes]
+        if missing_fields:
+            raise KeyError(f'Mapped fields not found in headers: {", ".join(missing_fields)}')
+        return [
+            _item_getter([column_indexes[field] for field in template.fields])
+            for template in self.templates
+        ]
+
+
+def merge_records(rows, mappings, headers=None):
+    """Lazily merges rows into output value tuples ordered as the keys of the given mappings"""
+    return RecordMerger(mappings).merge(rows, headers)
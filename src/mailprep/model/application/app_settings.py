@@ -2,6 +2,7 @@ import re
 
 class AppSettings:
 
+    @staticmethod
     def get_input_file_types():
         return [
             {
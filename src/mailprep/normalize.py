@@ -0,0 +1,142 @@
+"""Bulk text normalization of output values (case, accents, whitespace and punctuation)"""
+import string
+import unicodedata
+
+from utils.mapping import KEY_NORMAL_FORM
+
+
+# Joins the values of a batch so every step runs once over the whole batch. Not whitespace or
+# punctuation, so no step changes it (values containing it are normalized one at a time).
+SEPARATOR = '\0'
+# Whitespace str.split (and so normalize_key) collapses, all within the first 0x3001 characters
+WHITESPACE = [code for code in range(0x3001) if chr(code).isspace() and code != ord(' ')]
+
+# Removed as USPS Publication 28 recommends, e.g. "N. O'Neil St." -> "N ONeil St"
+REMOVED_PUNCTUATION = ".'`"
+# Kept as USPS addresses use them, e.g. "123-45 1/2 Main St Apt #4", "AT&T"
+KEPT_PUNCTUATION = '-/#&'
+# Unicode punctuation replaced by its ASCII equivalent before the rules above apply
+UNICODE_PUNCTUATION = {
+    '‘': "'", '’': "'", '‚': "'", '′': "'", '“': '"', '”': '"', '„': '"', '″': '"',
+    '‐': '-', '‑': '-', '‒': '-', '–': '-', '—': '-', '−': '-', '⁄': '/',
+}
+# Letters without a decomposition into a base letter and accents
+UNDECOMPOSED_LETTERS = {
+    'æ': 'ae', 'Æ': 'AE', 'œ': 'oe', 'Œ': 'OE', 'ø': 'o', 'Ø': 'O', 'ł': 'l', 'Ł': 'L', 'đ': 'd',
+    'Đ': 'D', 'ħ': 'h', 'Ħ': 'H', 'ı': 'i', 'þ': 'th', 'Þ': 'TH', 'ð': 'd', 'Ð': 'D',
+}
+# Blocks of combining characters (accents once decomposed)
+COMBINING_RANGES = [(0x0300, 0x0370), (0x1AB0, 0x1B00), (0x1DC0, 0x1E00), (0x20D0, 0x2100),
+                     (0xFE20, 0xFE30)]
+
+
+def _punctuation_table():
+    table = {ord(character): ' ' for character in string.punctuation}
+    table.update((ord(character), None) for character in REMOVED_PUNCTUATION)
+    for character in KEPT_PUNCTUATION:
+        del table[ord(character)]
+    # Other control characters become spaces too
+    table.update((code, ' ') for code in range(32) if chr(code) != SEPARATOR)
+    table[0x7F] = ' '
+    for character, replacement in UNICODE_PUNCTUATION.items():
+        table[ord(character)] = table.get(ord(replacement), replacement)
+    return table
+
+
+def _accent_table():
+    table = {
+        code: None
+        for start, end in COMBINING_RANGES for code in range(start, end)
+        if unicodedata.combining(chr(code))
+    }
+    table.update(
+        (ord(character), replacement) for character, replacement in UNDECOMPOSED_LETTERS.items())
+    return table
+
+
+# Removes accents of text decomposed in KEY_NORMAL_FORM and replaces undecomposed letters
+ACCENT_TABLE = _accent_table()
+
+
+class TextNormalizer:
+    """Normalizes lists of values, e.g. a block of a record store column, in a few bulk steps
+
+    The values are joined into one string, so decomposing accents (in the KEY_NORMAL_FORM used
+    by utils.mapping.normalize_key), one translate table removing accents, cleaning up
+    punctuation and turning whitespace into spaces, case conversion and collapsing spaces each
+    take one call per batch instead of a chain of calls per value. Values are also stripped if
+    whitespace is collapsed.
+    """
+
+    def __init__(self, upper=True, strip_accents=True, clean_punctuation=True,
+                 collapse_whitespace=True):
+        self.upper = upper
+        self.strip_accents = strip_accents
+        self.clean_punctuation = clean_punctuation
+        self.collapse_whitespace = collapse_whitespace
+        self.table = {}
+        if strip_accents:
+            self.table.update(ACCENT_TABLE)
+        if collapse_whitespace:
+            self.table.update(dict.fromkeys(WHITESPACE, ' '))
+        if clean_punctuation:
+            self.table.update(_punctuation_table())
+
+    def normalize(self, value):
+        """Returns a single normalized value"""
+        return self._normalize_text(value.replace(SEPARATOR, ' '))
+
+    def normalize_values(self, values):
+        """Returns the list of normalized values"""
+        if not (self.table or self.collapse_whitespace):
+            # Nothing to batch, one call per value is cheaper than joining and splitting
+            return list(map(str.upper, values)) if self.upper else list(values)
+        is_ascii = [value.isascii() for value in values]
+        if all(is_ascii) or not any(is_ascii):
+            return self._normalize_batch(values)
+        # Translating is only fast on ASCII text, so other values are normalized separately
+        ascii_values = iter(self._normalize_batch(
+            [value for value, value_is_ascii in zip(values, is_ascii) if value_is_ascii]))
+        other_values = iter(self._normalize_batch(
+            [value for value, value_is_ascii in zip(values, is_ascii) if not value_is_ascii]))
+        return [
+            next(ascii_values) if value_is_ascii else next(other_values)
+            for value_is_ascii in is_ascii
+        ]
+
+    def _normalize_batch(self, values):
+        if not values:
+            return []
+        text = SEPARATOR.join(values)
+        if text.count(SEPARATOR) != len(values) - 1:
+            return [self.normalize(value) for value in values]
+        return self._normalize_text(text).split(SEPARATOR)
+
+    def _normalize_text(self, text):
+        if self.strip_accents and not text.isascii():
+            text = unicodedata.normalize(KEY_NORMAL_FORM, text)
+        if self.table:
+            text = text.translate(self.table)
+        if self.upper:
+            text = text.upper()
+        if self.collapse_whitespace:
+            # The translate table turned other whitespace into spaces. Replacing is much faster
+            # than a regular expression, and halves runs of spaces each time.
+            while '  ' in text:
+                text = text.replace('  ', ' ')
+            text = text.replace(' ' + SEPARATOR, SEPARATOR).replace(SEPARATOR + ' ', SEPARATOR)
+            text = text.strip(' ')
+        return text
+
+    def __repr__(self):
+        return (
+            f'<TextNormalizer(upper={self.upper}, strip_accents={self.strip_accents}, '
+            f'clean_punctuation={self.clean_punctuation}, '
+            f'collapse_whitespace={self.collapse_whitespace})>')
+
+
+# Normalizer of the 'Normalize Text' job property, for USPS style output
+usps_normalizer = TextNormalizer()
+# Normalizer of the 'Convert To Upper' job property
+upper_case_normalizer = TextNormalizer(
+    strip_accents=False, clean_punctuation=False, collapse_whitespace=False)
@@ -0,0 +1,268 @@
+"""Memory-mapped columnar store of merged records for jobs making several passes over them"""
+import os
+import sys
+import mmap
+import json
+import array
+import struct
+import itertools
+import collections
+
+
+MAGIC = b'MPRS'
+FORMAT_VERSION = 1
+# Records per block, each block holds every column of its records
+BLOCK_ROWS = 64 * 1024
+
+HEADER = struct.Struct('<4sI')  # Magic, format version
+TRAILER = struct.Struct('<Q4s')  # File position of the JSON footer, magic
+ALIGNMENT = 8
+
+# Location of one column of a block: offsets array (row count + 1 character offsets into the
+# column's text) and the UTF-8 encoded text of all its values concatenated
+ColumnSegment = collections.namedtuple(
+    'ColumnSegment', ['typecode', 'offsets_position', 'text_position', 'text_size'])
+RecordBlock = collections.namedtuple('RecordBlock', ['row_count', 'columns'])
+
+
+class RecordStoreError(Exception):
+    """Raised when a record store file cannot be read"""
+
+
+def _encode_column(values):
+    """Returns (typecode, offsets bytes, text bytes) of a column of string values"""
+    text = ''.join(values)
+    typecode = 'I' if len(text) < 2 ** 32 else 'Q'
+    offsets = array.array(typecode, [0])
+    offsets.extend(itertools.accumulate(map(len, values)))
+    return typecode, offsets.tobytes(), text.encode('utf-8')
+
+
+class RecordStoreWriter:
+    """Writes records to a new record store file in blocks of block_rows records
+
+    Records are sequences of strings with a value for each field. The file is written to a
+    temporary path and only replaces path when closed without an error.
+    """
+
+    def __init__(self, path, fields, block_rows=BLOCK_ROWS):
+        self.path = path
+        self.fields = list(fields)
+        self.block_rows = block_rows
+        self.row_count = 0
+        self.blocks = []
+        self._rows = []
+        self._temp_path = f'{path}.tmp'
+        self._file = open(self._temp_path, 'wb')
+        self._file.write(HEADER.pack(MAGIC, FORMAT_VERSION))
+
+    def write_rows(self, rows):
+        """Appends records, writing a block each time block_rows records are pending"""
+        self._rows.extend(rows)
+        while len(self._rows) >= self.block_rows:
+            block_rows, self._rows = self._rows[:self.block_rows], self._rows[self.block_rows:]
+            self._write_rows_block(block_rows)
+
+    def _write_rows_block(self, rows):
+        columns = list(zip(*rows)) if rows else []
+        if len(columns) != len(self.fields):
+            raise ValueError(f'Records have {len(columns)} values, expected {len(self.fields)}')
+        self._write_block(len(rows), [_encode_column(column) for column in columns])
+
+    def write_block(self, row_count, encoded_columns):
+        """Writes a block of (typecode, offsets bytes, text bytes) columns, e.g. copied unchanged"""
+        self._flush_rows()
+        self._write_block(row_count, encoded_columns)
+
+    def _write_block(self, row_count, encoded_columns):
+        segments = []
+        for typecode, offsets, text in encoded_columns:
+            offsets_position = self._align()
+            self._file.write(offsets)
+            text_position = self._file.tell()
+            self._file.write(text)
+            segments.append(ColumnSegment(typecode, offsets_position, text_position, len(text)))
+        self.blocks.append(RecordBlock(row_count, segments))
+        self.row_count += row_count
+
+    def _flush_rows(self):
+        if self._rows:
+            rows, self._rows = self._rows, []
+            self._write_rows_block(rows)
+
+    def _align(self):
+        position = self._file.tell()
+        padding = -position % ALIGNMENT
+        if padding:
+            self._file.write(b'\0' * padding)
+        return position + padding
+
+    def close(self):
+        """Writes the pending records and the footer, then moves the file into place"""
+        if self._file.closed:
+            return
+        try:
+            self._flush_rows()
+        except BaseException:
+            self.discard()
+            raise
+        footer_position = self._file.tell()
+        footer = {
+            'version': FORMAT_VERSION,
+            'byteorder': sys.byteorder,
+            'fields': self.fields,
+            'blocks': [[block.row_count, [list(segment) for segment in block.columns]]
+                       for block in self.blocks],
+        }
+        self._file.write(json.dumps(footer).encode('utf-8'))
+        self._file.write(TRAILER.pack(footer_position, MAGIC))
+        self._file.close()
+        os.replace(self._temp_path, self.path)
+
+    def discard(self):
+        """Closes and removes the partially written file"""
+        if not self._file.closed:
+            self._file.close()
+            os.remove(self._temp_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.discard()
+
+    def __repr__(self):
+        return f'<RecordStoreWriter(path={self.path!r}, row_count={self.row_count})>'
+
+
+class RecordStore:
+    """Read-only view of a record store file through mmap
+
+    Column values are sliced out of the decoded text of one block at a time using the block's
+    offsets, so scans never parse or merge the source files again, only read the columns they
+    use and hold one block of values in memory.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as store_file:
+            try:
+                self._map = mmap.mmap(store_file.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError as error:  # Empty file
+                raise RecordStoreError(f'Invalid record store {path}: {error}') from error
+        try:
+            footer = self._read_footer()
+        except BaseException:
+            self._map.close()
+            raise
+        self.fields = footer['fields']
+        self.blocks = [
+            RecordBlock(row_count, [ColumnSegment(*segment) for segment in segments])
+            for row_count, segments in footer['blocks']
+        ]
+        self.row_count = sum(block.row_count for block in self.blocks)
+        self.field_indexes = {field: index for index, field in enumerate(self.fields)}
+
+    def _read_footer(self):
+        size = len(self._map)
+        if size < HEADER.size + TRAILER.size:
+            raise RecordStoreError(f'Invalid record store {self.path}: file is truncated')
+        magic, version = HEADER.unpack_from(self._map, 0)
+        footer_position, trailer_magic = TRAILER.unpack_from(self._map, size - TRAILER.size)
+        if magic != MAGIC or trailer_magic != MAGIC:
+            raise RecordStoreError(f'Invalid record store {self.path}: not a record store')
+        if version != FORMAT_VERSION:
+            raise RecordStoreError(f'Unsupported record store version {version} in {self.path}')
+        try:
+            footer = json.loads(self._map[footer_position:size - TRAILER.size])
+        except ValueError as error:
+            raise RecordStoreError(f'Invalid record store {self.path}: {error}') from error
+        if footer.get('byteorder') != sys.byteorder:
+            raise RecordStoreError(f'Record store {self.path} was written on another platform')
+        return footer
+
+    def block_values(self, block, field):
+        """Returns the list of values of a field in a block"""
+        segment = block.columns[self.field_indexes[field]]
+        offsets = array.array(segment.typecode)
+        offsets_end = segment.offsets_position + (block.row_count + 1) * offsets.itemsize
+        # One copy of the offsets, as iterating an array is much faster than a cast memoryview
+        offsets.frombytes(self._map[segment.offsets_position:offsets_end])
+        text_end = segment.text_position + segment.text_size
+        text = str(self._map[segment.text_position:text_end], 'utf-8')
+        return [text[start:end] for start, end in zip(offsets, offsets[1:])]
+
+    def block_bytes(self, block, field):
+        """Returns (typecode, offsets bytes, text bytes) of a field in a block, for copying"""
+        segment = block.columns[self.field_indexes[field]]
+        offsets_size = (block.row_count + 1) * array.array(segment.typecode).itemsize
+        return (
+            segment.typecode,
+            self._map[segment.offsets_position:segment.offsets_position + offsets_size],
+            self._map[segment.text_position:segment.text_position + segment.text_size],
+        )
+
+    def column(self, field):
+        """Generator of all values of a field"""
+        for block in self.blocks:
+            yield from self.block_values(block, field)
+
+    def rows(self, fields=None):
+        """Generator of records as tuples of the values of the given fields (default all)"""
+        fields = self.fields if fields is None else fields
+        for block in self.blocks:
+            yield from zip(*[self.block_values(block, field) for field in fields])
+
+    def map_columns(self, path, functions, block_rows=None):
+        """Writes a new store with the values of some fields replaced, returning its writer
+
+        functions maps field names to functions called with the list of a block's values of the
+        field and returning the list of new values. Other columns are copied without decoding.
+        """
+        unknown_fields = set(functions) - set(self.fields)
+        if unknown_fields:
+            raise KeyError(f'Fields not in record store: {", ".join(sorted(unknown_fields))}')
+        with RecordStoreWriter(path, self.fields, block_rows or BLOCK_ROWS) as writer:
+            for block in self.blocks:
+                writer.write_block(block.row_count, [
+                    _encode_column(functions[field](self.block_values(block, field)))
+                    if field in functions else self.block_bytes(block, field)
+                    for field in self.fields
+                ])
+        return writer
+
+    def with_column(self, path, field, function, input_fields, block_rows=None):
+        """Writes a new store with a field added (or replaced), returning its writer
+
+        function is called with the lists of a block's values of each of input_fields and returns
+        the list of values of the field. Other columns are copied without decoding.
+        """
+        fields = self.fields if field in self.field_indexes else self.fields + [field]
+        with RecordStoreWriter(path, fields, block_rows or BLOCK_ROWS) as writer:
+            for block in self.blocks:
+                input_values = [self.block_values(block, name) for name in input_fields]
+                writer.write_block(block.row_count, [
+                    _encode_column(function(*input_values))
+                    if output_field == field else self.block_bytes(block, output_field)
+                    for output_field in fields
+                ])
+        return writer
+
+    def close(self):
+        """Unmaps the file"""
+        self._map.close()
+
+    def __len__(self):
+        return self.row_count
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __repr__(self):
+        return f'<RecordStore(path={self.path!r}, row_count={self.row_count})>'
@@ -0,0 +1,402 @@
+"""Readers for .xlsx/.xls spreadsheet input files that avoid loading whole workbooks"""
+import os
+import re
+import zipfile
+import datetime
+import posixpath
+import xml.etree.ElementTree as ElementTree
+
+try:
+    import xlrd
+except ImportError:
+    xlrd = None
+
+
+# Namespaces of the transitional (default) and strict flavors of SpreadsheetML
+MAIN_NAMESPACES = (
+    'http://schemas.openxmlformats.org/spreadsheetml/2006/main',
+    'http://purl.oclc.org/ooxml/spreadsheetml/main',
+)
+RELATIONSHIP_NAMESPACES = (
+    'http://schemas.openxmlformats.org/officeDocument/2006/relationships',
+    'http://purl.oclc.org/ooxml/officeDocument/relationships',
+)
+PACKAGE_RELATIONSHIP_NAMESPACE = 'http://schemas.openxmlformats.org/package/2006/relationships'
+
+# Bytes of (decompressed) XML read per block when parsing worksheets in batches of rows
+BATCH_SIZE = 1024 * 1024
+
+DEFAULT_SHEET_PATH = 'xl/worksheets/sheet1.xml'
+SHARED_STRINGS_PATH = 'xl/sharedStrings.xml'
+
+
+class SpreadsheetError(Exception):
+    """Raised when a spreadsheet file cannot be read"""
+
+
+def _local_name(tag):
+    """Returns an element tag without its '{namespace}' prefix"""
+    return tag.rpartition('}')[2]
+
+
+def _column_index(cell_reference):
+    """Converts a cell reference such as 'AB12' to a zero based column index (27)"""
+    column_index = 0
+    for char in cell_reference:
+        if not 'A' <= char <= 'Z':
+            break
+        column_index = column_index * 26 + ord(char) - 64
+    return column_index - 1
+
+
+def _first_sheet_path(archive):
+    """Resolves the archive path of the first worksheet through the workbook relationships"""
+    try:
+        workbook = ElementTree.fromstring(archive.read('xl/workbook.xml'))
+        relationships = ElementTree.fromstring(archive.read('xl/_rels/workbook.xml.rels'))
+    except KeyError:
+        return DEFAULT_SHEET_PATH
+    sheet_id = None
+    for element in workbook.iter():
+        if _local_name(element.tag) == 'sheet':
+            for namespace in RELATIONSHIP_NAMESPACES:
+                sheet_id = element.get(f'{{{namespace}}}id')
+                if sheet_id is not None:
+                    break
+            break
+    for relationship in relationships.iter(f'{{{PACKAGE_RELATIONSHIP_NAMESPACE}}}Relationship'):
+        if relationship.get('Id') == sheet_id:
+            target = relationship.get('Target')
+            if target.startswith('/'):
+                return target.lstrip('/')
+            return posixpath.normpath(posixpath.join('xl', target))
+    return DEFAULT_SHEET_PATH
+
+
+def _text_content(element, namespace):
+    """Joins the text runs of a shared or inline string element (skipping phonetic runs)"""
+    text_tag = f'{{{namespace}}}t'
+    phonetic_tag = f'{{{namespace}}}rPh'
+    parts = []
+    for child in element:
+        if child.tag == text_tag:
+            parts.append(child.text or '')
+        elif child.tag != phonetic_tag:
+            parts.extend(run.text or '' for run in child.iter(text_tag))
+    return ''.join(parts)
+
+
+def _read_shared_strings(archive, count=None):
+    """Reads the shared strings table, stopping after count strings if given
+
+    The whole table is parsed in batches; a limited count is read element by element as only
+    the start of the table is needed.
+    """
+    shared_strings = []
+    if SHARED_STRINGS_PATH not in archive.namelist():
+        return shared_strings
+    if count is None:
+        with archive.open(SHARED_STRINGS_PATH) as shared_strings_file:
+            for table in _iter_element_batches(shared_strings_file, b'sst', b'si'):
+                namespace = table.tag[1:].partition('}')[0]
+                shared_strings.extend(_text_content(item, namespace) for item in table)
+        return shared_strings
+    with archive.open(SHARED_STRINGS_PATH) as shared_strings_file:
+        namespace = None
+        for event, element in ElementTree.iterparse(shared_strings_file, events=('start', 'end')):
+            if event == 'start':
+                if namespace is None:
+                    namespace = element.tag[1:].partition('}')[0]
+                continue
+            if element.tag == f'{{{namespace}}}si':
+                shared_strings.append(_text_content(element, namespace))
+                element.clear()
+                if count is not None and len(shared_strings) >= count:
+                    break
+    return shared_strings
+
+
+def _first_row_cells(archive, sheet_path):
+    """Returns (namespace, [(column index, cell type, cell element)]) for the sheet's first row"""
+    with archive.open(sheet_path) as sheet_file:
+        namespace = None
+        for event, element in ElementTree.iterparse(sheet_file, events=('start', 'end')):
+            if event == 'start':
+                if namespace is None:
+                    namespace = element.tag[1:].partition('}')[0]
+                continue
+            if element.tag == f'{{{namespace}}}row':
+                cells = []
+                for position, cell in enumerate(element.iter(f'{{{namespace}}}c')):
+                    reference = cell.get('r')
+                    column_index = position if reference is None else _column_index(reference)
+                    cells.append((column_index, cell.get('t'), cell))
+                return namespace, cells
+    return namespace, []
+
+
+def read_xlsx_header(path):
+    """Reads only the first row of the first worksheet of an .xlsx file as a list of strings"""
+    try:
+        with zipfile.ZipFile(path) as archive:
+            namespace, cells = _first_row_cells(archive, _first_sheet_path(archive))
+            value_tag = f'{{{namespace}}}v'
+            shared_indexes = [
+                int(cell.findtext(value_tag)) for _, cell_type, cell in cells if cell_type == 's'
+            ]
+            # Only the shared strings up to the last one used by the header are parsed
+            shared_strings = _read_shared_strings(
+                archive, max(shared_indexes) + 1) if shared_indexes else []
+    except (zipfile.BadZipFile, KeyError, ValueError, ElementTree.ParseError) as error:
+        raise SpreadsheetError(f'Unable to read header of {path}: {error}') from error
+
+    header = [''] * (cells[-1][0] + 1 if cells else 0)
+    for column_index, cell_type, cell in cells:
+        if cell_type == 's':
+            value = shared_strings[int(cell.findtext(value_tag))]
+        elif cell_type == 'inlineStr':
+            inline_string = cell.find(f'{{{namespace}}}is')
+            value = '' if inline_string is None else _text_content(inline_string, namespace)
+        else:
+            value = cell.findtext(value_tag) or ''
+        header[column_index] = value
+    return header
+
+
+def _start_tag_pattern(local_name):
+    """Returns a bytes pattern matching a start tag with any prefix, capturing prefix and '/'"""
+    return re.compile(rb'<(?:([A-Za-z_][\w.-]*):)?' + local_name + rb'(?=[\s/>])[^>]*?(/?)>')
+
+
+def _end_tag(match, local_name):
+    """Returns the end tag of a start tag matched by a _start_tag_pattern"""
+    prefix = match.group(1) + b':' if match.group(1) else b''
+    return b'</' + prefix + local_name + b'>'
+
+
+def _iter_element_batches(xml_file, container_name, item_name, root_name=None):
+    """Generator of container elements each holding a batch of complete item elements
+
+    Instead of handling parser events for every element in Python, the raw XML is split after
+    the last complete item in every BATCH_SIZE block read, and each batch of items is parsed in
+    one ElementTree.fromstring call wrapped in copies of the original root and container start
+    tags (so namespace declarations still apply). Memory use is bounded by the batch size.
+    """
+    head = b''
+    container_pattern = _start_tag_pattern(container_name)
+    while True:
+        block = xml_file.read(BATCH_SIZE)
+        head += block
+        container_match = container_pattern.search(head)
+        if container_match is not None or not block:
+            break
+    if container_match is None:
+        raise SpreadsheetError('Unrecognized spreadsheet XML (container element not found)')
+    if container_match.group(2):
+        return  # Self closing (empty) container
+
+    opening = container_match.group(0)
+    container_end = _end_tag(container_match, container_name)
+    closing = container_end
+    if root_name is not None:
+        root_match = _start_tag_pattern(root_name).search(head, 0, container_match.start())
+        if root_match is None:
+            raise SpreadsheetError('Unrecognized spreadsheet XML (root element not found)')
+        opening = root_match.group(0) + opening
+        closing += _end_tag(root_match, root_name)
+    item_end = _end_tag(container_match, item_name)
+
+    buffer = head[container_match.end():]
+    while True:
+        end_index = buffer.find(container_end)
+        if end_index >= 0:
+            items, buffer = buffer[:end_index], None
+        else:
+            split_index = buffer.rfind(item_end)
+            if split_index >= 0:
+                split_index += len(item_end)
+                items, buffer = buffer[:split_index], buffer[split_index:]
+            else:
+                items = None
+        if items:
+            root = ElementTree.fromstring(opening + items + closing)
+            yield root if root_name is None else root[0]
+        if buffer is None:
+            return
+        block = xml_file.read(BATCH_SIZE)
+        if not block:
+            raise SpreadsheetError('Unexpected end of spreadsheet XML')
+        buffer += block
+
+
+def _iter_xlsx_rows(path):
+    """Generator of all rows (header included) of the first worksheet as tuples of strings
+
+    The worksheet is decompressed and parsed in batches of rows, so memory use is bounded by
+    the shared strings table and one batch no matter the sheet size. Empty rows are skipped and
+    gaps between cells filled with ''.
+    """
+    try:
+        with zipfile.ZipFile(path) as archive:
+            sheet_path = _first_sheet_path(archive)
+            shared_strings = _read_shared_strings(archive)
+            with archive.open(sheet_path) as sheet_file:
+                column_indexes = {}  # Column index by column letters of cell references
+                for sheet_data in _iter_element_batches(
+                        sheet_file, b'sheetData', b'row', b'worksheet'):
+                    namespace = sheet_data.tag[1:].partition('}')[0]
+                    cell_tag = f'{{{namespace}}}c'
+                    value_tag = f'{{{namespace}}}v'
+                    inline_string_tag = f'{{{namespace}}}is'
+                    for row in sheet_data:
+                        values = []
+                        for cell in row:  # Direct iteration, iterfind goes through ElementPath
+                            if cell.tag != cell_tag:
+                                continue
+                            reference = cell.get('r')
+                            if reference is not None:
+                                letters = reference.rstrip('0123456789')
+                                column_index = column_indexes.get(letters)
+                                if column_index is None:
+                                    column_index = column_indexes[letters] = _column_index(letters)
+                                if column_index > len(values):
+                                    values.extend([''] * (column_index - len(values)))
+                            cell_type = cell.get('t')
+                            if cell_type == 's':
+                                value = shared_strings[int(cell.findtext(value_tag))]
+                            elif cell_type == 'inlineStr':
+                                inline_string = cell.find(inline_string_tag)
+                                value = (
+                                    '' if inline_string is None
+                                    else _text_content(inline_string, namespace))
+                            else:
+                                value = cell.findtext(value_tag) or ''
+                            values.append(value)
+                        if values:
+                            yield tuple(values)
+    except (zipfile.BadZipFile, KeyError, ValueError, IndexError, ElementTree.ParseError) as error:
+        raise SpreadsheetError(f'Unable to read {path}: {error}') from error
+
+
+def read_xlsx_rows(path):
+    """Streams the first worksheet of an .xlsx file as (headers, iterator of row tuples)
+
+    Rows are tuples of strings (numbers as stored, e.g. '53706' or '1.5'), padded with '' to
+    the length of the header row.
+    """
+    rows = _iter_xlsx_rows(path)
+    headers = list(next(rows, ()))
+    return headers, _pad_rows(rows, len(headers))
+
+
+def _pad_rows(rows, column_count):
+    """Pads rows shorter than column_count with '' so columns can be indexed by header"""
+    padding = ('',) * column_count
+    for row in rows:
+        if len(row) < column_count:
+            row += padding[len(row):]
+        yield row
+
+
+def read_xls_header(path):
+    """Reads the first row of the first sheet of a legacy .xls file (requires xlrd)"""
+    if xlrd is None:
+        raise SpreadsheetError(f'Reading {path} requires xlrd for .xls files (pip install xlrd)')
+    try:
+        workbook = xlrd.open_workbook(path, on_demand=True)
+        try:
+            sheet = workbook.sheet_by_index(0)
+            if sheet.nrows == 0:
+                return []
+            return _xls_row_text(sheet, 0, workbook.datemode)
+        finally:
+            workbook.release_resources()
+    except xlrd.XLRDError as error:
+        raise SpreadsheetError(f'Unable to read header of {path}: {error}') from error
+
+
+def read_xls_rows(path):
+    """Reads the first sheet of a legacy .xls file as (headers, iterator of row tuples)"""
+    if xlrd is None:
+        raise SpreadsheetError(f'Reading {path} requires xlrd for .xls files (pip install xlrd)')
+    try:
+        workbook = xlrd.open_workbook(path, on_demand=True)
+        sheet = workbook.sheet_by_index(0)
+    except xlrd.XLRDError as error:
+        raise SpreadsheetError(f'Unable to read {path}: {error}') from error
+    if sheet.nrows == 0:
+        workbook.release_resources()
+        return [], iter(())
+    headers = _xls_row_text(sheet, 0, workbook.datemode)
+    return headers, _iter_xls_rows(workbook, sheet)
+
+
+def _iter_xls_rows(workbook, sheet):
+    try:
+        for row_index in range(1, sheet.nrows):
+            yield tuple(_xls_row_text(sheet, row_index, workbook.datemode))
+    finally:
+        workbook.release_resources()
+
+
+def _xls_row_text(sheet, row_index, datemode):
+    """Returns the values of a row of an xlrd sheet as strings, like the .xlsx reader's
+
+    xlrd returns every number as a float, so integral numbers (e.g. zip codes) are written
+    without a fraction, and dates as ISO dates (with the time if it is not midnight).
+    """
+    values = []
+    for cell_type, value in zip(sheet.row_types(row_index), sheet.row_values(row_index)):
+        if cell_type == xlrd.XL_CELL_TEXT:
+            values.append(value)
+        elif cell_type == xlrd.XL_CELL_NUMBER:
+            values.append(str(int(value)) if value.is_integer() else str(value))
+        elif cell_type == xlrd.XL_CELL_DATE:
+            values.append(_xls_date_text(value, datemode))
+        elif cell_type == xlrd.XL_CELL_BOOLEAN:
+            values.append(str(int(value)))
+        elif cell_type == xlrd.XL_CELL_ERROR:
+            values.append(xlrd.error_text_from_code.get(value, ''))
+        else:  # Empty or blank
+            values.append('')
+    return values
+
+
+def _xls_date_text(value, datemode):
+    try:
+        date_time = xlrd.xldate.xldate_as_datetime(value, datemode)
+    except (xlrd.xldate.XLDateError, OverflowError, ValueError):
+        return str(int(value)) if float(value).is_integer() else str(value)
+    if date_time.time() == datetime.time():
+        return date_time.date().isoformat()
+    return date_time.isoformat(sep=' ')
+
+
+# Row readers by lower case file extension, returning (headers, iterator of row tuples)
+row_readers = {
+    '.xlsx': read_xlsx_rows,
+    '.xls': read_xls_rows,
+}
+
+
+def read_rows(path):
+    """Reads the rows of a spreadsheet file, choosing the reader by file extension"""
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in row_readers:
+        raise SpreadsheetError(f'Unsupported spreadsheet type: {path}')
+    return row_readers[extension](path)
+
+
+# Header readers by lower case file extension
+header_readers = {
+    '.xlsx': read_xlsx_header,
+    '.xls': read_xls_header,
+}
+
+
+def read_header(path):
+    """Reads the header row of a spreadsheet file, choosing the reader by file extension"""
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in header_readers:
+        raise SpreadsheetError(f'Unsupported spreadsheet type: {path}')
+    return header_readers[extension](path)
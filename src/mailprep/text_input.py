@@ -0,0 +1,202 @@
+"""Chunked readers for delimited (CSV/TSV) and fixed-width text input files"""
+import os
+import csv
+import codecs
+import itertools
+import collections
+
+from mailprep.spreadsheet import SpreadsheetError
+
+
+# Bytes read from the start of a file to detect its encoding and layout
+SAMPLE_SIZE = 64 * 1024
+# Buffer size of the binary file under the text decoder, so large files take few reads
+CHUNK_SIZE = 1024 * 1024
+# Rows per batch yielded by read_text_batches
+DEFAULT_BATCH_SIZE = 10000
+
+# Delimiters considered when sniffing files that are not tab separated by extension
+DELIMITERS = ',\t|;'
+# Minimum sample lines for a file without delimiters to be read as fixed-width columns
+MIN_FIXED_WIDTH_LINES = 2
+
+# Checked in order, the UTF-8 BOM is not a prefix of the UTF-16 ones
+BOM_ENCODINGS = [
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+]
+
+TAB_SEPARATED_EXTENSIONS = frozenset(['.tsv', '.tab'])
+
+# Layout of a text file: a csv dialect for delimited files, or else (start, end) offsets of
+# fixed-width columns (end is None for the last column, which runs to the end of the line)
+TextFormat = collections.namedtuple('TextFormat', ['encoding', 'dialect', 'columns'])
+
+
+def detect_encoding(sample):
+    """Returns the encoding of a file from a sample of its first bytes
+
+    Files with a byte order mark are UTF-8 or UTF-16, otherwise UTF-8 is used if the sample
+    decodes as UTF-8, else Windows-1252 as saved by Excel on US systems (or Latin-1 for the
+    few bytes undefined in Windows-1252).
+    """
+    for bom, encoding in BOM_ENCODINGS:
+        if sample.startswith(bom):
+            return encoding
+    try:
+        sample.decode('utf-8')
+        return 'utf-8'
+    except UnicodeDecodeError as error:
+        # A sample cut off within a multi-byte character is still UTF-8
+        if error.reason == 'unexpected end of data' and error.start >= len(sample) - 3:
+            return 'utf-8'
+    try:
+        sample.decode('cp1252')
+        return 'cp1252'
+    except UnicodeDecodeError:
+        return 'latin-1'
+
+
+def detect_fixed_width_columns(lines):
+    """Returns (start, end) offsets of columns separated by character positions blank in all lines
+
+    Each column runs up to the start of the next, so values are stripped of the padding
+    after them. Returns an empty list if the lines cannot be split into more than one column.
+    """
+    width = max((len(line) for line in lines), default=0)
+    is_blank = [True] * width
+    for line in lines:
+        for position, character in enumerate(line):
+            if is_blank[position] and not character.isspace():
+                is_blank[position] = False
+    starts = [
+        position for position in range(width)
+        if not is_blank[position] and (position == 0 or is_blank[position - 1])
+    ]
+    if len(starts) < 2:
+        return []
+    return list(zip(starts, starts[1:] + [None]))
+
+
+def _sample_lines(sample, encoding):
+    """Returns the non-blank complete lines of a sample"""
+    text = codecs.getincrementaldecoder(encoding)('replace').decode(sample)
+    lines = text.splitlines()
+    if len(sample) >= SAMPLE_SIZE and lines:
+        lines.pop()  # Cut off by the sample size
+    return [line for line in lines if line.strip()]
+
+
+def detect_format(path, encoding=None):
+    """Detects the TextFormat of a file from a sample of SAMPLE_SIZE bytes
+
+    Tab separated extensions always use tabs, other files are sniffed for a delimiter. Files
+    without one are read as fixed-width columns if their lines line up, except .csv files,
+    which fall back to commas like Excel.
+    """
+    with open(path, 'rb') as text_file:
+        sample = text_file.read(SAMPLE_SIZE)
+    encoding = encoding or detect_encoding(sample)
+    extension = os.path.splitext(path)[1].lower()
+    if extension in TAB_SEPARATED_EXTENSIONS:
+        return TextFormat(encoding, csv.excel_tab, None)
+
+    lines = _sample_lines(sample, encoding)
+    if not lines:
+        return TextFormat(encoding, csv.excel, None)
+    try:
+        dialect = csv.Sniffer().sniff('\n'.join(lines), delimiters=DELIMITERS)
+    except csv.Error:
+        dialect = None
+    if dialect is not None:
+        return TextFormat(encoding, dialect, None)
+    if extension != '.csv' and len(lines) >= MIN_FIXED_WIDTH_LINES:
+        columns = detect_fixed_width_columns(lines)
+        if columns:
+            return TextFormat(encoding, None, columns)
+    return TextFormat(encoding, csv.excel, None)
+
+
+def _open_text(path, encoding):
+    return open(path, newline='', encoding=encoding, buffering=CHUNK_SIZE)
+
+
+def _fixed_width_rows(text_file, columns):
+    """Generator of non-blank lines split at fixed-width column offsets into stripped values"""
+    slices = [slice(start, end) for start, end in columns]
+    for line in text_file:
+        if line.strip():
+            yield tuple([line[column].strip() for column in slices])
+
+
+def _delimited_rows(text_file, dialect):
+    """Generator of non-blank rows of a delimited file as tuples"""
+    for row in csv.reader(text_file, dialect):
+        if row:
+            yield tuple(row)
+
+
+def _open_rows(path, text_format):
+    """Opens a file, returning it and a generator of its row tuples"""
+    text_file = _open_text(path, text_format.encoding)
+    if text_format.columns is not None:
+        return text_file, _fixed_width_rows(text_file, text_format.columns)
+    return text_file, _delimited_rows(text_file, text_format.dialect)
+
+
+def read_text_header(path, text_format=None):
+    """Reads the header row of a delimited or fixed-width text file"""
+    text_format = text_format or detect_format(path)
+    try:
+        text_file, rows = _open_rows(path, text_format)
+        with text_file:
+            return list(next(rows, ()))
+    except (csv.Error, UnicodeDecodeError) as error:
+        raise SpreadsheetError(f'Unable to read header of {path}: {error}') from error
+
+
+def read_text_batches(path, batch_size=DEFAULT_BATCH_SIZE, text_format=None):
+    """Reads a text file as (headers, iterator of lists of at most batch_size row tuples)
+
+    The format is detected from a sample if not given. Rows are tuples of strings padded with ''
+    to the length of the header row, and blank lines are skipped. Batches are the row lists
+    merged by RecordMerger (or transposed into column arrays by columnar.load_columns).
+    """
+    text_format = text_format or detect_format(path)
+    text_file, rows = _open_rows(path, text_format)
+    try:
+        headers = list(next(rows, ()))
+    except (csv.Error, UnicodeDecodeError) as error:
+        text_file.close()
+        raise SpreadsheetError(f'Unable to read {path}: {error}') from error
+    except BaseException:
+        text_file.close()
+        raise
+    return headers, _iter_batches(path, text_file, rows, len(headers), batch_size)
+
+
+def _iter_batches(path, text_file, rows, column_count, batch_size):
+    padding = ('',) * column_count
+    with text_file:
+        try:
+            while True:
+                batch = list(itertools.islice(rows, batch_size))
+                if not batch:
+                    return
+                for index, row in enumerate(batch):
+                    if len(row) < column_count:
+                        batch[index] = row + padding[len(row):]
+                yield batch
+        except (csv.Error, UnicodeDecodeError) as error:
+            raise SpreadsheetError(f'Unable to read {path}: {error}') from error
+
+
+def read_text_rows(path):
+    """Reads a text file as (headers, iterator of row tuples), reading rows in batches"""
+    headers, batches = read_text_batches(path)
+    return headers, itertools.chain.from_iterable(batches)
+
+
+# Text file extensions read by this module (lower case)
+text_file_extensions = frozenset(['.csv', '.tsv', '.tab', '.txt', '.prn'])
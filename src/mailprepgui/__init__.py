@@ -1,12 +1,12 @@
-"""User inputs data for a bulk mail job and processing is automated"""
+"""User inputs data for a bulk mail job and processing is automated
+
+Qt and the views are only imported by main, so importing models (e.g. job settings) of this
+package does not load PySide2.
+"""
 import sys
 import logging
-import queue
-from PySide2.QtWidgets import QApplication
-from mailprepgui.view.mainwindow import MainWindow
-from mailprepgui.controller.mainwindow_controller import MainWindowController
-from mailprepgui.controller.settings_manager import SettingsManager
-from mailprepgui.controller.std_stream_monitor import QueueStream
+import argparse
+from utils.startup_profiler import StartupProfiler
 
 
 # pylint: disable = fixme
@@ -17,6 +17,7 @@ from mailprepgui.controller.std_stream_monitor import QueueStream
 
 def setup_std_stream_queue(std_stream_queue):
     """Given a queue, redirect stdout and stderr to write to the queue"""
+    from mailprepgui.controller.std_stream_monitor import QueueStream
     stdout_original = sys.stdout
     stderr_original = sys.stderr
     sys.stdout = QueueStream(std_stream_queue, stdout_original.flush)
@@ -37,28 +38,71 @@ def setup_logger(level):
     log.addHandler(stdout_handler)
 
 
+def parse_args(argv):
+    """Parses the application's own arguments, returning (namespace, remaining Qt arguments)"""
+    parser = argparse.ArgumentParser(prog='mailprep', description=__doc__.splitlines()[0])
+    parser.add_argument(
+        '--profile-startup', action='store_true',
+        help='Write timings of startup phases and imports to stderr once the window is shown')
+    return parser.parse_known_args(argv[1:])
+
+
 def main():
     """Entry point for running the interface from the command line"""
-    # First setup redirect from stdout and stderr to a queue for multi-threading purposes
-    std_stream_queue = queue.Queue()
-    setup_std_stream_queue(std_stream_queue)
-
-    # Set up default global logger
-    setup_logger(logging.DEBUG)
-
-    # Set up Qt settings manager for global application settings
-    SettingsManager.set_application_values(
-        application="MailPrep",
-        organization="UW-Madison Postal Mail",
-        domain="postalmail.wisc.edu"
-    )
-
-    # Init and show interface
-    app = QApplication(sys.argv)
-    app.setStyle('fusion')
-    main_window = MainWindow()
-    main_controller = MainWindowController(main_window, std_stream_queue)
-    main_window.show()
-    app.aboutToQuit.connect(main_controller.destroy.emit)  # pylint: disable = no-member
+    args, qt_args = parse_args(sys.argv)
+    profiler = StartupProfiler(enabled=args.profile_startup)
+    profiler.start_import_trace()
+    report_stream = sys.stderr  # Before it is redirected to the output window
+
+    # pylint: disable = import-outside-toplevel
+    with profiler.phase('import Qt and views'):
+        import queue
+        from PySide2.QtCore import QTimer
+        from PySide2.QtWidgets import QApplication
+        from mailprepgui.view.mainwindow import MainWindow
+        from mailprepgui.controller.mainwindow_controller import MainWindowController
+        from mailprepgui.controller.settings_manager import SettingsManager
+    # pylint: enable = import-outside-toplevel
+
+    with profiler.phase('redirect output and set up logging'):
+        # First setup redirect from stdout and stderr to a queue for multi-threading purposes
+        std_stream_queue = queue.Queue()
+        setup_std_stream_queue(std_stream_queue)
+
+        # Set up default global logger
+        setup_logger(logging.DEBUG)
+
+    with profiler.phase('create QApplication'):
+        # Set up Qt settings manager for global application settings
+        SettingsManager.set_application_values(
+            application="MailPrep",
+            organization="UW-Madison Postal Mail",
+            domain="postalmail.wisc.edu"
+        )
+        app = QApplication(sys.argv[:1] + qt_args)
+        app.setStyle('fusion')
+
+    with profiler.phase('create main window and controller'):
+        main_window = MainWindow()
+        main_controller = MainWindowController(main_window, std_stream_queue)
+        app.aboutToQuit.connect(main_controller.destroy.emit)  # pylint: disable = no-member
+
+    # Show the window first, remaining work runs once the event loop handled its first paint
+    show_start = profiler.clock()
+
+    def finish_startup():
+        with profiler.phase('restore window state'):
+            main_window.restore_window_settings()
+        with profiler.phase('start background workers'):
+            main_controller.start_background_workers()
+        profiler.write_report(report_stream)
+
+    def on_first_paint():
+        profiler.record('first paint', show_start)
+        QTimer.singleShot(0, finish_startup)
+
+    main_window.first_painted.connect(on_first_paint)  # pylint: disable = no-member
+    with profiler.phase('show main window'):
+        main_window.show()
 
     sys.exit(app.exec_())
@@ -0,0 +1,100 @@
+"""Debounced background saving of the open job's settings"""
+import logging
+from PySide2.QtCore import QObject, QTimer, Slot
+from mailprepgui.model.settings.job_settings import write_text_atomic
+
+
+log = logging.getLogger(__name__)
+
+
+# Quiet period after the last property change before the job is saved
+AUTOSAVE_DELAY_MSECS = 2000
+
+
+def write_job_settings(context, job_settings_path, text):  # pylint: disable = unused-argument
+    """TaskScheduler task atomically writing serialized job settings"""
+    write_text_atomic(job_settings_path, text)
+
+
+class JobAutosaver(QObject):
+    """Saves a JobManager's settings on the task scheduler once its properties stop changing
+
+    Settings are serialized on the GUI thread (only changed sections, see JobSettings.serialize)
+    and written by a background task, at most one at a time.
+    """
+
+    def __init__(self, job, task_scheduler, delay_msecs=AUTOSAVE_DELAY_MSECS, parent=None):
+        super().__init__(parent)
+        self.job = job
+        self.task_scheduler = task_scheduler
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(delay_msecs)
+        self.timer.timeout.connect(self.save)
+        self.pending_save = None
+        self.pending_property_values = None  # Values written by pending_save
+        self.save_again = False
+        self.job.settings_changed.connect(self.schedule)
+
+    @Slot()
+    def schedule(self):
+        """Restarts the debounce timer"""
+        self.timer.start()
+
+    @Slot()
+    def save(self):
+        """Starts a background save, or queues another one if a save is still running"""
+        if self.pending_save is not None:
+            self.save_again = True
+            return
+        self.save_again = False
+        text = self.job.settings.serialize()
+        self.pending_property_values = self.job.property_values()
+        self.pending_save = self.task_scheduler.submit(write_job_settings, self.job.file_path, text)
+        self.pending_save.finished.connect(self.on_save_finished)
+
+    @Slot(object)
+    def on_save_finished(self, task_future):
+        """Marks the saved values once the background save is done and starts a queued save"""
+        if task_future is not self.pending_save:
+            return  # Already waited for by flush
+        self.pending_save = None
+        self.finish_save(task_future)
+        if self.save_again:
+            self.save()
+
+    def finish_save(self, task_future):
+        """Marks the values written by a finished save as saved, or retries a failed save"""
+        if task_future.cancelled():
+            log.warning('Autosave of %s was cancelled', self.job.file_path)
+        elif task_future.exception() is not None:
+            log.error('Autosave of %s failed: %s', self.job.file_path, task_future.exception())
+        else:
+            self.job.mark_saved(self.pending_property_values)
+            return
+        # Saved again once the quiet period passes, or by flush
+        self.timer.start()
+
+    def flush(self):
+        """Saves pending changes synchronously (e.g. on exit), returning if anything was saved
+
+        A running background save is waited for first, so it cannot replace the file written
+        here with older settings.
+        """
+        pending_save, self.pending_save = self.pending_save, None
+        if pending_save is not None:
+            try:
+                pending_save.result()
+            except Exception:  # pylint: disable = broad-except
+                pass  # Logged by finish_save
+            self.finish_save(pending_save)
+        if not self.timer.isActive() and not self.save_again:
+            return False
+        self.timer.stop()
+        self.save_again = False
+        self.job.settings.save_to_path(self.job.file_path)
+        self.job.mark_saved()
+        return True
+
+    def __repr__(self):
+        return f'<JobAutosaver(job={self.job})>'
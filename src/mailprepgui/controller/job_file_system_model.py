@@ -1,41 +1,76 @@
 """Controls logic for the main window"""
 import logging
 import os.path
-import collections
-from PySide2.QtCore import Qt, QModelIndex
+from PySide2.QtCore import Qt, QModelIndex, Slot
 from PySide2.QtWidgets import QFileSystemModel
-from mailprep.model.qt_edit_types import QtEditTypes
-from mailprep.model.qt_user_roles import QtUserRole
+from mailprep.header_index import HeaderIndex
+from mailprepgui.model.qt_edit_types import QtEditTypes
+from mailprepgui.model.qt_user_roles import QtUserRole
+from utils.common import coalesce
 from utils.logging_decorators import log_call
 
 
 log = logging.getLogger(__name__)
 
 
+DEFAULT_FILE_TYPE = 'Normal'
+DEFAULT_LIST_ID = 'UW#001'
+
+
+def file_key(path):
+    """Returns the key of a file in JobFileSystemModel.file_info: its normalized absolute path"""
+    return os.path.normcase(os.path.abspath(path))
+
+
+def scan_header_index(context, directory):
+    """TaskScheduler task loading, updating and saving the header index of a directory"""
+    header_index = HeaderIndex(directory).load()
+    header_index.scan(is_cancelled=context.is_cancelled, report_progress=context.report_progress)
+    header_index.save()
+    return header_index
+
+
 class FileInfo:
 
+    __slots__ = ('selected', 'type', 'list_id', '_initialized')
+
     def __init__(self):
         self.selected = False
         self.type = None
         self.list_id = None
         self._initialized = False
 
-    def set_selected(self, selected):
+    def set_selected(self, selected, detected_type=None):
         self.selected = selected
         if selected and not self._initialized:
             self._initialized = True
-            self.type = 'Normal'
-            self.list_id = 'UW#001'
+            self.type = coalesce(detected_type, DEFAULT_FILE_TYPE)
+            self.list_id = DEFAULT_LIST_ID
+
+
+class RowInfo:  # pylint: disable=too-few-public-methods
+    """Values derived from the file of a model row, cached as they are needed on every repaint"""
+
+    __slots__ = ('file_key', 'file_path', 'is_editable')
+
+    def __init__(self, key, file_path, is_editable):
+        self.file_key = key
+        self.file_path = file_path
+        self.is_editable = is_editable
+
+
+# Cached for rows that are directories (or otherwise not files)
+NOT_A_FILE_ROW = RowInfo(None, None, False)
 
 
 class JobFileSystemModel(QFileSystemModel):
     """File system model to control File List view"""
 
-    # Editable file types
-    editable_file_extensions = [
+    # Editable file types (lower case)
+    editable_file_extensions = frozenset([
         '.xlsx',
         '.xls'
-    ]
+    ])
 
     # Additional columns appened to the end of the list of columns
     additional_columns = [
@@ -43,15 +78,36 @@ class JobFileSystemModel(QFileSystemModel):
         'Type',
         'List ID',
     ]
+    # Editor types of the additional columns
+    additional_column_edit_types = [
+        QtEditTypes.Bool,
+        QtEditTypes.Combo,
+        QtEditTypes.Str,
+    ]
 
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, task_scheduler=None):
         super().__init__(parent)
 
-        self.file_info = collections.defaultdict(FileInfo)
+        # FileInfo by file_key(path) of files that were ever selected, lookups must not add entries
+        self.file_info = {}
+
+        # Number of columns of the base QFileSystemModel, fixed for the model's lifetime
+        self.base_column_count = super().columnCount()
+        # RowInfo by internal id of a row's indexes (shared by all columns of a row)
+        self.row_cache = {}
+        self.directoryLoaded.connect(self.clear_row_cache)
+        self.fileRenamed.connect(self.clear_row_cache)
+        self.rowsRemoved.connect(self.clear_row_cache)
+        self.modelReset.connect(self.clear_row_cache)
 
         self.current_root = None
         self.root_path_index = None
 
+        # Header sniffing of spreadsheets in the root runs on the task scheduler if given
+        self.task_scheduler = task_scheduler
+        self.header_index = None
+        self.header_scan = None
+
         self.dataChanged.connect(self.onDataChanged)
 
     def onDataChanged(self, topLeft, bottomRight, roles):
@@ -69,25 +125,86 @@ class JobFileSystemModel(QFileSystemModel):
     def flags(self, index):
         custom_index = self._custom_column_index(index.column())
         if custom_index is not None:
-            file_index = self._get_first_column_index(index)
-            if file_index.isValid() and not self.isDir(file_index):
-                file_name = self.fileName(file_index)
-                if (custom_index == 0 or self.file_info[file_name].selected) and os.path.splitext(file_name)[1] in self.editable_file_extensions:
-                    return Qt.ItemIsEnabled | Qt.ItemIsEditable
+            row_info = self.get_row_info(index)
+            if row_info.is_editable and (custom_index == 0 or self._is_selected(row_info)):
+                return Qt.ItemIsEnabled | Qt.ItemIsEditable
             return Qt.NoItemFlags
         return super().flags(index)
 
+    @Slot()
+    def clear_row_cache(self, *args):  # pylint: disable = unused-argument
+        """Invalidates cached row info when rows are loaded, renamed or removed"""
+        self.row_cache.clear()
+
+    def get_row_info(self, index):
+        """Returns the cached RowInfo for the row of any index, computing it on first use"""
+        key = index.internalId()
+        row_info = self.row_cache.get(key)
+        if row_info is None:
+            file_index = self._get_first_column_index(index)
+            if file_index.isValid() and not self.isDir(file_index):
+                file_path = self.filePath(file_index)
+                extension = os.path.splitext(file_path)[1].lower()
+                is_editable = extension in self.editable_file_extensions
+                row_info = RowInfo(file_key(file_path), file_path, is_editable)
+            else:
+                row_info = NOT_A_FILE_ROW
+            self.row_cache[key] = row_info
+        return row_info
+
+    def _is_selected(self, row_info):
+        file_info = self.file_info.get(row_info.file_key)
+        return file_info is not None and file_info.selected
+
+    def set_files_selected(self, indexes, selected):
+        """Selects or deselects the editable files of the given indexes (any column)
+
+        Emits a single dataChanged per parent covering the changed rows' custom columns,
+        returning the number of files whose selection changed.
+        """
+        changed_rows = {}
+        for index in indexes:
+            row_info = self.get_row_info(index)
+            if not row_info.is_editable:
+                continue
+            file_info = self.file_info.get(row_info.file_key)
+            if file_info is None:
+                if not selected:
+                    continue
+                file_info = self.file_info[row_info.file_key] = FileInfo()
+            if file_info.selected == selected:
+                continue
+            file_info.set_selected(selected, self.detected_file_type(index))
+            parent = index.parent()
+            changed_rows.setdefault(parent.internalId(), (parent, []))[1].append(index.row())
+
+        for parent, rows in changed_rows.values():
+            top_left = self.index(min(rows), self.base_column_count, parent)
+            bottom_right = self.index(max(rows), self.columnCount() - 1, parent)
+            self.dataChanged.emit(top_left, bottom_right, [Qt.EditRole, Qt.DisplayRole])
+        return sum(len(rows) for _, rows in changed_rows.values())
+
+    def set_all_files_selected(self, selected=True):
+        """Selects or deselects every editable file directly in the current root"""
+        if self.root_path_index is None:
+            return 0
+        indexes = [
+            self.index(row, 0, self.root_path_index)
+            for row in range(self.rowCount(self.root_path_index))
+        ]
+        return self.set_files_selected(indexes, selected)
+
     def custom_column_count(self):
         return len(self.additional_columns)
 
     def hide_column_indexes(self):
         """Hide all default columns except for the Name (0) and added custom columns (end)"""
         # Don't include 0 or the custom columns by their offsets
-        return list(range(1, super().columnCount()))
+        return list(range(1, self.base_column_count))
 
     def edit_column_indexes(self):
         # Only the custom columns can be edited
-        return list(range(super().columnCount(), self.columnCount()))
+        return list(range(self.base_column_count, self.columnCount()))
 
     def set_current_root(self, path):
         """Sets the root path for the model"""
@@ -96,6 +213,43 @@ class JobFileSystemModel(QFileSystemModel):
         self.setRootPath(self.current_root)
         self.root_path_index = self.index(self.current_root)
 
+        # Previously indexed file types show immediately, changed files are sniffed in background
+        self.header_index = HeaderIndex(self.current_root).load()
+        self.start_header_scan()
+
+    def start_header_scan(self):
+        """Starts a background scan updating the header index of the current root"""
+        if self.task_scheduler is None or self.current_root is None:
+            return
+        if self.header_scan is not None:
+            self.header_scan.cancel()
+        self.header_scan = self.task_scheduler.submit(scan_header_index, self.current_root)
+        self.header_scan.finished.connect(self.on_header_scan_finished)
+
+    @Slot(object)
+    def on_header_scan_finished(self, task_future):
+        """Replaces the header index with the scanned one and refreshes the custom columns"""
+        if task_future is not self.header_scan:
+            return  # Superseded by a scan of another root
+        self.header_scan = None
+        if task_future.cancelled() or task_future.exception() is not None:
+            return
+        self.header_index = task_future.result()
+        row_count = self.rowCount(self.root_path_index)
+        if row_count:
+            top_left = self.index(0, self.base_column_count, self.root_path_index)
+            bottom_right = self.index(row_count - 1, self.columnCount() - 1, self.root_path_index)
+            self.dataChanged.emit(top_left, bottom_right, [Qt.DisplayRole])
+
+    def detected_file_type(self, index):
+        """Returns the file type guessed from the sniffed headers of the index's file, if any"""
+        row_info = self.get_row_info(index)
+        if self.header_index is None or row_info.file_path is None:
+            return None
+        relative_path = os.path.relpath(row_info.file_path, self.current_root)
+        entry = self.header_index.get(relative_path)
+        return None if entry is None else entry.file_type
+
     def columnCount(self, parent=None):
         parent = parent if parent is not None else QModelIndex()
         return super().columnCount(parent) + self.custom_column_count()
@@ -105,44 +259,34 @@ class JobFileSystemModel(QFileSystemModel):
         custom_offset = self._custom_column_index(index.column())
         if custom_offset is not None:
             if role == QtUserRole.EditTypeRole:
-                if custom_offset == 0: return QtEditTypes.Bool
-                if custom_offset == 1: return QtEditTypes.Combo
-                if custom_offset == 2: return QtEditTypes.Str
+                return self.additional_column_edit_types[custom_offset]
             if role == Qt.EditRole and custom_offset == 0:
-                return self.file_info[self._get_file_name(index)].selected
-            if role == Qt.DisplayRole:
-                file_index = self._get_first_column_index(index)
-                if file_index.isValid() and not self.isDir(file_index):
-                    file_name = self.fileName(file_index)
-                    if self.file_info[file_name].selected and os.path.splitext(file_name)[1] in self.editable_file_extensions:
-                        if custom_offset == 1:
-                            return self.file_info[file_name].type
-                        if custom_offset == 2:
-                            return self.file_info[file_name].list_id
+                return self._is_selected(self.get_row_info(index))
+            if role == Qt.DisplayRole and custom_offset != 0:
+                row_info = self.get_row_info(index)
+                file_info = self.file_info.get(row_info.file_key)
+                if row_info.is_editable and file_info is not None and file_info.selected:
+                    if custom_offset == 1:
+                        return file_info.type
+                    if custom_offset == 2:
+                        return file_info.list_id
             return None
         return super().data(index, role)
 
     @log_call(log)
-    def setData(self, index, value, role=Qt.EditRole):
+    def setData(self, index, value, role=Qt.EditRole):  # pylint: disable = unused-argument
         custom_offset = self._custom_column_index(index.column())
         if custom_offset == 0:
-            self.file_info[self._get_file_name(index)].set_selected(value)
-            self.dataChanged.emit(index, index, [role])
+            self.set_files_selected([index], bool(value))
         return False
 
-    def _get_file_name(self, index):
-        file_index = self._get_first_column_index(index)
-        if file_index.isValid() and not self.isDir(file_index):
-            return self.fileName(file_index)
-        return None
-
     def _get_first_column_index(self, index):
         """For any index, return the first column index (FileName) for the row"""
         return self.index(index.row(), 0, index.parent())
 
     def _custom_column_index(self, column_index):
-        if column_index >= super().columnCount():
-            return column_index - super().columnCount()
+        if column_index >= self.base_column_count:
+            return column_index - self.base_column_count
         return None
 
     def __repr__(self):
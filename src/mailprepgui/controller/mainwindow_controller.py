@@ -1,87 +1,19 @@
 """Controls logic for the main window"""
 import logging
-import os
-from PySide2.QtCore import Qt, QObject, Signal, Slot, QModelIndex
-from PySide2.QtWidgets import QFileSystemModel
+from PySide2.QtCore import QObject, Signal, Slot
 from mailprepgui.controller.std_stream_monitor import QueueMonitorWorker
 from mailprepgui.controller.thread_wrapper import start_thread
 from mailprepgui.controller.settings_manager import SettingsManager
 from mailprepgui.model.job.job_controller import JobManager
 from mailprepgui.model.property_model import PropertyModel
 from mailprepgui.model.qt_edit_types import QtEditTypes
-from mailprepgui.model.settings.job_settings import JobSettings
-from utils.logging_decorators import log_call
+from mailprepgui.model.settings.job_settings import JobSettings, JobSettingsError
+from utils.logging_decorators import log_call, log_call_stats
 
 
 log = logging.getLogger(__name__)
 
 
-class JobFileSystemModel(QFileSystemModel):
-    """File system model to control File List view"""
-
-    # Note offsets area applied from the end of the list of columns
-    additional_columns = [
-        'Type',
-        'List ID',
-    ]
-
-    def __init__(self, parent=None):
-        super().__init__(parent)
-        self.current_root = None
-        self.root_path_index = None
-
-    def headerData(self, section, orientation, role=Qt.DisplayRole):
-        # If one of the custom column indexes, handle separately
-        if orientation == Qt.Horizontal:
-            custom_offset = self._custom_column_index(section)
-            if custom_offset is not None and role == Qt.DisplayRole:
-                return self.additional_columns[custom_offset]
-        return super().headerData(section, orientation, role)
-
-    def flags(self, index):
-        if self._custom_column_index(index.column()) is not None:
-            return Qt.ItemIsEnabled | Qt.ItemIsEditable
-        return super().flags(index)
-
-    def custom_column_count(self):
-        return len(self.additional_columns)
-
-    def hide_column_indexes(self):
-        # Don't include 0 or the custom columns by their offsets
-        return list(range(1, super().columnCount()))
-
-    def edit_column_indexes(self):
-        # Only the custom columns can be edited
-        return list(range(super().columnCount(), self.columnCount()))
-
-    def set_current_root(self, path):
-        """Sets the root path for the model"""
-        log.debug('setting current_root: %s', path)
-        self.current_root = path
-        self.setRootPath(self.current_root)
-        self.root_path_index = self.index(self.current_root)
-
-    def columnCount(self, parent=None):
-        parent = parent if parent is not None else QModelIndex()
-        return super().columnCount(parent) + self.custom_column_count()
-
-    def data(self, index, role):
-        # If one of the custom column indexes, handle separately
-        custom_offset = self._custom_column_index(index.column())
-        if custom_offset is not None:
-            if role == Qt.DisplayRole:
-                return self.additional_columns[custom_offset]
-        return super().data(index, role)
-
-    def _custom_column_index(self, column_index):
-        if column_index >= super().columnCount():
-            return column_index - super().columnCount()
-        return None
-
-    def __repr__(self):
-        return f'<JobFileSystemModel()>'
-
-
 class JobController:
 
     def __init__(self, job_file_path, settings):
@@ -102,30 +34,50 @@ class MainWindowController(QObject):
         self.std_stream_queue = std_stream_queue
         self.app_settings = SettingsManager()
 
-        # Set up thread to watch std stream queue and pop contents and emit with a signal
+        # Worker to watch std stream queue and pop contents and emit with a signal, its thread is
+        # started by start_background_workers (output written until then waits in the queue)
         self.queue_monitor_worker = QueueMonitorWorker(self.std_stream_queue)
-        self.thread = start_thread(self.queue_monitor_worker)
+        self.thread = None
+
+        # Shared pool for short background tasks (file scans, header sniffing, merges) and the
+        # job files model are created by start_background_workers, as is importing them
+        self.task_scheduler = None
+        self.files_model = None
 
         # Initialize main view
         self.main_view.initialize(self.app_settings)
         self.main_view.set_output_signal(self.queue_monitor_worker.std_stream_signal)
 
-        # Initialize any models
-        self.files_model = JobFileSystemModel()
-        log.debug(self.files_model)
-
         # Connect signals
         self.main_view.open_job.connect(self.open_job)
         self.destroy.connect(self.clean_up)  # pylint: disable = no-member
 
         # Initialize any class variables
         self.job = None
+        self.job_autosaver = None
         self.job_properties = self.create_job_property_model()
 
+    @Slot()
+    def start_background_workers(self):
+        """Starts the output monitor thread and task scheduler, deferred until the window shows"""
+        # pylint: disable = import-outside-toplevel
+        from mailprepgui.controller.job_file_system_model import JobFileSystemModel
+        from mailprepgui.controller.task_scheduler import TaskScheduler
+        # pylint: enable = import-outside-toplevel
+        if self.thread is None:
+            self.thread = start_thread(self.queue_monitor_worker)
+        if self.task_scheduler is None:
+            self.task_scheduler = TaskScheduler(parent=self)
+            # Spreadsheet headers of a job's directory are indexed in background on the scheduler
+            self.files_model = JobFileSystemModel(task_scheduler=self.task_scheduler)
+            log.debug(self.files_model)
+
     def create_job_property_model(self):
         property_model = PropertyModel()
         property_model.add_property('Customer Information', 'Customer', QtEditTypes.Str)
         property_model.add_property('Customer Information', 'Department', QtEditTypes.Str)
+        property_model.add_property('Merge Settings', 'Convert To Upper', QtEditTypes.Bool)
+        property_model.add_property('Merge Settings', 'Normalize Text', QtEditTypes.Bool)
         property_model.add_property('Merge Settings', 'Use Custom Campus', QtEditTypes.Bool)
         property_model.add_property('Merge Settings', 'Custom Campus Path', QtEditTypes.Str)
         return property_model
@@ -133,22 +85,36 @@ class MainWindowController(QObject):
     @Slot()
     def clean_up(self):
         """Cleans up background worker threads gracefully and deletes self"""
-        self.thread.requestInterruption()
-        self.thread.wait(1000)
+        log_call_stats(log)
+        if self.job_autosaver is not None:
+            self.job_autosaver.flush()
+        if self.task_scheduler is not None:
+            self.task_scheduler.shutdown()
+        if self.thread is not None:
+            self.queue_monitor_worker.stop()
+            self.thread.wait(1000)
         self.deleteLater()
 
     @Slot()
     @log_call(log)
     def open_job(self, job_file_path):
+        from mailprepgui.controller.job_autosaver import JobAutosaver  # pylint: disable = import-outside-toplevel
+        self.start_background_workers()
         try:
-            # Create a job settings instance from the job file path
-            with open(job_file_path, 'r') as job_file:
-                job_settings = JobSettings.from_file(job_file)
+            # Create a job settings instance from the job file path (or its settings cache)
+            job_settings = JobSettings.from_path(job_file_path)
         except FileNotFoundError:
-            log.exception("Job definition file %s could not be found", job_file)
+            log.exception("Job definition file %s could not be found", job_file_path)
+            return
+        except JobSettingsError:
+            log.exception("Job definition file %s could not be read", job_file_path)
             return
 
+        if self.job_autosaver is not None:
+            self.job_autosaver.flush()
+            self.job_autosaver.deleteLater()
         self.job = JobManager(job_file_path, job_settings)
+        self.job_autosaver = JobAutosaver(self.job, self.task_scheduler, parent=self)
         self.set_window_title_job(False)
         self.job.job_is_changed.connect(self.set_window_title_job)
         log.debug('Opened job: %s', self.job)
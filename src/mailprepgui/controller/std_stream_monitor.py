@@ -1,11 +1,43 @@
 """Standardized utilities for redirecting stdout and stderr to a queue"""
 import logging
 import queue
-from PySide2.QtCore import Signal, Slot, QObject, QThread
+import time
+from PySide2.QtCore import Signal, Slot, QObject
 
 log = logging.getLogger(__name__)
 
 
+# Budgets for coalescing queued writes into a single emitted chunk of text
+BATCH_MAX_CHARS = 64 * 1024
+BATCH_MAX_SECONDS = 0.05
+
+# Put on a queue to wake up and stop the QueueMonitorWorker reading it
+STOP_SENTINEL = object()
+
+
+def drain_queue(std_queue, first_value, max_chars=BATCH_MAX_CHARS, max_seconds=BATCH_MAX_SECONDS):
+    """Joins first_value with values put on the queue until the character or time budget is used
+
+    Returns a tuple of the joined text and whether STOP_SENTINEL was taken from the queue.
+    """
+    values = [first_value]
+    char_count = len(first_value)
+    deadline = time.monotonic() + max_seconds
+    while char_count < max_chars:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        try:
+            value = std_queue.get(timeout=remaining)
+        except queue.Empty:
+            break
+        if value is STOP_SENTINEL:
+            return ''.join(values), True
+        values.append(value)
+        char_count += len(value)
+    return ''.join(values), False
+
+
 class QueueStream:
     """Stream-like object that wraps a Queue with write and flush"""
 
@@ -23,7 +55,12 @@ class QueueStream:
 
 
 class QueueMonitorWorker(QObject):
-    """Worker object for a background thread to emit Queue messages as Signals"""
+    """Worker object for a background thread to emit Queue messages as Signals
+
+    Writes arriving in quick succession are joined and emitted as a single chunk, so a flood
+    of small writes (e.g. debug logging) does not flood the GUI thread with signals. The worker
+    blocks on the queue without polling while idle and is woken up to stop by STOP_SENTINEL.
+    """
 
     std_stream_signal = Signal(str)
     finished = Signal()
@@ -34,11 +71,16 @@ class QueueMonitorWorker(QObject):
 
     @Slot()
     def run(self):
-        """Emit queue contents as signals indefinitely, periodically checking for termination"""
-        while not QThread.currentThread().isInterruptionRequested():
-            try:
-                value = self.std_queue.get(timeout=0.5)
-                self.std_stream_signal.emit(value)  # pylint: disable = no-member
-            except queue.Empty:
-                pass
+        """Emit queue contents as signals until stopped"""
+        is_stopped = False
+        while not is_stopped:
+            value = self.std_queue.get()
+            if value is STOP_SENTINEL:
+                break
+            text, is_stopped = drain_queue(self.std_queue, value)
+            self.std_stream_signal.emit(text)  # pylint: disable = no-member
         self.finished.emit()  # pylint: disable = no-member
+
+    def stop(self):
+        """Wakes up the worker and stops it after emitting everything queued before (thread safe)"""
+        self.std_queue.put(STOP_SENTINEL)
@@ -0,0 +1,173 @@
+"""Managed pool of worker threads for short background tasks with results delivered as signals"""
+import logging
+import threading
+import concurrent.futures
+from PySide2.QtCore import QObject, QRunnable, QThreadPool, Signal, Slot
+
+
+log = logging.getLogger(__name__)
+
+
+class TaskCancelled(Exception):
+    """Raised inside a task to stop it once its cancellation was requested"""
+
+
+class TaskContext:
+    """Passed as the first argument to every task for cancellation checks and progress reports"""
+
+    def __init__(self, task_future):
+        self._task_future = task_future
+        self._cancel_event = threading.Event()
+
+    def is_cancelled(self):
+        """Returns whether cancellation of the task was requested"""
+        return self._cancel_event.is_set()
+
+    def check_cancelled(self):
+        """Raises TaskCancelled if cancellation of the task was requested"""
+        if self._cancel_event.is_set():
+            raise TaskCancelled()
+
+    def report_progress(self, done, total):
+        """Emits the task's progress_changed signal from the worker thread"""
+        self._task_future.progress_changed.emit(done, total)  # pylint: disable = no-member
+
+    def cancel(self):
+        """Requests cancellation, which a running task sees on its next check"""
+        self._cancel_event.set()
+
+
+class TaskFuture(QObject):
+    """Handle to a submitted task wrapping a concurrent.futures.Future
+
+    Its signals are emitted from the worker thread (or the cancelling thread). With the default
+    AutoConnection Qt queues them to receivers living in another thread when they are emitted,
+    so connect slots of QObjects living on the GUI thread (e.g. models and controllers) to
+    handle them there. Other callables may be called on the worker thread.
+    """
+
+    progress_changed = Signal(int, int)  # done, total
+    finished = Signal(object)  # This TaskFuture, once it succeeded, failed or was cancelled
+
+    def __init__(self, scheduler, priority):
+        super().__init__()
+        self.scheduler = scheduler
+        self.priority = priority
+        self.future = concurrent.futures.Future()
+        self.context = TaskContext(self)
+        self.runnable = None
+
+    def cancel(self):
+        """Cancels a pending task, or requests a running task to stop at its next check"""
+        self.context.cancel()
+        return self.scheduler.cancel_pending(self)
+
+    def cancelled(self):
+        """Returns whether the task was cancelled before or while running"""
+        if self.future.cancelled():
+            return True
+        return self.future.done() and isinstance(self.future.exception(), TaskCancelled)
+
+    def done(self):
+        """Returns whether the task succeeded, failed or was cancelled"""
+        return self.future.done()
+
+    def result(self, timeout=None):
+        """Returns the task result, blocking until done (avoid on the GUI thread, use finished)"""
+        return self.future.result(timeout)
+
+    def exception(self, timeout=None):
+        """Returns the exception raised by the task or None, blocking until done"""
+        return self.future.exception(timeout)
+
+    def __repr__(self):
+        return f'<TaskFuture(priority={self.priority}, future={self.future})>'
+
+
+class _TaskRunnable(QRunnable):
+    """QRunnable running a task function and resolving its TaskFuture"""
+
+    def __init__(self, task_future, func, args, kwargs):
+        super().__init__()
+        self.task_future = task_future
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+
+    def run(self):
+        future = self.task_future.future
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            result = self.func(self.task_future.context, *self.args, **self.kwargs)
+        except Exception as exception:  # pylint: disable = broad-except
+            if not isinstance(exception, TaskCancelled):
+                log.exception('Background task %s failed', self.func)
+            future.set_exception(exception)
+        else:
+            future.set_result(result)
+        finally:
+            self.task_future.scheduler.task_done(self.task_future)
+
+
+class TaskScheduler(QObject):
+    """Runs short tasks (file scans, header sniffing, merges) on a bounded QThreadPool
+
+    Tasks are called as func(context, *args, **kwargs) with a TaskContext, and start in order of
+    priority (higher first) as pool threads become free. Threads are reused between tasks
+    instead of creating a QThread per operation as start_thread does for long lived workers.
+    """
+
+    def __init__(self, max_workers=None, parent=None):
+        super().__init__(parent)
+        self.thread_pool = QThreadPool(self)
+        if max_workers is not None:
+            self.thread_pool.setMaxThreadCount(max_workers)
+        self.active_tasks = set()
+        self.lock = threading.Lock()
+
+    def submit(self, func, *args, priority=0, **kwargs):
+        """Queues func to run on the pool and returns a TaskFuture for its result"""
+        task_future = TaskFuture(self, priority)
+        runnable = _TaskRunnable(task_future, func, args, kwargs)
+        # Python keeps ownership so the runnable can still be taken back from the queue
+        runnable.setAutoDelete(False)
+        task_future.runnable = runnable
+        with self.lock:
+            self.active_tasks.add(task_future)
+        self.thread_pool.start(runnable, priority)
+        return task_future
+
+    def cancel_pending(self, task_future):
+        """Removes a task from the queue if it has not started, returning if it was removed"""
+        runnable = task_future.runnable
+        if runnable is None or not self.thread_pool.tryTake(runnable):
+            return False
+        task_future.future.cancel()
+        self.task_done(task_future)
+        return True
+
+    def task_done(self, task_future):
+        """Releases a finished task and emits its finished signal
+
+        Called at the end of _TaskRunnable.run, whose frame still references the runnable, so
+        dropping the TaskFuture's reference only frees it once run returns. QThreadPool reads
+        autoDelete before running a runnable and does not touch it afterwards when it is False.
+        """
+        with self.lock:
+            self.active_tasks.discard(task_future)
+        # No reference cycle, so the runnable is freed when done instead of by a later collection
+        task_future.runnable = None
+        task_future.finished.emit(task_future)  # pylint: disable = no-member
+
+    @Slot()
+    def shutdown(self, wait_msecs=1000):
+        """Cancels all tasks and waits for running tasks to stop, returning if all stopped"""
+        with self.lock:
+            active_tasks = list(self.active_tasks)
+        for task_future in active_tasks:
+            task_future.cancel()
+        return self.thread_pool.waitForDone(wait_msecs)
+
+    def __repr__(self):
+        return f'<TaskScheduler(max_workers={self.thread_pool.maxThreadCount()})>'
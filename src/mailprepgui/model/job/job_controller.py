@@ -19,6 +19,8 @@ JobProperty = namedtuple('JobProperty', ['group', 'editor', 'default'])
 job_properties = {
     'Customer': JobProperty('Customer Information', QtEditTypes.Str, None),
     'Department': JobProperty('Customer Information', QtEditTypes.Str, None),
+    'Convert To Upper': JobProperty('Merge Settings', QtEditTypes.Bool, False),
+    'Normalize Text': JobProperty('Merge Settings', QtEditTypes.Bool, False),
     'Use Custom Campus': JobProperty('Merge Settings', QtEditTypes.Bool, False),
     'Custom Campus Path': JobProperty('Merge Settings', QtEditTypes.Str, None),
 }
@@ -59,62 +61,106 @@ def are_equals(obj1, obj2):
 
 class PropertyState(QObject):
 
-    property_state_changed = Signal(bool)
+    # Property name and whether it now differs from the saved value, only emitted on a flip
+    property_state_changed = Signal(str, bool)
+    # Property name and new value, emitted on every value change
+    value_changed = Signal(str, object)
 
-    def __init__(self, value):
+    def __init__(self, value, name=None):
         super().__init__()
+        self.name = name
         self.saved = value
         self.value = value
+        self.changed = False
 
     def is_changed(self):
-        log.debug(f"is_changed: <self.saved={self.saved}> != <self.value={self.value}>")
-        return not are_equals(self.saved, self.value)
+        return self.changed
 
     def save(self):
-        self.saved = self.value
+        self.save_as(self.value)
+
+    def save_as(self, value):
+        """Marks the given value (e.g. of a snapshot written in the background) as saved"""
+        self.saved = value
+        self._update_changed()
 
     def set_value(self, value):
         if value != self.value:
             self.value = value
-            self.property_state_changed.emit(self.is_changed())
+            self.value_changed.emit(self.name, value)
+            self._update_changed()
 
     def get_value(self):
-        return value
+        return self.value
+
+    def _update_changed(self):
+        changed = not are_equals(self.saved, self.value)
+        if changed != self.changed:
+            self.changed = changed
+            self.property_state_changed.emit(self.name, changed)
 
 # I LIKE THIS ONE -- KEEP WORKING ON THIS
 class JobManager(QObject):
 
     job_is_changed = Signal(bool)
+    # Emitted after a property value was written to settings, e.g. to schedule an autosave
+    settings_changed = Signal()
 
     def __init__(self, job_file_path, initial_settings):
         super().__init__()
         self.file_path = job_file_path
+        self.settings = initial_settings  # JobSettings instance
         self.directory, self.file_full_name = os.path.split(self.file_path)
         self.file_base_name = os.path.splitext(self.file_full_name)[0]
         self.files = {}
         self.property_states = {}
+        # Names of properties differing from their saved value, kept up to date by PropertyState
+        self.changed_properties = set()
         self.is_changed = False
 
         self.property_model = PropertyModel()
+        model_properties = []
         for prop_name, prop_settings in job_properties.items():
             # Get initial value: Either from initial settings or the property default value
             initial_value = initial_settings.get_property(prop_name, prop_settings.default)
-            # Set the Qt model that allows properties to be editable
-            self.property_model.add_property(
-                prop_settings.group, prop_name, prop_settings.editor, initial_value)
+            model_properties.append(
+                (prop_settings.group, prop_name, prop_settings.editor, initial_value))
             # Create property state instances
-            self.property_states[prop_name] = PropertyState(initial_value)
+            self.property_states[prop_name] = PropertyState(initial_value, prop_name)
             self.property_states[prop_name].property_state_changed.connect(
                 self.on_property_state_changed)
+            self.property_states[prop_name].value_changed.connect(self.on_property_value_changed)
+        # Set the Qt model that allows properties to be editable, in one reset
+        self.property_model.load(model_properties)
 
         self.property_model.itemChanged.connect(self.property_changed)
 
-    @Slot()
-    def on_property_state_changed(self, is_changed):  # is_changed: bool
-        # Short circuit as we know that the overall job state is changed if the emitting property
-        # state was changed, otherwise have to loop through all to know for sure
-        self.is_changed = is_changed or any([x.is_changed() for x in self.property_states.values()])
-        self.job_is_changed.emit(self.is_changed)
+    @Slot(str, bool)
+    def on_property_state_changed(self, property_name, is_changed):
+        if is_changed:
+            self.changed_properties.add(property_name)
+        else:
+            self.changed_properties.discard(property_name)
+        # Only notify (e.g. the window title) when the job as a whole flips
+        job_is_changed = bool(self.changed_properties)
+        if job_is_changed != self.is_changed:
+            self.is_changed = job_is_changed
+            self.job_is_changed.emit(self.is_changed)
+
+    @Slot(str, object)
+    def on_property_value_changed(self, property_name, value):
+        if self.settings.set_property(property_name, value):
+            self.settings_changed.emit()
+
+    def property_values(self):
+        """Returns the current value of every property by name"""
+        return {name: state.value for name, state in self.property_states.items()}
+
+    def mark_saved(self, property_values=None):
+        """Marks the given property values (default: the current values) as saved"""
+        property_values = self.property_values() if property_values is None else property_values
+        for name, value in property_values.items():
+            self.property_states[name].save_as(value)
 
     @Slot()
     def property_changed(self, item):  # item: QStandardItem
@@ -125,7 +171,7 @@ class JobManager(QObject):
 
     @log_call(log)
     def _set_property_value(self, property_name, value):
-            self.property_states[property_name].set_value(value)
+        self.property_states[property_name].set_value(value)
 
     def get_item_property_name(self, item):
         property_parent = item.parent()
@@ -32,12 +32,38 @@ class PropertyModel(QStandardItemModel):
             self.parent_item.appendRow(group_item)
             self.groups[group] = group_item
 
-        # Create property row items
-        key_item = StandardItem(property_key)
-        key_item.setFlags(Qt.ItemIsEnabled | Qt.ItemIsSelectable)
-        value_item = StandardItem(default_value)
-        # Set editor type for delegate to select the appropriate editor
-        value_item.setData(edit_type, QtUserRole.EditTypeRole)
-
         # Add property items to the group
-        self.groups[group].appendRow([key_item, value_item])
+        self.groups[group].appendRow(_property_row(property_key, edit_type, default_value))
+
+    def load(self, properties):
+        """Replaces all properties with (group, property_key, edit_type, value) tuples at once
+
+        The item tree is built detached from the model with signals blocked, so views only see a
+        single model reset instead of row insertion signals for every property.
+        """
+        self.beginResetModel()
+        self.blockSignals(True)
+        try:
+            self.removeRows(0, self.rowCount())
+            self.groups = {}
+            for group, property_key, edit_type, value in properties:
+                if group not in self.groups:
+                    group_item = StandardItem(group)
+                    group_item.setFlags(Qt.ItemIsEnabled)
+                    self.groups[group] = group_item
+                self.groups[group].appendRow(_property_row(property_key, edit_type, value))
+            self.parent_item.appendRows(list(self.groups.values()))
+        finally:
+            self.blockSignals(False)
+            self.endResetModel()
+
+
+def _property_row(property_key, edit_type, value):
+    """Creates the key and value items of a property row"""
+    key_item = StandardItem(property_key)
+    key_item.setFlags(Qt.ItemIsEnabled | Qt.ItemIsSelectable)
+    value_item = StandardItem()
+    value_item.setData(value, Qt.DisplayRole)
+    # Set editor type for delegate to select the appropriate editor
+    value_item.setData(edit_type, QtUserRole.EditTypeRole)
+    return [key_item, value_item]
@@ -1,29 +1,152 @@
 """Defines format for YAML based MailPrep job definition file (.mpjob)"""
+import os
 import json
+import marshal
+import hashlib
+import logging
+import tempfile
 
 from mailprepgui.model.qt_edit_types import QtEditTypes
 from utils.mapping import CaseInsensitiveDict, recursive_merge
 
+log = logging.getLogger(__name__)
+
+
 PROPERTIES_KEY = 'properties'
 
+# Sidecar file next to the job file holding its parsed and normalized settings
+JOB_CACHE_FILE_EXTENSION = '.mpjobcache'
+JOB_CACHE_FORMAT_VERSION = 1
+
+
+class JobSettingsError(ValueError):
+    """Raised when a job definition file is not a valid job definition"""
+
+
+def _json_default(value):
+    """Serializes CaseInsensitiveDict values (stored with normalized keys) as plain objects"""
+    if isinstance(value, CaseInsensitiveDict):
+        return value.store
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
+
+def _to_plain(mapping):
+    """Converts a CaseInsensitiveDict tree to nested dicts of its (already normalized) store"""
+    return {
+        key: _to_plain(value) if isinstance(value, CaseInsensitiveDict) else value
+        for key, value in mapping.store.items()
+    }
+
+
+def _from_plain(store):
+    """Rebuilds a CaseInsensitiveDict tree from _to_plain output without normalizing keys again"""
+    mapping = CaseInsensitiveDict.__new__(CaseInsensitiveDict)
+    mapping.store = {
+        key: _from_plain(value) if isinstance(value, dict) else value
+        for key, value in store.items()
+    }
+    return mapping
+
+
+def job_cache_path(job_file_path):
+    """Returns the path of the settings cache sidecar file of a job file"""
+    return os.path.splitext(job_file_path)[0] + JOB_CACHE_FILE_EXTENSION
+
+
+def write_text_atomic(path, text):
+    """Writes text to a temporary file next to path and renames it over path
+
+    A crash or error while writing leaves either the previous or the new file, never a partial one.
+    """
+    write_bytes_atomic(path, text.encode('utf-8'))
+
+
+def write_bytes_atomic(path, contents):
+    """Binary version of write_text_atomic"""
+    directory, file_name = os.path.split(os.path.abspath(path))
+    file_descriptor, temp_path = tempfile.mkstemp(
+        prefix=f'.{file_name}.', suffix='.tmp', dir=directory)
+    try:
+        with os.fdopen(file_descriptor, 'wb') as temp_file:
+            temp_file.write(contents)
+            temp_file.flush()
+            os.fsync(temp_file.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        os.remove(temp_path)
+        raise
+
 
 class JobSettings:
-    """Wrap job settings into an abstraction managing read and write access"""
+    """Wrap job settings into an abstraction managing read and write access
+
+    Each top level key is a section whose serialized JSON is cached until it is changed through
+    set_property, merge or mark_dirty, so saving only re-serializes the changed sections.
+    """
 
     @classmethod
     def from_file(cls, fp):
         """Creates a new job settings instance seeded from a source file contents"""
-        source_settings = None
+        return cls.from_json(fp.read(), getattr(fp, 'name', fp))
+
+    @classmethod
+    def from_json(cls, contents, name=None):
+        """Creates a new job settings instance from JSON text or bytes"""
         try:
-            source_settings = json.load(fp)
-        except json.JSONDecodeError:
-            # Handles case where the source job file is not valid json,
-            # and therefore not a valid job definition file
-            pass
+            source_settings = json.loads(contents)
+        except (json.JSONDecodeError, UnicodeDecodeError) as error:
+            raise JobSettingsError(
+                f'Job definition file {name} is not valid JSON: {error}') from error
+        if not isinstance(source_settings, dict):
+            raise JobSettingsError(f'Job definition file {name} does not contain a JSON object')
         return cls().initialize(source_settings)
 
+    @classmethod
+    def from_path(cls, job_file_path, use_cache=True):
+        """Creates a new job settings instance from a job file, using its settings cache if current
+
+        The cache is current when the SHA-1 of the job file's contents is unchanged. It is always
+        checked, as an edit keeping the size within the mtime granularity of some file systems
+        (FAT, network shares) leaves mtime and size unchanged, and hashing is cheap next to
+        parsing. The cache is rewritten when the contents, mtime or size changed.
+        """
+        stat_result = os.stat(job_file_path)
+        with open(job_file_path, 'rb') as job_file:
+            contents = job_file.read()
+        digest = hashlib.sha1(contents).hexdigest()
+        cache_path = job_cache_path(job_file_path)
+        cached = _read_job_cache(cache_path) if use_cache else None
+        if cached is not None and cached[3] == digest:
+            job_settings = cls._from_cache(cached)
+            if cached[1:3] == (stat_result.st_mtime_ns, stat_result.st_size):
+                return job_settings
+            # Touched but unchanged, the cache is rewritten with the new mtime
+        else:
+            job_settings = cls.from_json(contents, job_file_path)
+        if use_cache:
+            job_settings._write_cache(cache_path, stat_result, digest)
+        return job_settings
+
+    @classmethod
+    def _from_cache(cls, cached):
+        job_settings = cls()
+        job_settings.settings = _from_plain(cached[4])
+        return job_settings
+
+    def _write_cache(self, cache_path, stat_result, digest):
+        contents = marshal.dumps((
+            JOB_CACHE_FORMAT_VERSION, stat_result.st_mtime_ns, stat_result.st_size, digest,
+            _to_plain(self.settings)))
+        try:
+            write_bytes_atomic(cache_path, contents)
+        except OSError:
+            log.warning('Unable to write job settings cache %s', cache_path, exc_info=True)
+
     def __init__(self):
         self.settings = CaseInsensitiveDict()
+        # Serialized JSON of clean sections by normalized section key
+        self.fragments = {}
+        self.dirty_sections = set()
 
     def get(self, key, *args, **kwargs):
         return self.settings.get(key, *args, **kwargs)
@@ -36,12 +159,13 @@ class JobSettings:
     def set_property(self, key, value):
         """Returns boolean indicating if the value was modified"""
         # Creates properties if not existing and initially checks if key exists
-        is_modified = key not in self.settings.setdefault(PROPERTIES_KEY, CaseInsensitiveDict)
+        is_modified = key not in self.settings.setdefault(PROPERTIES_KEY, CaseInsensitiveDict())
         # If key does exist then we are updating existing values and need to check if modifying
         if not is_modified:
             is_modified = self.settings[PROPERTIES_KEY][key] != value
         if is_modified:
             self.settings[PROPERTIES_KEY][key] = value
+            self.mark_dirty(PROPERTIES_KEY)
         return is_modified
 
     def initialize(self, initial_settings):
@@ -51,12 +175,58 @@ class JobSettings:
         return self
 
     def merge(self, settings_object):
-        """Merges settings from the given object into existing job settings"""
-        recursive_merge(self.settings, CaseInsensitiveDict(settings_object), default=CaseInsensitiveDict)
+        """Merges settings from the given object into existing job settings
+
+        Returns the set of setting paths that were added or changed.
+        """
+        changed_paths = recursive_merge(self.settings, settings_object, default=CaseInsensitiveDict)
+        self.dirty_sections.update(path[0] for path in changed_paths)
+        return changed_paths
+
+    def mark_dirty(self, section):
+        """Marks a section as changed when it was modified in place (e.g. through get)"""
+        self.dirty_sections.add(CaseInsensitiveDict.keytransform(section))
+
+    def serialize(self):
+        """Returns the settings as JSON text, re-serializing only dirty sections"""
+        for section in self.dirty_sections:
+            self.fragments.pop(section, None)
+        self.dirty_sections.clear()
+        # Rebuilt so fragments of removed sections are dropped
+        fragments = {}
+        for section, value in self.settings.items():
+            fragment = self.fragments.get(section)
+            if fragment is None:
+                fragment = json.dumps(value, default=_json_default)
+            fragments[section] = fragment
+        self.fragments = fragments
+        members = ', '.join(
+            f'{json.dumps(section)}: {fragment}' for section, fragment in fragments.items())
+        return f'{{{members}}}'
 
     def save(self, fp):
         """Serializes and writes the settings content to the file object"""
-        json.dump(self.settings, fp)
+        fp.write(self.serialize())
+
+    def save_to_path(self, path):
+        """Serializes and atomically writes the settings content to the file path"""
+        write_text_atomic(path, self.serialize())
 
     def __repr__(self):
         return repr(self.settings)
+
+
+def _read_job_cache(cache_path):
+    """Returns the (version, mtime, size, digest, settings) tuple of a job cache or None"""
+    try:
+        with open(cache_path, 'rb') as cache_file:
+            # A single read, marshal.load reads file objects in small chunks
+            cached = marshal.loads(cache_file.read())
+    except FileNotFoundError:
+        return None
+    except (OSError, EOFError, ValueError, TypeError):
+        log.debug('Ignoring unreadable job settings cache %s', cache_path, exc_info=True)
+        return None
+    if not isinstance(cached, tuple) or len(cached) != 5 or cached[0] != JOB_CACHE_FORMAT_VERSION:
+        return None
+    return cached
@@ -4,7 +4,6 @@ from PySide2.QtCore import Qt, Signal, Slot, QSettings
 from PySide2.QtWidgets import QMainWindow, QFileDialog, QApplication
 from PySide2.QtGui import QTextCursor
 from mailprepgui.ui.mainwindow_ui import Ui_MainWindow_MailPrep  # pylint: disable=no-name-in-module,import-error
-from mailprepgui.view.new_job_dialog import NewJobDialog
 from mailprepgui.model.qt_edit_types import QtEditTypes
 from utils.logging_decorators import log_call
 
@@ -12,10 +11,15 @@ from utils.logging_decorators import log_call
 log = logging.getLogger(__name__)
 
 
+# Oldest lines are dropped from the output window past this count to keep memory use flat
+OUTPUT_WINDOW_MAX_LINES = 5000
+
+
 class MainWindow(QMainWindow):
     """Main window view for the application"""
 
     open_job = Signal(str)
+    first_painted = Signal()
 
     def __init__(self):
         super().__init__()
@@ -24,17 +28,10 @@ class MainWindow(QMainWindow):
         self.state_settings = None
         self.ui = None
         self.app_settings = None
+        self.painted = False
 
     def initialize(self, app_settings):
         """Initialize in manual call so we can set up other application settings before the view"""
-        # Has to be called ASAP to save and restore application state
-        self.state_settings = QSettings(
-            QSettings.NativeFormat,
-            QSettings.UserScope,
-            QApplication.organizationName(),
-            QApplication.applicationName()
-        )
-
         log.debug('Loading MainWindow')
         self.ui = Ui_MainWindow_MailPrep()
         self.ui.setupUi(self)
@@ -44,15 +41,12 @@ class MainWindow(QMainWindow):
         # Attach actions to the menu that have to be done in code as the designer doesn't seem to
         # be able to set actions created from widget methods
         self.ui.menuView.addAction(self.ui.dockWidget_outputWindow.toggleViewAction())
+        self.ui.plainTextEdit_output.setMaximumBlockCount(OUTPUT_WINDOW_MAX_LINES)
 
-        # Set default window state
-        if not self.restore_geometry():
-            self.setWindowState(Qt.WindowMaximized)
-        if not self.restore_state():
-            self.set_to_default_state()
+        # Saved window state is restored by restore_window_settings once the window was painted
         # self.ui.treeView_fileList.setModel(self.ctrl.file_system_model)
 
-        self.new_job_dialog = NewJobDialog()
+        # The new job dialog is only created when first shown (see on_new_job)
 
         # Create list to hold file input widgets
         self.file_input_widgets = []
@@ -72,10 +66,12 @@ class MainWindow(QMainWindow):
 
     @Slot()
     def append_text_to_output_windows(self, text):
-        self.ui.plainTextEdit_output.moveCursor(QTextCursor.End)
-        self.ui.plainTextEdit_output.insertPlainText(text)
-        self.ui.plainTextEdit_output.moveCursor(QTextCursor.End)
-
+        """Appends a chunk of output text at the end of the output window and scrolls to it"""
+        output = self.ui.plainTextEdit_output
+        cursor = output.textCursor()
+        cursor.movePosition(QTextCursor.End)
+        cursor.insertText(text)
+        output.setTextCursor(cursor)
 
     def set_to_default_state(self):
         """Sets default locations for widgets for when existing state is not restored"""
@@ -100,6 +96,9 @@ class MainWindow(QMainWindow):
     @log_call(log)
     def on_new_job(self):
         """Trigger on new job action to prompt for new job data"""
+        if self.new_job_dialog is None:
+            from mailprepgui.view.new_job_dialog import NewJobDialog  # pylint: disable = import-outside-toplevel
+            self.new_job_dialog = NewJobDialog()
         self.new_job_dialog.show()
 
     @Slot()
@@ -124,12 +123,34 @@ class MainWindow(QMainWindow):
         log.debug('add_paths: %s', add_paths)
         # TODO: Add code to add files and remove pylint disable when finished  # pylint: disable = fixme
 
+    def paintEvent(self, event):
+        """Overload for paint event handler to signal when the window was first painted"""
+        super().paintEvent(event)
+        if not self.painted:
+            self.painted = True
+            self.first_painted.emit()
+
     def closeEvent(self, event):
         """Overload for event handler on main window closing (i.e. application closing)"""
-        self.state_settings.setValue('ApplicationState/geometry', self.saveGeometry())
-        self.state_settings.setValue('ApplicationState/windowState', self.saveState())
+        # Not saved if closed before it was restored, as that would overwrite it with defaults
+        if self.state_settings is not None:
+            self.state_settings.setValue('ApplicationState/geometry', self.saveGeometry())
+            self.state_settings.setValue('ApplicationState/windowState', self.saveState())
         super().closeEvent(event)
 
+    def restore_window_settings(self):
+        """Restores saved window geometry and dock state, or sets the defaults if not saved"""
+        self.state_settings = QSettings(
+            QSettings.NativeFormat,
+            QSettings.UserScope,
+            QApplication.organizationName(),
+            QApplication.applicationName()
+        )
+        if not self.restore_geometry():
+            self.setWindowState(Qt.WindowMaximized)
+        if not self.restore_state():
+            self.set_to_default_state()
+
     def restore_geometry(self):
         """Restores saved geometry state if it was saved"""
         if self.state_settings.contains('ApplicationState/geometry'):
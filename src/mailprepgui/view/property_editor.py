@@ -1,7 +1,9 @@
 """Custom implementation of QTreeView for generalized and grouped property editing"""
 import logging
+from PySide2.QtCore import Qt, QEvent
 from PySide2.QtGui import QBrush, QColor
-from PySide2.QtWidgets import QTreeView, QCheckBox, QStyledItemDelegate
+from PySide2.QtWidgets import (
+    QApplication, QStyle, QStyleOptionButton, QTreeView, QStyledItemDelegate)
 from mailprepgui.model.qt_edit_types import QtEditTypes
 from mailprepgui.model.qt_user_roles import QtUserRole
 
@@ -20,21 +22,50 @@ class PropertyEditorDelegate(QStyledItemDelegate):
         self.parent = parent
 
     def paint(self, painter, option, index):
-        """Overrides base paint method to hide display if boolean value"""
+        """Overrides base paint method to paint boolean values as check boxes"""
         edit_type = self.parent.model().data(index, QtUserRole.EditTypeRole)
-        # Don't paint display for boolean values as "True" or "False" strings
-        # are visible under the persistent editor checkboxes being used
+        # Painted instead of opening a persistent QCheckBox editor for every boolean row
         if edit_type == QtEditTypes.Bool:
+            style = option.widget.style() if option.widget is not None else QApplication.style()
+            style.drawPrimitive(QStyle.PE_PanelItemViewItem, option, painter, option.widget)
+            style.drawControl(
+                QStyle.CE_CheckBox, self._check_box_option(option, index), painter, option.widget)
             return
         super().paint(painter, option, index)
 
+    def editorEvent(self, event, model, option, index):
+        """Overrides base editorEvent method to toggle boolean values on click or space"""
+        if model.data(index, QtUserRole.EditTypeRole) != QtEditTypes.Bool:
+            return super().editorEvent(event, model, option, index)
+        if not index.flags() & Qt.ItemIsEditable:
+            return False
+        if event.type() == QEvent.MouseButtonRelease and event.button() == Qt.LeftButton:
+            if not option.rect.contains(event.pos()):
+                return False
+        elif event.type() == QEvent.KeyPress and event.key() in (Qt.Key_Space, Qt.Key_Select):
+            pass
+        else:
+            # Swallow presses and double clicks so no editor is opened for booleans
+            return event.type() in (QEvent.MouseButtonPress, QEvent.MouseButtonDblClick)
+        return model.setData(index, not index.data(Qt.DisplayRole), Qt.EditRole)
+
     def createEditor(self, parent, option, index):
         """Overrides base createEditor method to specify editor from QtUserRole.EditTypeRole"""
         edit_type = self.parent.model().data(index, QtUserRole.EditTypeRole)
         if edit_type == QtEditTypes.Bool:
-            return QCheckBox(parent)
+            return None  # Toggled in editorEvent
         return super().createEditor(parent, option, index)
 
+    @staticmethod
+    def _check_box_option(option, index):
+        """Returns the style option of a check box at the start of the cell"""
+        check_box_option = QStyleOptionButton()
+        check_box_option.rect = option.rect
+        check_box_option.state = QStyle.State_Enabled
+        is_checked = index.data(Qt.DisplayRole)
+        check_box_option.state |= QStyle.State_On if is_checked else QStyle.State_Off
+        return check_box_option
+
 
 class PropertyEditor(QTreeView):
     """QTreeView subclass with style and editor modifications for generalized and grouped editors"""
@@ -49,6 +80,8 @@ class PropertyEditor(QTreeView):
         """Sets a model for the view and calls custom view modifications dependent on the model"""
         self.setModel(model)
         self.initialize_with_model()
+        # Re-apply whenever the model is reloaded in one reset
+        model.modelReset.connect(self.initialize_with_model)
 
     def initialize_with_model(self):
         """Initialize custom view modifications dependent of the model"""
@@ -58,13 +91,6 @@ class PropertyEditor(QTreeView):
             self.model().item(i).setForeground(QBrush(QColor('#ffffff')))
             self.setFirstColumnSpanned(i, root_index, True)
 
-            parent_index = self.model().index(i, 0)
-            parent = self.model().item(i)
-            for child_row, child in enumerate(children(parent, EDIT_COLUMN_INDEX)):
-                child_index = self.model().index(child_row, EDIT_COLUMN_INDEX, parent_index)
-                if child.data(QtUserRole.EditTypeRole) == QtEditTypes.Bool:
-                    self.openPersistentEditor(child_index)
-
 
 def children(item, column=0):
     """Iterates over all child QStandardItems of given QStandardItem with given column"""
@@ -3,26 +3,59 @@ import unicodedata
 import collections.abc
 
 
+# Upper bound on the number of raw keys remembered by normalize_key before it starts over
+NORMALIZED_KEY_CACHE_SIZE = 4096
+# Unicode normal form of normalized keys, compatibility characters and accents decomposed
+KEY_NORMAL_FORM = 'NFKD'
+_normalized_keys = {}
+
+
+def normalize_key(key):
+    """Normalized text key and converts to lower case if string, else pass through
+
+    Normalized strings are cached per raw key, and ASCII strings skip unicode normalization
+    (casefold is lower and NFKD changes nothing for ASCII characters).
+    """
+    if not isinstance(key, str):
+        return key
+    normalized = _normalized_keys.get(key)
+    if normalized is None:
+        if key.isascii():
+            normalized = ' '.join(key.lower().split())
+        else:
+            normalized = ' '.join(unicodedata.normalize(KEY_NORMAL_FORM, key.casefold()).split())
+        if len(_normalized_keys) >= NORMALIZED_KEY_CACHE_SIZE:
+            _normalized_keys.clear()
+        _normalized_keys[key] = normalized
+    return normalized
+
+
 class CaseInsensitiveDict(collections.abc.MutableMapping):
     """Mapping with normalized and case insensitive keys (stored as lower case)"""
 
+    __slots__ = ('store',)
+
+    keytransform = staticmethod(normalize_key)
+
     def __init__(self, *args, **kwargs):
         self.store = dict()
         self.update(*args, **kwargs)  # Set with update to apply transforms
 
     def __getitem__(self, key):
-        return self.store[self.keytransform(key)]
+        return self.store[normalize_key(key)]
 
     def __setitem__(self, key, value):
-        # If any value in the dict is a dict itself, it should also be converted to a CaseInsensitiveDict
+        # If any value in the dict is a dict itself, it should also be converted to a
+        # CaseInsensitiveDict
         if isinstance(value, dict):
-            print(f'__setitem__({key},{value})')
-            self.store[self.keytransform(key)] = CaseInsensitiveDict(value)
-        else:
-            self.store[self.keytransform(key)] = value
+            value = CaseInsensitiveDict(value)
+        self.store[normalize_key(key)] = value
 
     def __delitem__(self, key):
-        del self.store[self.keytransform(key)]
+        del self.store[normalize_key(key)]
+
+    def __contains__(self, key):
+        return normalize_key(key) in self.store
 
     def __iter__(self):
         return iter(self.store)
@@ -30,24 +63,59 @@ class CaseInsensitiveDict(collections.abc.MutableMapping):
     def __len__(self):
         return len(self.store)
 
-    def keytransform(self, key):
-        """Normalized text key and converts to lower case if string, else pass through"""
-        if isinstance(key, str):
-            return ' '.join(unicodedata.normalize("NFKD", key.casefold()).strip().split())
-        return key
+    def get(self, key, default=None):
+        return self.store.get(normalize_key(key), default)
 
     def __repr__(self):
         return repr(self.store)
 
 
+# Marker for keys missing from a mapping, as None is a valid value
+MISSING = object()
+
+
+def _stored_key(mapping, key):
+    """Returns the key as the mapping stores it (normalized for a CaseInsensitiveDict)"""
+    keytransform = getattr(mapping, 'keytransform', None)
+    return key if keytransform is None else keytransform(key)
+
+
 def recursive_merge(origin_dict, merge_dict, default=dict):
-    """Deep merge two dict object, assigning merge dict back into origin"""
-    for key, value in merge_dict.items():
-        if isinstance(value, collections.abc.Mapping):
-            origin_value = origin_dict.setdefault(key, default())  # Gets origin value for key or sets to empty dict
-            if isinstance(origin_value, collections.abc.Mapping):
-                recursive_merge(origin_value, value)
-            else:
-                origin_value = value
-        else:
-            origin_dict[key] = value
\ No newline at end of file
+    """Deep merge two dict object, assigning merge dict back into origin
+
+    Merges iteratively with an explicit stack, so nesting depth is not limited by recursion.
+    Nested mappings missing from origin are created with default and filled key by key (which
+    normalizes keys of a CaseInsensitiveDict default without copying merge dict up front),
+    unless they already are a default instance, in which case the subtree is shared instead of
+    copied. Values equal to the existing origin value are left untouched.
+
+    Returns the set of key paths (tuples of keys as stored in origin) that were added or changed.
+    """
+    changed_paths = set()
+    stack = [((), origin_dict, merge_dict)]
+    while stack:
+        path, origin, merge = stack.pop()
+        for key, value in merge.items():
+            origin_value = origin.get(key, MISSING)
+            if isinstance(value, collections.abc.Mapping):
+                if isinstance(origin_value, collections.abc.Mapping):
+                    stack.append((path + (_stored_key(origin, key),), origin_value, value))
+                    continue
+                key_path = path + (_stored_key(origin, key),)
+                if origin_value is MISSING and isinstance(value, default):
+                    # Structural sharing of an already normalized subtree
+                    origin[key] = value
+                    changed_paths.add(key_path)
+                else:
+                    # Replaces any non-mapping value in origin with the merged mapping
+                    origin[key] = default()
+                    # Read back, as a CaseInsensitiveDict origin stores a converted copy of a dict
+                    origin_value = origin[key]
+                    if value:
+                        stack.append((key_path, origin_value, value))
+                    else:
+                        changed_paths.add(key_path)
+            elif origin_value is MISSING or origin_value != value:
+                origin[key] = value
+                changed_paths.add(path + (_stored_key(origin, key),))
+    return changed_paths
@@ -0,0 +1,93 @@
+"""Timing of application startup phases and first imports, reported like python -X importtime"""
+import sys
+import time
+import builtins
+import threading
+import contextlib
+
+
+class StartupProfiler:
+    """Records durations of named startup phases and of modules first imported while tracing
+
+    A disabled profiler only checks a flag, so phases can be marked unconditionally.
+    """
+
+    def __init__(self, enabled=True, clock=time.perf_counter):
+        self.enabled = enabled
+        self.clock = clock
+        self.start_time = clock()
+        self.phases = []  # (name, seconds) in completion order
+        self.imports = []  # (depth, name, self seconds, cumulative seconds) in completion order
+        self._import_stack = []  # Seconds spent in nested imports of each import in progress
+        self._original_import = None
+        self._thread_id = None
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        """Times the enclosed block as a startup phase"""
+        if not self.enabled:
+            yield
+            return
+        start = self.clock()
+        try:
+            yield
+        finally:
+            self.record(name, start)
+
+    def record(self, name, start):
+        """Records a phase that started at the given clock value and ends now"""
+        if self.enabled:
+            self.phases.append((name, self.clock() - start))
+
+    def elapsed(self):
+        """Returns the seconds since the profiler was created"""
+        return self.clock() - self.start_time
+
+    def start_import_trace(self):
+        """Starts timing first imports made on the current thread"""
+        if not self.enabled or self._original_import is not None:
+            return
+        self._thread_id = threading.get_ident()
+        self._original_import = builtins.__import__
+        builtins.__import__ = self._import
+
+    def stop_import_trace(self):
+        """Stops timing imports"""
+        if self._original_import is not None:
+            builtins.__import__ = self._original_import
+            self._original_import = None
+
+    def _import(self, name, globals=None, locals=None, fromlist=(), level=0):  # pylint: disable = redefined-builtin
+        original_import = self._original_import
+        # Only absolute first imports are timed, relative ones count towards the importing module
+        if level or name in sys.modules or threading.get_ident() != self._thread_id:
+            return original_import(name, globals, locals, fromlist, level)
+        self._import_stack.append(0.0)
+        start = self.clock()
+        try:
+            return original_import(name, globals, locals, fromlist, level)
+        finally:
+            cumulative = self.clock() - start
+            nested = self._import_stack.pop()
+            if self._import_stack:
+                self._import_stack[-1] += cumulative
+            self.imports.append((len(self._import_stack), name, cumulative - nested, cumulative))
+
+    def report(self):
+        """Returns the report as text lines, imports in -X importtime format followed by phases"""
+        lines = ['import time: self [us] | cumulative | imported package']
+        for depth, name, self_seconds, cumulative_seconds in self.imports:
+            lines.append(
+                f'import time: {self_seconds * 1e6:9.0f} | {cumulative_seconds * 1e6:10.0f} | '
+                f'{"  " * depth}{name}')
+        for name, seconds in self.phases:
+            lines.append(f'startup phase: {seconds * 1000:9.1f} ms | {name}')
+        lines.append(f'startup total: {self.elapsed() * 1000:9.1f} ms')
+        return lines
+
+    def write_report(self, stream):
+        """Stops tracing imports and writes the report to a text stream"""
+        self.stop_import_trace()
+        if self.enabled and stream is not None:
+            stream.write('\n'.join(self.report()) + '\n')
+            stream.flush()
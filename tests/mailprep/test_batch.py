@@ -0,0 +1,150 @@
+import gc
+import csv
+import io
+import json
+import os
+import sys
+import tempfile
+import unittest
+import unittest.mock
+
+from mailprep import batch
+
+
+class TestBatch(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.job_directory = os.path.join(self.directory.name, 'Job 1')
+        os.mkdir(self.job_directory)
+        self.job_file_path = self.write_job(self.job_directory, {'properties': {'Customer': 'Acme'}})
+        self.write_csv('a.csv', ['name1', 'City', 'State'], [['Ann', 'Madison', 'WI'], ['Bob', 'Verona', 'WI']])
+        self.write_csv('b.csv', ['ID1', 'name1'], [['7', 'Cy']])
+
+    def write_job(self, directory, contents, file_name='job.mpjob'):
+        job_file_path = os.path.join(directory, file_name)
+        with open(job_file_path, 'w') as job_file:
+            json.dump(contents, job_file)
+        return job_file_path
+
+    def write_csv(self, file_name, headers, rows):
+        with open(os.path.join(self.job_directory, file_name), 'w', newline='') as csv_file:
+            writer = csv.writer(csv_file)
+            writer.writerow(headers)
+            writer.writerows(rows)
+
+    def read_output(self):
+        with open(batch.get_output_path(self.job_file_path), newline='') as output_file:
+            return list(csv.reader(output_file))
+
+    def test_merges_all_input_files(self):
+        report = batch.run_job(self.job_file_path)
+        self.assertIsNone(report['error'])
+        self.assertEqual(3, report['records'])
+        self.assertEqual([2, 1], [file_report['records'] for file_report in report['files']])
+        output = self.read_output()
+        self.assertEqual(['first', 'city', 'id'], output[0])
+        self.assertEqual(['Ann', 'Madison WI', ''], output[1])
+        self.assertEqual(['Cy', '', '7'], output[3])
+
+    def test_merged_in_chunks(self):
+        expected = batch.run_job(self.job_file_path)
+        expected_output = self.read_output()
+        with unittest.mock.patch.object(batch, 'MERGE_CHUNK_SIZE', 1):
+            for workers in (1, 2):
+                report = batch.run_job(self.job_file_path, workers=workers)
+                self.assertEqual([2, 1], [file_report['records'] for file_report in report['files']])
+                self.assertEqual(expected['records'], report['records'])
+                self.assertEqual(expected_output, self.read_output())
+
+    def test_convert_to_upper(self):
+        self.write_job(self.job_directory, {'Properties': {'convert to upper': True}})
+        report = batch.run_job(self.job_file_path)
+        self.assertIn('passes', report['seconds'])
+        self.assertEqual(['ANN', 'MADISON WI', ''], self.read_output()[1])
+        self.assertFalse(os.path.exists(
+            batch.get_output_path(self.job_file_path) + batch.RECORD_STORE_SUFFIX))
+
+    def test_normalize_text(self):
+        self.write_csv('a.csv', ['name1', 'Address1'], [['Zoë', ' 1 N. Park  St. ']])
+        self.write_job(self.job_directory, {'Properties': {'Normalize Text': True}})
+        batch.run_job(self.job_file_path)
+        self.assertEqual(['ZOE', '1 N PARK ST'], self.read_output()[1][:2])
+
+    def test_custom_campus(self):
+        self.write_csv('a.csv', ['name1', 'Address1'], [['Ann', '1 Park Street'], ['Bob', '2 Park St']])
+        os.remove(os.path.join(self.job_directory, 'b.csv'))
+        self.write_csv('campus.csv', ['Address1'], [['1 Park St.']])
+        self.write_job(self.job_directory, {'Properties': {
+            'Use Custom Campus': True, 'Custom Campus Path': 'campus.csv'}})
+        report = batch.run_job(self.job_file_path)
+        self.assertEqual(['a.csv'], [file_report['file'] for file_report in report['files']])
+        self.assertEqual(
+            [['first', 'address', 'campus'], ['Ann', '1 Park Street', 'Y'], ['Bob', '2 Park St', '']],
+            self.read_output())
+
+    def test_output_not_used_as_input(self):
+        batch.run_job(self.job_file_path)
+        report = batch.run_job(self.job_file_path)
+        self.assertEqual(['a.csv', 'b.csv'], [file_report['file'] for file_report in report['files']])
+
+    def test_other_jobs_not_used_as_input(self):
+        top_job_file_path = self.write_job(self.directory.name, {}, 'top.mpjob')
+        with open(os.path.join(self.directory.name, 'top.csv'), 'w') as csv_file:
+            csv_file.write('name1\nTop\n')
+        sibling_job_file_path = self.write_job(self.job_directory, {}, 'sibling.mpjob')
+        for _ in range(2):
+            reports = batch.run_jobs([top_job_file_path, self.job_file_path, sibling_job_file_path])
+        self.assertEqual(['top.csv'], [file_report['file'] for file_report in reports[0]['files']])
+        for report in reports[1:]:
+            self.assertEqual(['a.csv', 'b.csv'], [file_report['file'] for file_report in report['files']])
+            self.assertEqual(3, report['records'])
+
+    def test_dry_run(self):
+        report = batch.run_job(self.job_file_path, dry_run=True)
+        self.assertIsNone(report['output'])
+        self.assertFalse(os.path.exists(batch.get_output_path(self.job_file_path)))
+        self.assertEqual('{name1}', report['files'][0]['mapping']['first'])
+
+    def test_files_section(self):
+        self.job_file_path = self.write_job(self.job_directory, {'Files': {
+            'b.csv': {'Priority': 2, 'Mapping': {'key': '{ID1}'}},
+            'a.csv': {'Priority': 1, 'Mapping': {'key': '{name1}'}},
+            'c.csv': {'Selected': False},
+        }})
+        batch.run_job(self.job_file_path)
+        self.assertEqual([['key'], ['Ann'], ['Bob'], ['7']], self.read_output())
+
+    def test_invalid_job_file(self):
+        with open(self.job_file_path, 'w') as job_file:
+            job_file.write('{')
+        self.assertIn('Unable to read job file', batch.run_job(self.job_file_path)['error'])
+
+    def test_unreadable_input_reported(self):
+        with open(os.path.join(self.job_directory, 'c.xlsx'), 'wb') as xlsx_file:
+            xlsx_file.write(b'not a workbook')
+        report = batch.run_job(self.job_file_path, dry_run=True)
+        self.assertIsNone(report['error'])
+        self.assertIsNotNone(report['files'][2]['error'])
+
+    def test_main_json_report(self):
+        self.addCleanup(gc.set_threshold, *gc.get_threshold())
+        self.write_job(self.directory.name, {}, 'empty.mpjob')
+        stdout = io.StringIO()
+        with unittest.mock.patch.object(sys, 'stdout', stdout):
+            exit_code = batch.main([self.directory.name, '--workers', '1', '--json'])
+        summary = json.loads(stdout.getvalue())
+        self.assertEqual(0, exit_code)
+        self.assertEqual(
+            [os.path.join(self.directory.name, 'empty.mpjob'), self.job_file_path],
+            [report['job'] for report in summary['jobs']])
+        self.assertIn('merge', summary['jobs'][1]['seconds'])
+        self.assertEqual(batch.GC_THRESHOLDS, gc.get_threshold())
+
+    def test_jobs_in_parallel(self):
+        other_directory = os.path.join(self.directory.name, 'Job 2')
+        os.mkdir(other_directory)
+        self.write_job(other_directory, {})
+        reports = batch.run_jobs(batch.find_job_files([self.directory.name]), workers=2)
+        self.assertEqual([3, 0], [report['records'] for report in reports])
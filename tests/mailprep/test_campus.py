@@ -0,0 +1,84 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from mailprep.campus import CampusIndex, index_cache_path, normalize_address
+from mailprep.text_input import read_text_rows
+
+
+class TestNormalizeAddress(unittest.TestCase):
+
+    def test_punctuation_case_and_abbreviations(self):
+        self.assertEqual('1 n park st ste 2', normalize_address(' 1 N. Park  Street, Suite #2'))
+
+    def test_unicode(self):
+        self.assertEqual(normalize_address('1 Ｍain St'), normalize_address('1 main st'))
+
+    def test_accents_removed(self):
+        self.assertEqual(normalize_address('1 Cafe St'), normalize_address('1 Café St'))
+        self.assertEqual('1 cafe st', normalize_address('1 Cafe\u0301 St'))
+        self.assertEqual(normalize_address("12 O'Neil Strasse"), normalize_address('12 O’Neil Straße'))
+
+    def test_fullwidth_punctuation_removed(self):
+        self.assertEqual('1 n park st', normalize_address('１ Ｎ． Park Street'))
+
+
+class TestCampusIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.index = CampusIndex.from_rows(['Name', 'Address1', 'Mail Code'], [
+            ('John Doe', '1 N. Park Street', 'UW1'),
+            ('', '21 North Park St.', ''),
+            ('Blank Address', '', 'UW2'),
+        ])
+
+    def test_name_and_address_entry(self):
+        self.assertEqual('UW1', self.index.match('1 n park st', 'JOHN  doe'))
+        self.assertEqual('', self.index.match('1 n park st', 'Jane Doe'))
+
+    def test_accented_name(self):
+        index = CampusIndex()
+        index.add('Rue de l’Église', 'José Núñez', 'UW3')
+        self.assertEqual('UW3', index.match('Rue de l Eglise', 'Jose Nunez'))
+
+    def test_address_entry_matches_any_name(self):
+        self.assertEqual(['Y', 'Y'], self.index.mark_values(['21 N Park Street'] * 2, ['Ann', '']))
+        self.assertEqual(['Y', ''], self.index.mark_values(['21 n park st', '']))
+
+    def test_blank_addresses_not_indexed(self):
+        self.assertEqual(2, len(self.index))
+
+    def test_file_without_address_column(self):
+        with self.assertRaises(ValueError):
+            CampusIndex.from_rows(['Name'], [('John',)])
+
+
+class TestCampusIndexCache(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.path = os.path.join(self.directory.name, 'campus.csv')
+        self.write_campus('Address1\n1 Park St\n')
+
+    def write_campus(self, contents, mtime_ns=1000000000):
+        with open(self.path, 'w') as campus_file:
+            campus_file.write(contents)
+        os.utime(self.path, ns=(mtime_ns, mtime_ns))
+
+    def test_cached_until_file_changes(self):
+        read_rows = mock.Mock(side_effect=read_text_rows)
+        self.assertEqual(1, len(CampusIndex.load(self.path, read_rows)))
+        self.assertTrue(os.path.exists(index_cache_path(self.path)))
+        self.assertEqual({'1 park st': 'Y'}, CampusIndex.load(self.path, read_rows).entries)
+        self.assertEqual(1, read_rows.call_count)
+
+        self.write_campus('Address1\n1 Park St\n2 Park St\n', mtime_ns=2000000000)
+        self.assertEqual(2, len(CampusIndex.load(self.path, read_rows)))
+        self.assertEqual(2, read_rows.call_count)
+
+    def test_unreadable_cache_rebuilt(self):
+        with open(index_cache_path(self.path), 'wb') as cache_file:
+            cache_file.write(b'not marshal data')
+        self.assertEqual(1, len(CampusIndex.load(self.path, read_text_rows)))
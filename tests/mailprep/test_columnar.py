@@ -0,0 +1,76 @@
+import unittest
+
+from mailprep import columnar
+from mailprep.merge import RecordMerger, create_map_dict
+
+
+@unittest.skipUnless(columnar.is_available(), 'NumPy is not installed')
+class TestColumnarMerger(unittest.TestCase):
+
+    headers = [
+        'index', 'mr', 'ID1', 'ID2', 'name1', 'name9', 'Title', 'Firm', 'Line1', 'Line2',
+        'City', 'State', 'Zip', 'list_id',
+    ]
+    rows = [
+        (1, 'Dr', 'A1', 'B1', 'John', 'Jr', 'Dean', 'UW', '1 Main St', 'Suite 2',
+         'Madison', 'WI', 53706, 'UW#001'),
+        (2, '', 'A2', None, 'Jane', '', '', 'UW', '2 Main St', None,
+         'Madison', ' ', '53706', 'UW#001'),
+        (3, None, None, None, None, None, None, None, None, None, None, None, None, None),
+        (4, '50%', 'A4', 'B4', ' ', 'Sr', 'Chair', '', '', 'PO Box 4',
+         '', 'WI', '', 'UW#002'),
+    ]
+
+    def test_matches_row_wise_merge(self):
+        mappings = create_map_dict(self.headers)
+        expected = list(RecordMerger(mappings).merge(self.rows, self.headers))
+        actual = list(columnar.ColumnarMerger(mappings).merge(self.rows, self.headers))
+        self.assertSequenceEqual(expected, actual)
+
+    def test_blank_fields_collapse_separators(self):
+        merger = columnar.ColumnarMerger({'first': '{name1}, {name9}'})
+        rows = [('John', ''), ('', 'Jr'), (None, None)]
+        columns = columnar.load_columns(rows, ['name1', 'name9'])
+        actual = list(merger.merge_columns(columns)['first'])
+        self.assertSequenceEqual(['John', 'Jr', ''], actual)
+
+    def test_literal_template(self):
+        merger = columnar.ColumnarMerger({'country': 'USA'})
+        actual = list(merger.merge([('a',), ('b',)], ['x']))
+        self.assertSequenceEqual([('USA',), ('USA',)], actual)
+
+    def test_short_rows_padded(self):
+        mappings = {'first': '{name1} {name9}', 'city': '{City}'}
+        rows = [('John', 'Jr', 'Madison'), ('Jane',), ()]
+        columns = columnar.load_columns(rows, ['name1', 'name9', 'City'])
+        self.assertSequenceEqual(['Madison', '', ''], list(columns['City']))
+        padded_rows = [row + ('',) * (3 - len(row)) for row in rows]
+        expected = list(RecordMerger(mappings).merge(padded_rows, ['name1', 'name9', 'City']))
+        actual = list(columnar.ColumnarMerger(mappings).merge(rows, ['name1', 'name9', 'City']))
+        self.assertSequenceEqual(expected, actual)
+
+    def test_rows_shorter_than_headers(self):
+        columns = columnar.load_columns([('a',), ('b',)], ['x', 'y'])
+        self.assertSequenceEqual(['', ''], list(columns['y']))
+
+    def test_only_given_fields_loaded(self):
+        rows = iter([('a', 'b', 'c'), ('d', 'e', 'f')])
+        columns = columnar.load_columns(rows, ['x', 'y', 'x'], fields={'x'})
+        self.assertSequenceEqual(['x'], list(columns))
+        self.assertSequenceEqual(['a', 'd'], list(columns['x']))
+
+    def test_empty_mappings(self):
+        rows = [('a',), ('b',)]
+        self.assertSequenceEqual(
+            list(RecordMerger({}).merge(rows, ['x'])),
+            list(columnar.ColumnarMerger({}).merge(rows, ['x'])))
+        self.assertSequenceEqual([(), ()], list(columnar.ColumnarMerger({}).merge(rows, ['x'])))
+
+    def test_empty_rows(self):
+        merger = columnar.ColumnarMerger({'first': '{name1}'})
+        self.assertSequenceEqual([], list(merger.merge([], ['name1'])))
+
+    def test_missing_header(self):
+        merger = columnar.ColumnarMerger({'first': '{name1}'})
+        with self.assertRaises(KeyError):
+            merger.merge([], ['name9'])
@@ -0,0 +1,90 @@
+import os
+import re
+import tempfile
+import unittest
+
+from mailprep.header_index import HeaderIndex, guess_file_type
+from xlsx_files import write_xlsx
+
+
+class TestGuessFileType(unittest.TestCase):
+
+    def test_first_matching_pattern(self):
+        file_types = [
+            {'Name': 'Foreign', 'Pattern': re.compile(r'\bcountry\b', re.IGNORECASE)},
+            {'Name': 'Normal', 'Pattern': re.compile('')},
+        ]
+        self.assertEqual('Foreign', guess_file_type(['name1', 'Country'], file_types))
+        self.assertEqual('Normal', guess_file_type(['name1', 'City'], file_types))
+
+    def test_default_file_types(self):
+        self.assertEqual('Normal', guess_file_type(['name1']))
+
+
+class TestHeaderIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        os.mkdir(os.path.join(self.directory.name, 'input'))
+        write_xlsx(self.path('first.xlsx'), [['ID1', 'name1', 'City']])
+        write_xlsx(self.path('input', 'first.xlsx'), [['id', 'last_line']])
+        with open(self.path('notes.txt'), 'w') as notes_file:
+            notes_file.write('not a spreadsheet')
+
+    def path(self, *parts):
+        return os.path.join(self.directory.name, *parts)
+
+    def test_scan_sniffs_spreadsheets(self):
+        header_index = HeaderIndex(self.directory.name)
+        updated = header_index.scan()
+        self.assertSequenceEqual(['first.xlsx', os.path.join('input', 'first.xlsx')], updated)
+        entry = header_index.get('first.xlsx')
+        self.assertSequenceEqual(['ID1', 'name1', 'City'], entry.headers)
+        self.assertEqual('Normal', entry.file_type)
+        input_entry = header_index.get(os.path.join('input', 'first.xlsx'))
+        self.assertEqual('{last_line}', input_entry.mapping['city'])
+
+    def test_reload_only_rescans_changed(self):
+        header_index = HeaderIndex(self.directory.name)
+        header_index.scan()
+        header_index.save()
+
+        write_xlsx(self.path('first.xlsx'), [['ID1', 'name1', 'City', 'State']])
+        reloaded = HeaderIndex(self.directory.name).load()
+        self.assertEqual(2, len(reloaded.entries))
+        self.assertSequenceEqual(['first.xlsx'], reloaded.scan())
+        self.assertSequenceEqual(['ID1', 'name1', 'City', 'State'], reloaded.get('first.xlsx').headers)
+
+    def test_removed_files_dropped(self):
+        header_index = HeaderIndex(self.directory.name)
+        header_index.scan()
+        os.remove(self.path('first.xlsx'))
+        header_index.scan()
+        self.assertIsNone(header_index.get('first.xlsx'))
+
+    def test_unreadable_file_recorded(self):
+        with open(self.path('broken.xlsx'), 'w') as broken_file:
+            broken_file.write('not a zip file')
+        header_index = HeaderIndex(self.directory.name)
+        header_index.scan()
+        entry = header_index.get('broken.xlsx')
+        self.assertIsNone(entry.headers)
+        self.assertIsNotNone(entry.error)
+        self.assertSequenceEqual([], header_index.scan())
+
+    def test_save_leaves_no_temporary_files(self):
+        header_index = HeaderIndex(self.directory.name)
+        header_index.scan()
+        header_index.save()
+        other_index = HeaderIndex(self.directory.name)
+        other_index.scan()
+        other_index.save()
+        self.assertEqual(['.mpindex', 'first.xlsx', 'input', 'notes.txt'], sorted(os.listdir(self.directory.name)))
+        self.assertEqual(2, len(HeaderIndex(self.directory.name).load().entries))
+
+    def test_own_mapping_cache(self):
+        header_index = HeaderIndex(self.directory.name)
+        header_index.scan()
+        self.assertEqual(2, header_index.mapping_cache.cache_info().misses)
+        self.assertIsNot(header_index.mapping_cache, HeaderIndex(self.directory.name).mapping_cache)
@@ -0,0 +1,104 @@
+import csv
+import multiprocessing
+import os
+import tempfile
+import unittest
+from collections import namedtuple
+
+from mailprep import columnar
+from mailprep.job_runner import JobRunner
+from mailprep.merge import ConfigMergeMapping, RecordMerger
+
+
+# Same attributes as mailprepgui.model.input_file.InputFile used by the runner
+InputFile = namedtuple('InputFile', ['file_name', 'priority'])
+
+
+def read_csv_rows(path):
+    """Module level so it can be pickled to worker processes"""
+    with open(path, newline='') as csv_file:
+        rows = list(csv.reader(csv_file))
+    return rows[0], rows[1:]
+
+
+def read_csv_rows_in_main_process(path):
+    """Ends a worker process it is called in, breaking the process pool"""
+    if multiprocessing.current_process().name != 'MainProcess':
+        os._exit(1)
+    return read_csv_rows(path)
+
+
+class ExitingMerger(RecordMerger):
+    """Ends a worker process merging the row 'a2', breaking the process pool"""
+
+    def merge(self, rows, headers):
+        in_worker = multiprocessing.current_process().name != 'MainProcess'
+        if in_worker and ['a2', 'Madison'] in rows:
+            os._exit(1)
+        return super().merge(rows, headers)
+
+
+class TestJobRunner(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.write_csv('first.csv', ['name1', 'City'], [[f'a{i}', 'Madison'] for i in range(5)])
+        self.write_csv('second.csv', ['name', 'city'], [[f'b{i}', 'Verona'] for i in range(3)])
+        self.merge_mapping = ConfigMergeMapping()
+        self.merge_mapping.set_file_mappings('first.csv', {'first': '{name1}', 'city': '{City}'})
+        self.merge_mapping.set_file_mappings('second.csv', {'first': '{name}', 'city': '{city}'})
+        self.input_files = [InputFile('first.csv', 2), InputFile('second.csv', 1)]
+        self.expected = [
+            ('second.csv', [(f'b{i}', 'Verona') for i in range(3)]),
+            ('first.csv', [(f'a{i}', 'Madison') for i in range(5)]),
+        ]
+
+    def write_csv(self, file_name, headers, rows):
+        with open(os.path.join(self.directory.name, file_name), 'w', newline='') as csv_file:
+            writer = csv.writer(csv_file)
+            writer.writerow(headers)
+            writer.writerows(rows)
+
+    def run_job(self, workers, chunk_size=None, read_rows=read_csv_rows, **kwargs):
+        runner = JobRunner(
+            self.merge_mapping, read_rows, workers=workers, chunk_size=chunk_size,
+            directory=self.directory.name, **kwargs)
+        return [(input_file.file_name, records) for input_file, records in runner.run(self.input_files)]
+
+    def test_serial_priority_order(self):
+        self.assertSequenceEqual(self.expected, self.run_job(workers=1))
+
+    def test_parallel_matches_serial(self):
+        self.assertSequenceEqual(self.expected, self.run_job(workers=2))
+
+    def test_chunked_parallel_matches_serial(self):
+        actual = self.run_job(workers=2, chunk_size=2)
+        self.assertSequenceEqual(
+            ['second.csv', 'second.csv', 'first.csv', 'first.csv', 'first.csv'],
+            [file_name for file_name, _ in actual])
+        for file_name, records in self.expected:
+            merged = [record for name, chunk in actual if name == file_name for record in chunk]
+            self.assertSequenceEqual(records, merged)
+
+    def test_chunked_serial_matches_parallel(self):
+        self.assertSequenceEqual(
+            self.run_job(workers=2, chunk_size=2), self.run_job(workers=1, chunk_size=2))
+
+    @unittest.skipUnless(columnar.is_available(), 'NumPy is not installed')
+    def test_columnar_backend(self):
+        actual = self.run_job(workers=2, merger_class=columnar.ColumnarMerger)
+        self.assertSequenceEqual(self.expected, actual)
+
+    def test_unpicklable_read_rows_merged_serially(self):
+        def read_rows(path):
+            return read_csv_rows(path)
+        self.assertSequenceEqual(self.expected, self.run_job(workers=2, read_rows=read_rows))
+
+    def test_broken_pool_falls_back_to_serial(self):
+        actual = self.run_job(workers=2, read_rows=read_csv_rows_in_main_process)
+        self.assertSequenceEqual(self.expected, actual)
+
+    def test_chunked_fallback_resumes_after_yielded_chunks(self):
+        actual = self.run_job(workers=2, chunk_size=2, merger_class=ExitingMerger)
+        self.assertSequenceEqual(self.run_job(workers=1, chunk_size=2), actual)
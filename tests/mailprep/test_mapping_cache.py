@@ -0,0 +1,69 @@
+import os
+import tempfile
+import unittest
+
+from mailprep.mapping_cache import MappingCache
+from mailprep.merge import FieldMapper, HeaderClassifier, create_map_dict
+
+
+class TestMappingCache(unittest.TestCase):
+
+    headers = ['index', 'ID1', 'ID2', 'name1', 'name9', 'City', 'State', 'Zip', 'list_id']
+
+    def test_same_result_as_create_map_dict(self):
+        cache = MappingCache()
+        self.assertEqual(create_map_dict(self.headers), cache.create_map_dict(self.headers))
+        self.assertEqual(create_map_dict(self.headers), cache.create_map_dict(self.headers))
+
+    def test_hit_miss_counters(self):
+        cache = MappingCache()
+        cache.create_map_dict(self.headers)
+        cache.create_map_dict(list(self.headers))
+        cache.create_map_dict(['other'])
+        info = cache.cache_info()
+        self.assertEqual(1, info.hits)
+        self.assertEqual(2, info.misses)
+        self.assertEqual(2, info.currsize)
+
+    def test_returns_copy(self):
+        cache = MappingCache()
+        cache.create_map_dict(self.headers)['id'] = 'modified'
+        self.assertEqual('{ID1}:{ID2}', cache.create_map_dict(self.headers)['id'])
+
+    def test_least_recently_used_evicted(self):
+        cache = MappingCache(maxsize=2)
+        cache.create_map_dict(['a'])
+        cache.create_map_dict(['b'])
+        cache.create_map_dict(['a'])
+        cache.create_map_dict(['c'])
+        self.assertSequenceEqual([('a',), ('c',)], list(cache.entries))
+
+    def test_invalidated_on_definition_change(self):
+        cache = MappingCache(classifier=HeaderClassifier([FieldMapper('id', [r'id\d?'])]))
+        self.assertEqual({'id': '{ID1}'}, cache.create_map_dict(['ID1']))
+        cache.classifier = HeaderClassifier([FieldMapper('key', [r'id\d?'])])
+        self.assertEqual({'key': '{ID1}'}, cache.create_map_dict(['ID1']))
+        self.assertEqual(2, cache.cache_info().misses)
+
+    def test_persisted_next_to_job_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            job_file_path = os.path.join(directory, 'job.mpjob')
+            cache = MappingCache.for_job(job_file_path)
+            expected = cache.create_map_dict(self.headers)
+            cache.save()
+            self.assertTrue(os.path.isfile(os.path.join(directory, 'job.mapcache')))
+
+            reloaded = MappingCache.for_job(job_file_path)
+            self.assertEqual(expected, reloaded.create_map_dict(self.headers))
+            self.assertEqual(1, reloaded.cache_info().hits)
+
+    def test_outdated_file_ignored(self):
+        with tempfile.TemporaryDirectory() as directory:
+            job_file_path = os.path.join(directory, 'job.mpjob')
+            cache = MappingCache.for_job(job_file_path)
+            cache.create_map_dict(self.headers)
+            cache.save()
+
+            classifier = HeaderClassifier([FieldMapper('id', [r'id\d?'])])
+            reloaded = MappingCache.for_job(job_file_path, classifier=classifier)
+            self.assertEqual(0, reloaded.cache_info().currsize)
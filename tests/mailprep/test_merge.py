@@ -1,7 +1,9 @@
 import io
 import unittest
 
-from mailprep.merge import create_map_dict, FieldMapper, _wrap_in_braces, ConfigMergeMapping
+from mailprep.merge import (
+    create_map_dict, FieldMapper, NameFieldMapper, HeaderClassifier, _wrap_in_braces,
+    ConfigMergeMapping, MergeTemplate, RecordMerger, merge_records)
 
 class TestConfigMergeMapping(unittest.TestCase):
 
@@ -227,6 +229,44 @@ class TestFieldMapper(unittest.TestCase):
         self.assertFalse(mapper.is_match('i d'))
 
 
+class TestHeaderClassifier(unittest.TestCase):
+
+    def test_first_matching_mapper_wins(self):
+        classifier = HeaderClassifier([
+            FieldMapper('address', [r'address1?', r'line1?']),
+            FieldMapper('address2', [r'address2', r'line2']),
+            FieldMapper('city', [r'city', r'st(ate)?\d?']),
+        ])
+        actual_map = classifier.classify(['Line2', 'Line1', 'state', 'other'])
+        expected_map = {
+            'address': '{Line1}',
+            'address2': '{Line2}',
+            'city': '{state}',
+            'other': '{other}',
+        }
+        self.assertDictEqual(expected_map, actual_map)
+
+    def test_output_order_follows_definitions(self):
+        classifier = HeaderClassifier([
+            FieldMapper('id', [r'id\d?'], join_string=':'),
+            NameFieldMapper('first', [r'name\d?']),
+        ])
+        actual_map = classifier.classify(['extra', 'name9', 'id2', 'name1', 'id1'])
+        self.assertSequenceEqual(['id', 'first', 'extra'], list(actual_map.keys()))
+        self.assertEqual('{id1}:{id2}', actual_map['id'])
+        self.assertEqual('{name1}, {name9}', actual_map['first'])
+
+    def test_blacklist_ignored(self):
+        classifier = HeaderClassifier([FieldMapper('id', [r'id\d?'])], blacklist=['index'])
+        actual_map = classifier.classify(['index', 'id', 'other'])
+        self.assertDictEqual({'id': '{id}', 'other': '{other}'}, actual_map)
+
+    def test_matches_stripped_header(self):
+        classifier = HeaderClassifier([FieldMapper('id', [r'id\d?'])])
+        actual_map = classifier.classify([' ID1 '])
+        self.assertDictEqual({'id': '{ ID1 }'}, actual_map)
+
+
 class TestWrapInBraces(unittest.TestCase):
 
     def test_wrap_in_braces(self):
@@ -393,3 +433,69 @@ class TestGetHeaders(unittest.TestCase):
             'list_id': '{list_id}',
         }
         self.assertDictEqual(expected_map, actual_map)
+
+
+class TestMergeTemplate(unittest.TestCase):
+
+    def test_compiled_fields_and_separators(self):
+        template = MergeTemplate('{City} {State} {Zip}')
+        self.assertSequenceEqual(['City', 'State', 'Zip'], template.fields)
+        self.assertSequenceEqual(['', ' ', ' '], template.separators)
+
+    def test_render_all_values(self):
+        template = MergeTemplate('{name1}, {name9}')
+        self.assertEqual('John, Jr', template.render(['John', 'Jr']))
+
+    def test_render_blank_value_drops_separator(self):
+        template = MergeTemplate('{name1}, {name9}')
+        self.assertEqual('John', template.render(['John', '']))
+        self.assertEqual('Jr', template.render([None, 'Jr']))
+        self.assertEqual('', template.render([None, ' ']))
+
+    def test_render_non_string_values(self):
+        template = MergeTemplate('{City} {State} {Zip}')
+        self.assertEqual('Madison WI 53706', template.render(['Madison', 'WI', 53706]))
+
+    def test_render_literal_percent(self):
+        template = MergeTemplate('{rate}%')
+        self.assertEqual('5%', template.render(['5']))
+
+
+class TestRecordMerger(unittest.TestCase):
+
+    mappings = {
+        'first': '{name1}, {name9}',
+        'city': '{City} {State} {Zip}',
+    }
+
+    def test_merge_row_dicts(self):
+        rows = [
+            {'name1': 'John', 'name9': 'Jr', 'City': 'Madison', 'State': 'WI', 'Zip': '53706'},
+            {'name1': 'Jane', 'name9': '', 'City': 'Verona', 'State': '', 'Zip': '53593'},
+        ]
+        actual = list(merge_records(rows, self.mappings))
+        expected = [
+            ('John, Jr', 'Madison WI 53706'),
+            ('Jane', 'Verona 53593'),
+        ]
+        self.assertSequenceEqual(expected, actual)
+
+    def test_merge_row_sequences_with_headers(self):
+        headers = ['Zip', 'State', 'City', 'name9', 'name1']
+        rows = [('53706', 'WI', 'Madison', None, 'John')]
+        merger = RecordMerger(self.mappings)
+        self.assertSequenceEqual(['first', 'city'], merger.output_fields)
+        actual = list(merger.merge(rows, headers))
+        self.assertSequenceEqual([('John', 'Madison WI 53706')], actual)
+
+    def test_merge_missing_header(self):
+        merger = RecordMerger(self.mappings)
+        with self.assertRaises(KeyError):
+            merger.merge([], ['name1', 'name9'])
+
+    def test_merge_is_lazy(self):
+        def rows():
+            yield {'name1': 'John', 'name9': '', 'City': 'Madison', 'State': 'WI', 'Zip': ''}
+            raise AssertionError('Rows should only be read as records are requested')
+        records = RecordMerger(self.mappings).merge(rows())
+        self.assertEqual(('John', 'Madison WI'), next(records))
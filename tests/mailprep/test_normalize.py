@@ -0,0 +1,37 @@
+import unittest
+
+from mailprep.normalize import TextNormalizer, upper_case_normalizer, usps_normalizer
+
+
+class TestTextNormalizer(unittest.TestCase):
+
+    def test_usps_style(self):
+        self.assertEqual(
+            ['N ONEIL ST APT #4', 'CAFE STRASSE', 'AT&T - 1/2', '', 'FIELD OSTER'],
+            usps_normalizer.normalize_values([
+                '  N. O’Neil\t St.,  Apt #4 ', 'Café Straße', 'AT&T — 1/2', '', 'ﬁeld Øster']))
+
+    def test_mixed_ascii_and_accented_values_keep_order(self):
+        values = [
+            f'{index} Zoë' if index % 3 == 0 else f'{index}  main st.' for index in range(10)]
+        self.assertEqual(
+            [usps_normalizer.normalize(value) for value in values],
+            usps_normalizer.normalize_values(values))
+        self.assertEqual('3 ZOE', usps_normalizer.normalize_values(values)[3])
+
+    def test_whitespace_collapsed_and_stripped(self):
+        self.assertEqual(['A B', 'C', ''], usps_normalizer.normalize_values([' a   b ', '\nc\r\n', '   ']))
+
+    def test_value_containing_separator(self):
+        self.assertEqual(['A B', 'C'], usps_normalizer.normalize_values(['a\0b', 'c']))
+
+    def test_upper_only(self):
+        self.assertEqual(
+            ['N. PARK  ST', 'CAFÉ'], upper_case_normalizer.normalize_values(['n. park  st', 'Café']))
+
+    def test_options(self):
+        normalizer = TextNormalizer(upper=False, clean_punctuation=False)
+        self.assertEqual(['Cafe St.'], normalizer.normalize_values([' Café  St. ']))
+
+    def test_empty_batch(self):
+        self.assertEqual([], usps_normalizer.normalize_values([]))
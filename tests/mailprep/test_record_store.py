@@ -0,0 +1,66 @@
+import os
+import array
+import tempfile
+import unittest
+
+from mailprep.record_store import RecordStore, RecordStoreError, RecordStoreWriter, _encode_column
+
+
+class TestRecordStore(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.path = os.path.join(self.directory.name, 'records.mprs')
+        self.fields = ['first', 'city', 'zip']
+        self.rows = [(f'Náme{index}', 'Madison' if index % 2 else '', str(53700 + index)) for index in range(10)]
+
+    def write(self, rows, block_rows=4):
+        with RecordStoreWriter(self.path, self.fields, block_rows) as writer:
+            writer.write_rows(rows[:3])
+            writer.write_rows(rows[3:])
+        return writer
+
+    def test_rows_round_trip_across_blocks(self):
+        writer = self.write(self.rows)
+        self.assertEqual([4, 4, 2], [block.row_count for block in writer.blocks])
+        with RecordStore(self.path) as store:
+            self.assertEqual(self.fields, store.fields)
+            self.assertEqual(10, len(store))
+            self.assertEqual(self.rows, list(store.rows()))
+            self.assertEqual([(row[2], row[0]) for row in self.rows], list(store.rows(['zip', 'first'])))
+            self.assertEqual([row[1] for row in self.rows], list(store.column('city')))
+
+    def test_encode_column_offsets(self):
+        typecode, offsets, text = _encode_column(['Ann', '', 'Zoë'])
+        self.assertEqual('I', typecode)
+        self.assertEqual([0, 3, 3, 6], list(array.array(typecode, offsets)))
+        self.assertEqual('AnnZoë'.encode('utf-8'), text)
+        self.assertEqual([0], list(array.array('I', _encode_column([])[1])))
+
+    def test_empty_store(self):
+        self.write([])
+        with RecordStore(self.path) as store:
+            self.assertEqual([], list(store.rows()))
+
+    def test_map_columns_copies_other_columns(self):
+        self.write(self.rows)
+        mapped_path = os.path.join(self.directory.name, 'mapped.mprs')
+        with RecordStore(self.path) as store:
+            store.map_columns(mapped_path, {'first': lambda values: [value.upper() for value in values]})
+            with self.assertRaises(KeyError):
+                store.map_columns(mapped_path, {'missing': list})
+        with RecordStore(mapped_path) as mapped:
+            self.assertEqual([(row[0].upper(),) + row[1:] for row in self.rows], list(mapped.rows()))
+
+    def test_wrong_record_length(self):
+        with self.assertRaises(ValueError):
+            self.write([('Ann', 'Madison')])
+        self.assertEqual([], os.listdir(self.directory.name))
+
+    def test_invalid_file(self):
+        for contents in (b'', b'not a record store file'):
+            with open(self.path, 'wb') as store_file:
+                store_file.write(contents)
+            with self.assertRaises(RecordStoreError):
+                RecordStore(self.path)
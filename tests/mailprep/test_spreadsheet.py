@@ -0,0 +1,156 @@
+import os
+import tempfile
+import unittest
+import zipfile
+from unittest import mock
+
+from mailprep import spreadsheet
+from mailprep.spreadsheet import (
+    SpreadsheetError, read_header, read_rows, read_xls_header, read_xls_rows, read_xlsx_header,
+    read_xlsx_rows)
+from xlsx_files import MAIN_NAMESPACE, write_xlsx
+
+
+class TestReadXlsxHeader(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.path = os.path.join(self.directory.name, 'list.xlsx')
+
+    def test_shared_string_header(self):
+        write_xlsx(self.path, [['name1', 'City', 'Zip'], ['John', 'Madison', 53706]])
+        self.assertSequenceEqual(['name1', 'City', 'Zip'], read_xlsx_header(self.path))
+
+    def test_inline_string_and_gap(self):
+        write_xlsx(self.path, [['name1', None, 'Zip']], inline_strings=True)
+        self.assertSequenceEqual(['name1', '', 'Zip'], read_xlsx_header(self.path))
+
+    def test_numeric_header(self):
+        write_xlsx(self.path, [['id', 2019]])
+        self.assertSequenceEqual(['id', '2019'], read_xlsx_header(self.path))
+
+    def test_sheet_resolved_from_relationships(self):
+        write_xlsx(self.path, [['id']], sheet_path='xl/worksheets/data.xml')
+        self.assertSequenceEqual(['id'], read_xlsx_header(self.path))
+
+    def test_invalid_file(self):
+        with open(self.path, 'w') as invalid_file:
+            invalid_file.write('not a zip file')
+        with self.assertRaises(SpreadsheetError):
+            read_xlsx_header(self.path)
+
+    def test_unsupported_extension(self):
+        with self.assertRaises(SpreadsheetError):
+            read_header(os.path.join(self.directory.name, 'list.txt'))
+
+
+class TestReadXlsxRows(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.path = os.path.join(self.directory.name, 'list.xlsx')
+
+    def read_all(self):
+        headers, rows = read_xlsx_rows(self.path)
+        return headers, list(rows)
+
+    def test_shared_strings_and_numbers(self):
+        write_xlsx(self.path, [['name1', 'City', 'Zip'], ['John', 'Madison', 53706], ['Jane', 'Verona', 1.5]])
+        self.assertEqual(
+            (['name1', 'City', 'Zip'], [('John', 'Madison', '53706'), ('Jane', 'Verona', '1.5')]),
+            self.read_all())
+
+    def test_inline_strings(self):
+        write_xlsx(self.path, [['name1'], ['John']], inline_strings=True)
+        self.assertEqual((['name1'], [('John',)]), self.read_all())
+
+    def test_gaps_and_short_rows_padded(self):
+        write_xlsx(self.path, [['name1', 'City', 'Zip'], [None, 'Madison'], ['John', None, 53706]])
+        self.assertEqual(
+            [('', 'Madison', ''), ('John', '', '53706')], self.read_all()[1])
+
+    def test_empty_rows_skipped(self):
+        write_xlsx(self.path, [['name1'], [], ['John']])
+        self.assertEqual([('John',)], self.read_all()[1])
+
+    def test_rows_split_across_batches(self):
+        rows = [['index', 'name1']] + [[index, f'Name {index}'] for index in range(200)]
+        write_xlsx(self.path, rows)
+        with mock.patch.object(spreadsheet, 'BATCH_SIZE', 64):
+            headers, rows_read = self.read_all()
+        self.assertEqual(['index', 'name1'], headers)
+        self.assertEqual([(str(index), f'Name {index}') for index in range(200)], rows_read)
+
+    def write_sheet(self, sheet_xml):
+        with zipfile.ZipFile(self.path, 'w') as archive:
+            archive.writestr('xl/worksheets/sheet1.xml', sheet_xml)
+
+    def test_empty_sheet(self):
+        self.write_sheet(f'<worksheet xmlns="{MAIN_NAMESPACE}"><sheetData/></worksheet>')
+        self.assertEqual(([], []), self.read_all())
+
+    def test_prefixed_namespace(self):
+        self.write_sheet(
+            f'<x:worksheet xmlns:x="{MAIN_NAMESPACE}"><x:sheetData>'
+            '<x:row r="1"><x:c r="A1" t="inlineStr"><x:is><x:t>id</x:t></x:is></x:c></x:row>'
+            '<x:row r="2"><x:c r="A2"><x:v>7</x:v></x:c></x:row>'
+            '</x:sheetData></x:worksheet>')
+        self.assertEqual((['id'], [('7',)]), self.read_all())
+
+    def test_truncated_sheet(self):
+        self.write_sheet(f'<worksheet xmlns="{MAIN_NAMESPACE}"><sheetData><row r="1">')
+        with self.assertRaises(SpreadsheetError):
+            self.read_all()
+
+    def test_invalid_file(self):
+        with open(self.path, 'w') as invalid_file:
+            invalid_file.write('not a zip file')
+        with self.assertRaises(SpreadsheetError):
+            read_rows(self.path)
+
+
+class FakeXlsSheet:
+
+    def __init__(self, rows):
+        self.rows = rows  # Lists of (xlrd cell type, value)
+        self.nrows = len(rows)
+
+    def row_types(self, row_index):
+        return [cell_type for cell_type, _ in self.rows[row_index]]
+
+    def row_values(self, row_index):
+        return [value for _, value in self.rows[row_index]]
+
+
+@unittest.skipIf(spreadsheet.xlrd is None, 'xlrd is not installed')
+class TestReadXls(unittest.TestCase):
+
+    def setUp(self):
+        xlrd = spreadsheet.xlrd
+        self.sheet = FakeXlsSheet([
+            [(xlrd.XL_CELL_TEXT, 'Zip'), (xlrd.XL_CELL_NUMBER, 2019.0), (xlrd.XL_CELL_TEXT, 'Date')],
+            [(xlrd.XL_CELL_NUMBER, 53706.0), (xlrd.XL_CELL_NUMBER, 1.5), (xlrd.XL_CELL_DATE, 43466.0)],
+            [(xlrd.XL_CELL_EMPTY, ''), (xlrd.XL_CELL_BOOLEAN, 1), (xlrd.XL_CELL_DATE, 43466.75)],
+            [(xlrd.XL_CELL_ERROR, 0x2A), (xlrd.XL_CELL_BLANK, ''), (xlrd.XL_CELL_TEXT, '07')],
+        ])
+        workbook = mock.Mock(datemode=0)
+        workbook.sheet_by_index.return_value = self.sheet
+        patcher = mock.patch.object(xlrd, 'open_workbook', return_value=workbook)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.workbook = workbook
+
+    def test_cells_as_text(self):
+        headers, rows = read_xls_rows('list.xls')
+        self.assertEqual(['Zip', '2019', 'Date'], headers)
+        self.assertEqual([
+            ('53706', '1.5', '2019-01-01'),
+            ('', '1', '2019-01-01 18:00:00'),
+            ('#N/A', '', '07'),
+        ], list(rows))
+        self.workbook.release_resources.assert_called_once_with()
+
+    def test_header(self):
+        self.assertEqual(['Zip', '2019', 'Date'], read_xls_header('list.xls'))
@@ -0,0 +1,109 @@
+import os
+import csv
+import tempfile
+import unittest
+from unittest import mock
+
+from mailprep import text_input
+from mailprep.spreadsheet import SpreadsheetError
+from mailprep.text_input import (
+    detect_encoding, detect_fixed_width_columns, detect_format, read_text_batches,
+    read_text_header, read_text_rows)
+
+
+class TestDetectEncoding(unittest.TestCase):
+
+    def test_byte_order_marks(self):
+        self.assertEqual('utf-8-sig', detect_encoding('﻿name'.encode('utf-8')))
+        self.assertEqual('utf-16', detect_encoding('name'.encode('utf-16')))
+
+    def test_utf8_cut_off_within_character(self):
+        self.assertEqual('utf-8', detect_encoding('Café'.encode('utf-8')[:-1]))
+
+    def test_windows_1252(self):
+        self.assertEqual('cp1252', detect_encoding('Café “quoted”'.encode('cp1252')))
+
+    def test_undefined_in_windows_1252(self):
+        self.assertEqual('latin-1', detect_encoding(b'caf\xe9 \x81'))
+
+
+class TestDetectFixedWidthColumns(unittest.TestCase):
+
+    def test_columns_between_blank_positions(self):
+        lines = ['name1    City     Zip', 'John Doe Madison  53706', 'Ann      Verona   53593']
+        self.assertEqual([(0, 9), (9, 18), (18, None)], detect_fixed_width_columns(lines))
+
+    def test_single_column(self):
+        self.assertEqual([], detect_fixed_width_columns(['name1', 'John']))
+
+
+class TestReadText(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def write(self, file_name, text, encoding='utf-8'):
+        path = os.path.join(self.directory.name, file_name)
+        with open(path, 'w', encoding=encoding, newline='') as text_file:
+            text_file.write(text)
+        return path
+
+    def read_all(self, path, **kwargs):
+        headers, batches = read_text_batches(path, **kwargs)
+        return headers, list(batches)
+
+    def test_csv_with_bom_and_quoted_newline(self):
+        path = self.write('list.csv', '﻿name1,Address1\r\nJohn,"1 Main St\r\nApt 2"\r\n')
+        self.assertEqual(
+            (['name1', 'Address1'], [[('John', '1 Main St\r\nApt 2')]]), self.read_all(path))
+
+    def test_sniffed_delimiter(self):
+        path = self.write('list.txt', 'name1;City\nJohn;Madison\nAnn;Verona\n')
+        self.assertEqual(';', detect_format(path).dialect.delimiter)
+        self.assertEqual(['name1', 'City'], read_text_header(path))
+
+    def test_tab_separated_by_extension(self):
+        path = self.write('list.tsv', 'name1\tCity\nJohn, Jr\tMadison\n')
+        self.assertEqual([('John, Jr', 'Madison')], list(read_text_rows(path)[1]))
+
+    def test_csv_without_delimiter(self):
+        path = self.write('list.csv', 'name1\nJohn\n')
+        self.assertEqual((['name1'], [[('John',)]]), self.read_all(path))
+
+    def test_fixed_width(self):
+        path = self.write('list.prn', (
+            'name1    City     Zip\n'
+            'John Doe Madison  53706\n'
+            '\n'
+            'Ann      Verona\n'))
+        self.assertEqual(
+            (['name1', 'City', 'Zip'], [[('John Doe', 'Madison', '53706'), ('Ann', 'Verona', '')]]),
+            self.read_all(path))
+
+    def test_windows_1252(self):
+        path = self.write('list.csv', 'name1,City\nJosé,Madison\n', encoding='cp1252')
+        self.assertEqual([('José', 'Madison')], list(read_text_rows(path)[1]))
+
+    def test_batches_padded_and_blank_lines_skipped(self):
+        path = self.write('list.csv', 'a,b,c\n1,2,3\n\n4\n5,6\n7,8,9\n')
+        self.assertEqual(
+            [[('1', '2', '3'), ('4', '', '')], [('5', '6', ''), ('7', '8', '9')]],
+            self.read_all(path, batch_size=2)[1])
+
+    def test_explicit_format(self):
+        path = self.write('list.dat', 'a|b\n1|2\n')
+        text_format = text_input.TextFormat('utf-8', csv.excel, None)
+        self.assertEqual(
+            (['a|b'], [[('1|2',)]]), self.read_all(path, text_format=text_format))
+
+    def test_undecodable_after_sample(self):
+        path = os.path.join(self.directory.name, 'list.csv')
+        with open(path, 'wb') as text_file:
+            text_file.write(b'name1,City\n' + b'John,Madison\n' * 10 + b'Jos\xe9,Madison\n')
+        with mock.patch.object(text_input, 'SAMPLE_SIZE', 32), self.assertRaises(SpreadsheetError):
+            list(read_text_rows(path)[1])
+
+    def test_empty_file(self):
+        path = self.write('list.csv', '')
+        self.assertEqual(([], []), self.read_all(path))
@@ -0,0 +1,53 @@
+"""Writes minimal .xlsx files for tests without a spreadsheet library"""
+import zipfile
+from xml.sax.saxutils import escape
+
+
+MAIN_NAMESPACE = 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'
+
+
+def column_letters(column_index):
+    letters = ''
+    column_index += 1
+    while column_index:
+        column_index, remainder = divmod(column_index - 1, 26)
+        letters = chr(65 + remainder) + letters
+    return letters
+
+
+def write_xlsx(path, rows, sheet_path='xl/worksheets/sheet1.xml', inline_strings=False):
+    """Strings are written as shared (or inline) strings, numbers as values and None is skipped"""
+    shared_strings = {}
+    sheet_rows = []
+    for row_number, row in enumerate(rows, start=1):
+        cells = []
+        for column_index, value in enumerate(row):
+            reference = f'{column_letters(column_index)}{row_number}'
+            if value is None:
+                continue
+            if isinstance(value, str):
+                if inline_strings:
+                    cells.append(f'<c r="{reference}" t="inlineStr"><is><t>{escape(value)}</t></is></c>')
+                else:
+                    string_index = shared_strings.setdefault(value, len(shared_strings))
+                    cells.append(f'<c r="{reference}" t="s"><v>{string_index}</v></c>')
+            else:
+                cells.append(f'<c r="{reference}"><v>{value}</v></c>')
+        sheet_rows.append(f'<row r="{row_number}">{"".join(cells)}</row>')
+
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr('xl/workbook.xml', (
+            f'<workbook xmlns="{MAIN_NAMESPACE}" xmlns:r="http://schemas.openxmlformats.org/'
+            'officeDocument/2006/relationships"><sheets>'
+            '<sheet name="Sheet1" sheetId="1" r:id="rId1"/></sheets></workbook>'))
+        archive.writestr('xl/_rels/workbook.xml.rels', (
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/'
+            f'relationships/worksheet" Target="{sheet_path[3:]}"/></Relationships>'))
+        archive.writestr(sheet_path, (
+            f'<worksheet xmlns="{MAIN_NAMESPACE}"><sheetData>{"".join(sheet_rows)}'
+            '</sheetData></worksheet>'))
+        archive.writestr('xl/sharedStrings.xml', (
+            f'<sst xmlns="{MAIN_NAMESPACE}">'
+            + ''.join(f'<si><t>{escape(value)}</t></si>' for value in shared_strings)
+            + '</sst>'))
@@ -0,0 +1,86 @@
+import os
+import tempfile
+import threading
+import unittest
+
+from PySide2.QtCore import QObject, Signal
+from mailprepgui.controller.job_autosaver import JobAutosaver
+from mailprepgui.controller.task_scheduler import TaskScheduler
+from mailprepgui.model.settings.job_settings import write_text_atomic
+
+
+def block(context, release):
+    release.wait(5)
+
+
+class FakeSettings:
+
+    def __init__(self):
+        self.text = 'first'
+
+    def serialize(self):
+        return self.text
+
+    def save_to_path(self, path):
+        write_text_atomic(path, self.serialize())
+
+
+class FakeJob(QObject):
+
+    settings_changed = Signal()
+
+    def __init__(self, file_path):
+        super().__init__()
+        self.file_path = file_path
+        self.settings = FakeSettings()
+        self.saved_values = []
+
+    def property_values(self):
+        return {'Customer': self.settings.text}
+
+    def mark_saved(self, property_values=None):
+        self.saved_values.append(self.property_values() if property_values is None else property_values)
+
+
+class TestJobAutosaver(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.job = FakeJob(os.path.join(directory.name, 'job.mpjob'))
+        self.scheduler = TaskScheduler(max_workers=1)
+        self.addCleanup(self.scheduler.shutdown)
+        self.autosaver = JobAutosaver(self.job, self.scheduler)
+
+    def read_job_file(self):
+        with open(self.job.file_path, encoding='utf-8') as job_file:
+            return job_file.read()
+
+    def test_flush_without_changes(self):
+        self.assertFalse(self.autosaver.flush())
+        self.assertFalse(os.path.exists(self.job.file_path))
+
+    def test_flush_waits_for_background_save(self):
+        # Keep the background save queued behind another task until flush waits for it
+        release = threading.Event()
+        self.scheduler.submit(block, release)
+        self.autosaver.save()
+        self.job.settings.text = 'second'
+        self.autosaver.schedule()
+        threading.Timer(0.1, release.set).start()
+
+        self.assertTrue(self.autosaver.flush())
+        self.assertIsNone(self.autosaver.pending_save)
+        self.assertEqual('second', self.read_job_file())
+        self.assertEqual([{'Customer': 'first'}, {'Customer': 'second'}], self.job.saved_values)
+
+    def test_flush_after_cancelled_background_save(self):
+        release = threading.Event()
+        self.scheduler.submit(block, release)
+        self.autosaver.save()
+        self.autosaver.pending_save.cancel()
+        release.set()
+
+        self.assertTrue(self.autosaver.flush())
+        self.assertEqual('first', self.read_job_file())
+        self.assertEqual([{'Customer': 'first'}], self.job.saved_values)
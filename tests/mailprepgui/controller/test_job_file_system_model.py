@@ -0,0 +1,214 @@
+import os
+import time
+import tempfile
+import unittest
+
+from PySide2.QtCore import Qt
+from PySide2.QtWidgets import QApplication
+from mailprepgui.controller.job_file_system_model import (
+    NOT_A_FILE_ROW, FileInfo, JobFileSystemModel, file_key)
+from mailprepgui.controller.task_scheduler import TaskScheduler
+
+
+def setUpModule():
+    # Loading a root path starts the model's file system watcher, which needs an application
+    global app  # pylint: disable = global-variable-undefined, invalid-name
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    app = QApplication.instance() or QApplication([])
+
+
+class TestFileKey(unittest.TestCase):
+
+    def test_same_name_in_different_folders(self):
+        self.assertNotEqual(file_key(os.path.join('a', 'list.xlsx')), file_key(os.path.join('b', 'list.xlsx')))
+
+    def test_normalized(self):
+        self.assertEqual(file_key(os.path.join('a', 'list.xlsx')), file_key(os.path.join('a', '.', 'list.xlsx')))
+        self.assertTrue(os.path.isabs(file_key('list.xlsx')))
+
+
+class TestFileInfo(unittest.TestCase):
+
+    def test_defaults_set_on_first_select(self):
+        file_info = FileInfo()
+        file_info.set_selected(True, 'Mini')
+        file_info.type = 'Normal'
+        file_info.set_selected(False)
+        file_info.set_selected(True, 'Mini')
+        self.assertEqual('Normal', file_info.type)
+        self.assertEqual('UW#001', file_info.list_id)
+
+    def test_slots(self):
+        with self.assertRaises(AttributeError):
+            FileInfo().other = None
+
+
+class TestJobFileSystemModel(unittest.TestCase):
+
+    def test_hide_column_indexes(self):
+        file_system_model = JobFileSystemModel()
+        actual = file_system_model.hide_column_indexes()
+        assert [1, 2, 3] == actual
+
+    def test_edit_column_indexes(self):
+        file_system_model = JobFileSystemModel()
+        actual = file_system_model.edit_column_indexes()
+        assert [4, 5, 6] == actual
+
+    def test_columnCount(self):
+        file_system_model = JobFileSystemModel()
+        actual = file_system_model.columnCount()
+        assert 7 == actual
+
+    def test_header_scan_started_with_root(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        with open(os.path.join(directory.name, 'list.xlsx'), 'w') as broken_file:
+            broken_file.write('not a zip file')
+        scheduler = TaskScheduler(max_workers=1)
+        self.addCleanup(scheduler.shutdown)
+        file_system_model = JobFileSystemModel(task_scheduler=scheduler)
+        file_system_model.set_current_root(directory.name)
+        header_index = file_system_model.header_scan.result(5)
+        self.assertIsNotNone(header_index.get('list.xlsx').error)
+
+
+class LoadedModelTestCase(unittest.TestCase):
+    """Base for tests of a JobFileSystemModel whose root directory has finished loading"""
+
+    file_names = ['list.xlsx', 'LIST2.XLSX', 'old.xls', 'notes.txt']
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.root = directory.name
+        for file_name in self.file_names:
+            open(self.path(file_name), 'w').close()
+        os.mkdir(self.path('input'))
+        open(self.path('input', 'list.xlsx'), 'w').close()
+        self.model = JobFileSystemModel()
+        self.model.set_current_root(self.root)
+        self.wait_for_rows(self.model.root_path_index, len(self.file_names) + 1)
+
+    def path(self, *parts):
+        return os.path.join(self.root, *parts)
+
+    def wait_for_rows(self, parent, row_count):
+        deadline = time.monotonic() + 5
+        while self.model.rowCount(parent) < row_count and time.monotonic() < deadline:
+            app.processEvents()
+        self.assertEqual(row_count, self.model.rowCount(parent))
+
+    def file_index(self, *parts, column=0):
+        index = self.model.index(self.path(*parts))
+        return index.sibling(index.row(), column)
+
+
+class TestRowInfo(LoadedModelTestCase):
+
+    def test_cached_per_row(self):
+        row_info = self.model.get_row_info(self.file_index('list.xlsx'))
+        self.assertEqual(file_key(self.path('list.xlsx')), row_info.file_key)
+        for column in range(self.model.columnCount()):
+            self.assertIs(row_info, self.model.get_row_info(self.file_index('list.xlsx', column=column)))
+        self.assertEqual(1, len(self.model.row_cache))
+
+    def test_cache_cleared(self):
+        self.model.get_row_info(self.file_index('list.xlsx'))
+        self.model.directoryLoaded.emit(self.root)
+        self.assertEqual({}, self.model.row_cache)
+        self.model.get_row_info(self.file_index('list.xlsx'))
+        self.model.modelReset.emit()
+        self.assertEqual({}, self.model.row_cache)
+
+    def test_editable_extensions(self):
+        self.assertTrue(self.model.get_row_info(self.file_index('list.xlsx')).is_editable)
+        self.assertTrue(self.model.get_row_info(self.file_index('LIST2.XLSX')).is_editable)
+        self.assertTrue(self.model.get_row_info(self.file_index('old.xls')).is_editable)
+        self.assertFalse(self.model.get_row_info(self.file_index('notes.txt')).is_editable)
+        self.assertIs(NOT_A_FILE_ROW, self.model.get_row_info(self.file_index('input')))
+
+    def test_flags(self):
+        base_column_count = self.model.base_column_count
+        self.assertEqual(Qt.ItemIsEnabled | Qt.ItemIsEditable,
+                         self.model.flags(self.file_index('LIST2.XLSX', column=base_column_count)))
+        self.assertEqual(Qt.NoItemFlags, self.model.flags(self.file_index('LIST2.XLSX', column=base_column_count + 1)))
+        self.assertEqual(Qt.NoItemFlags, self.model.flags(self.file_index('notes.txt', column=base_column_count)))
+
+    def test_lookups_do_not_add_file_info(self):
+        for column in range(self.model.base_column_count, self.model.columnCount()):
+            for file_name in self.file_names:
+                index = self.file_index(file_name, column=column)
+                self.model.data(index, Qt.DisplayRole)
+                self.model.data(index, Qt.EditRole)
+                self.model.flags(index)
+        self.assertEqual({}, self.model.file_info)
+
+
+class TestFileSelection(LoadedModelTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.emitted = []
+        self.model.dataChanged.connect(
+            lambda top_left, bottom_right, roles: self.emitted.append((top_left, bottom_right)))
+
+    def is_selected(self, *parts):
+        return self.model.data(self.file_index(*parts, column=self.model.base_column_count), Qt.EditRole)
+
+    def assertChangedRange(self, emitted, parent_path, rows):
+        top_left, bottom_right = emitted
+        parent = self.model.index(parent_path)
+        self.assertEqual(parent, top_left.parent())
+        self.assertEqual(parent, bottom_right.parent())
+        self.assertEqual((min(rows), self.model.base_column_count), (top_left.row(), top_left.column()))
+        self.assertEqual((max(rows), self.model.columnCount() - 1), (bottom_right.row(), bottom_right.column()))
+
+    def test_one_emission_per_parent(self):
+        # Loading the subdirectory can sort the root again, so indexes are only taken afterwards
+        self.model.fetchMore(self.file_index('input'))
+        self.wait_for_rows(self.file_index('input'), 1)
+        indexes = [self.file_index('list.xlsx'), self.file_index('old.xls', column=2),
+                   self.file_index('notes.txt'), self.file_index('input'),
+                   self.file_index('input', 'list.xlsx')]
+
+        self.assertEqual(3, self.model.set_files_selected(indexes, True))
+        self.assertTrue(self.is_selected('list.xlsx'))
+        self.assertTrue(self.is_selected('old.xls'))
+        self.assertTrue(self.is_selected('input', 'list.xlsx'))
+        self.assertFalse(self.is_selected('LIST2.XLSX'))
+        self.assertFalse(self.is_selected('notes.txt'))
+        self.assertEqual(2, len(self.emitted))
+        emitted = {top_left.parent(): (top_left, bottom_right) for top_left, bottom_right in self.emitted}
+        root_rows = [self.file_index('list.xlsx').row(), self.file_index('old.xls').row()]
+        self.assertChangedRange(emitted[self.model.root_path_index], self.root, root_rows)
+        self.assertChangedRange(emitted[self.file_index('input')], self.path('input'), [0])
+
+    def test_unchanged_selection_not_emitted(self):
+        self.model.set_files_selected([self.file_index('list.xlsx')], True)
+        self.emitted.clear()
+        self.assertEqual(0, self.model.set_files_selected([self.file_index('list.xlsx')], True))
+        self.assertEqual(0, self.model.set_files_selected([self.file_index('old.xls')], False))
+        self.assertEqual([], self.emitted)
+        self.assertNotIn(file_key(self.path('old.xls')), self.model.file_info)
+
+    def test_set_all_files_selected(self):
+        self.assertEqual(3, self.model.set_all_files_selected())
+        for file_name in ('list.xlsx', 'LIST2.XLSX', 'old.xls'):
+            self.assertTrue(self.is_selected(file_name))
+        self.assertFalse(self.is_selected('notes.txt'))
+        self.assertEqual(1, len(self.emitted))
+        editable_rows = [self.file_index(file_name).row() for file_name in ('list.xlsx', 'LIST2.XLSX', 'old.xls')]
+        self.assertChangedRange(self.emitted[0], self.root, editable_rows)
+
+        self.assertEqual(3, self.model.set_all_files_selected(False))
+        self.assertFalse(self.is_selected('list.xlsx'))
+        self.assertEqual(2, len(self.emitted))
+
+    def test_deselect_keeps_file_info(self):
+        self.model.set_files_selected([self.file_index('list.xlsx')], True)
+        file_info = self.model.file_info[file_key(self.path('list.xlsx'))]
+        file_info.type = 'Mini'
+        self.model.set_files_selected([self.file_index('list.xlsx')], False)
+        self.model.set_files_selected([self.file_index('list.xlsx')], True)
+        self.assertEqual('Mini', self.model.data(self.file_index('list.xlsx', column=self.model.base_column_count + 1), Qt.DisplayRole))
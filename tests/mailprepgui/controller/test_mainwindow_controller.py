@@ -1,6 +1,6 @@
 import unittest
 
-from mailprepgui.controller.mainwindow_controller import MainWindowController, JobFileSystemModel
+from mailprepgui.controller.mainwindow_controller import MainWindowController
 
 
 # QSignalSpy does not appear to yet be ported to PySide2,
@@ -17,20 +17,3 @@ class SignalCheck:
 class TestMainWindowController(unittest.TestCase):
     pass
 
-
-class TestJobFileSystemModel(unittest.TestCase):
-
-    def test_hide_column_indexes(self):
-        file_system_model = JobFileSystemModel()
-        actual = file_system_model.hide_column_indexes()
-        assert [1, 2, 3] == actual
-
-    def test_edit_column_indexes(self):
-        file_system_model = JobFileSystemModel()
-        actual = file_system_model.edit_column_indexes()
-        assert [4, 5] == actual
-
-    def test_columnCount(self):
-        file_system_model = JobFileSystemModel()
-        actual = file_system_model.columnCount()
-        assert 6 == actual
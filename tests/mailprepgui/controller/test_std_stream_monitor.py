@@ -0,0 +1,69 @@
+import queue
+import threading
+import time
+import unittest
+
+from mailprepgui.controller.std_stream_monitor import (
+    drain_queue, QueueMonitorWorker, STOP_SENTINEL)
+
+
+class CountingQueue(queue.Queue):
+    """Queue counting get calls, each of which is a wake up of the monitoring thread"""
+
+    def __init__(self):
+        super().__init__()
+        self.get_calls = 0
+
+    def get(self, *args, **kwargs):
+        self.get_calls += 1
+        return super().get(*args, **kwargs)
+
+
+class TestDrainQueue(unittest.TestCase):
+
+    def test_joins_queued_values(self):
+        std_queue = queue.Queue()
+        for value in ['b', 'c\n', 'd']:
+            std_queue.put(value)
+        actual = drain_queue(std_queue, 'a', max_seconds=0.01)
+        assert actual == ('abc\nd', False)
+        assert std_queue.empty()
+
+    def test_stops_at_char_budget(self):
+        std_queue = queue.Queue()
+        for value in ['bb', 'cc', 'dd']:
+            std_queue.put(value)
+        actual = drain_queue(std_queue, 'aa', max_chars=4, max_seconds=0.01)
+        assert actual == ('aabb', False)
+        assert std_queue.qsize() == 2
+
+    def test_empty_queue_returns_first_value(self):
+        actual = drain_queue(queue.Queue(), 'a', max_seconds=0.01)
+        assert actual == ('a', False)
+
+    def test_stops_at_sentinel(self):
+        std_queue = queue.Queue()
+        for value in ['b', STOP_SENTINEL, 'c']:
+            std_queue.put(value)
+        actual = drain_queue(std_queue, 'a', max_seconds=1)
+        assert actual == ('ab', True)
+
+
+class TestQueueMonitorWorker(unittest.TestCase):
+
+    def test_idle_wakeups_and_shutdown_latency(self):
+        std_queue = CountingQueue()
+        worker = QueueMonitorWorker(std_queue)
+        thread = threading.Thread(target=worker.run)
+        thread.start()
+
+        # While idle the worker should block in a single get call instead of polling
+        time.sleep(1.2)
+        assert std_queue.get_calls == 1
+
+        start = time.monotonic()
+        worker.stop()
+        thread.join(1)
+        shutdown_seconds = time.monotonic() - start
+        assert not thread.is_alive()
+        assert shutdown_seconds < 0.1
@@ -0,0 +1,104 @@
+import os
+import time
+import threading
+import unittest
+
+from PySide2.QtCore import QObject, Slot
+from PySide2.QtWidgets import QApplication
+from mailprepgui.controller.task_scheduler import TaskCancelled, TaskScheduler
+
+
+def add(context, a, b):
+    return a + b
+
+
+def fail(context):
+    raise ValueError('failed')
+
+
+def wait_for_cancel(context, started):
+    started.set()
+    while True:
+        context.check_cancelled()
+        started.wait(0.01)
+
+
+def block(context, release):
+    release.wait(5)
+
+
+class Receiver(QObject):
+
+    def __init__(self):
+        super().__init__()
+        self.thread_ids = []
+
+    @Slot(object)
+    def on_finished(self, task_future):
+        self.thread_ids.append(threading.get_ident())
+
+
+class TestTaskScheduler(unittest.TestCase):
+
+    def setUp(self):
+        self.scheduler = TaskScheduler(max_workers=1)
+        self.addCleanup(self.scheduler.shutdown)
+
+    def test_result(self):
+        task = self.scheduler.submit(add, 1, b=2)
+        self.assertEqual(3, task.result(5))
+
+    def test_exception(self):
+        task = self.scheduler.submit(fail)
+        self.assertIsInstance(task.exception(5), ValueError)
+        self.assertFalse(task.cancelled())
+
+    def test_cancel_running(self):
+        started = threading.Event()
+        task = self.scheduler.submit(wait_for_cancel, started)
+        self.assertTrue(started.wait(5))
+        self.assertFalse(task.cancel())  # Already running, so only a cancellation request
+        self.assertIsInstance(task.exception(5), TaskCancelled)
+        self.assertTrue(task.cancelled())
+
+    def test_cancel_pending(self):
+        release = threading.Event()
+        blocking_task = self.scheduler.submit(block, release)
+        pending_task = self.scheduler.submit(add, 1, 2)
+        self.assertTrue(pending_task.cancel())
+        release.set()
+        blocking_task.result(5)
+        self.assertTrue(pending_task.cancelled())
+
+    def test_priority_order(self):
+        release = threading.Event()
+        order = []
+        self.scheduler.submit(block, release)
+        low = self.scheduler.submit(lambda context: order.append('low'), priority=0)
+        high = self.scheduler.submit(lambda context: order.append('high'), priority=10)
+        release.set()
+        low.result(5)
+        high.result(5)
+        self.assertSequenceEqual(['high', 'low'], order)
+
+    def test_finished_delivered_on_receiver_thread(self):
+        # Also used by models in other tests, which need a QApplication rather than a core one
+        os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+        app = QApplication.instance() or QApplication([])
+        receiver = Receiver()
+        release = threading.Event()
+        task = self.scheduler.submit(block, release)
+        task.finished.connect(receiver.on_finished)
+        release.set()
+        task.result(5)
+        deadline = time.monotonic() + 5
+        while not receiver.thread_ids and time.monotonic() < deadline:
+            app.processEvents()
+        self.assertEqual([threading.get_ident()], receiver.thread_ids)
+
+    def test_runnable_released_when_done(self):
+        task = self.scheduler.submit(add, 1, 2)
+        task.result(5)
+        self.assertTrue(self.scheduler.thread_pool.waitForDone(5000))
+        self.assertIsNone(task.runnable)
+        self.assertFalse(task.cancel())
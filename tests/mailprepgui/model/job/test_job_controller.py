@@ -0,0 +1,43 @@
+import unittest
+
+from mailprepgui.model.job.job_controller import PropertyState
+
+
+class TestPropertyState(unittest.TestCase):
+
+    def setUp(self):
+        self.emitted = []
+        self.property_state = PropertyState('saved', 'Customer')
+        self.property_state.property_state_changed.connect(
+            lambda name, changed: self.emitted.append((name, changed)))
+
+    def test_emits_only_on_flip(self):
+        self.property_state.set_value('first')
+        self.property_state.set_value('second')
+        self.property_state.set_value('saved')
+        self.assertEqual([('Customer', True), ('Customer', False)], self.emitted)
+
+    def test_none_equals_empty_string(self):
+        property_state = PropertyState(None)
+        property_state.set_value('')
+        self.assertFalse(property_state.is_changed())
+
+    def test_save_clears_changed(self):
+        self.property_state.set_value('new')
+        self.property_state.save()
+        self.assertFalse(self.property_state.is_changed())
+        self.assertEqual([('Customer', True), ('Customer', False)], self.emitted)
+
+    def test_value_changed_emitted_on_every_change(self):
+        values = []
+        self.property_state.value_changed.connect(lambda name, value: values.append(value))
+        self.property_state.set_value('first')
+        self.property_state.set_value('first')
+        self.property_state.set_value('second')
+        self.assertEqual(['first', 'second'], values)
+
+    def test_save_as_snapshot(self):
+        self.property_state.set_value('first')
+        self.property_state.set_value('second')
+        self.property_state.save_as('first')
+        self.assertTrue(self.property_state.is_changed())
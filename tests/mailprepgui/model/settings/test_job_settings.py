@@ -1,7 +1,11 @@
 import unittest
 import io
+import os
+import json
+import tempfile
+import unittest.mock
 
-from mailprepgui.model.settings.job_settings import JobSettings
+from mailprepgui.model.settings.job_settings import JobSettings, JobSettingsError, job_cache_path
 
 
 class TestJobSettings(unittest.TestCase):
@@ -17,3 +21,89 @@ class TestJobSettings(unittest.TestCase):
         job_settings.merge({"properties":{"name2": "value2"}})
         assert job_settings.get('properties').get('name') == 'value'
         assert job_settings.get('properties').get('name2') == 'value2'
+
+    def test_job_settings_from_invalid_file(self):
+        with self.assertRaises(JobSettingsError):
+            JobSettings.from_file(io.StringIO('{"properties":'))
+        with self.assertRaises(JobSettingsError):
+            JobSettings.from_file(io.StringIO('[]'))
+
+    def test_job_settings_save_round_trip(self):
+        job_settings = JobSettings().initialize({"Properties": {"Name": "value"}, "files": {"a.xlsx": {"id": "{ID1}"}}})
+        job_settings.set_property('Other', True)
+        target_file = io.StringIO()
+        job_settings.save(target_file)
+        self.assertEqual(
+            {"properties": {"name": "value", "other": True}, "files": {"a.xlsx": {"id": "{ID1}"}}},
+            json.loads(target_file.getvalue()))
+
+    def test_job_settings_serialize_only_dirty_sections(self):
+        job_settings = JobSettings().initialize({"properties": {"name": "value"}, "files": {"a": 1}})
+        job_settings.serialize()
+        files_fragment = job_settings.fragments['files']
+        job_settings.set_property('name', 'changed')
+        self.assertEqual({'properties'}, job_settings.dirty_sections)
+        self.assertIn('"changed"', job_settings.serialize())
+        self.assertIs(files_fragment, job_settings.fragments['files'])
+        self.assertFalse(job_settings.dirty_sections)
+
+    def test_job_settings_save_to_path(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'job.mpjob')
+            JobSettings().initialize({"properties": {"name": "value"}}).save_to_path(path)
+            with open(path, 'r') as job_file:
+                self.assertEqual('value', JobSettings.from_file(job_file).get_property('name', None))
+            self.assertEqual(['job.mpjob'], os.listdir(directory))
+
+
+class TestJobSettingsCache(unittest.TestCase):
+
+    contents = {"Properties": {"Customer": "Acme"}, "Files": {"List.xlsx": {"ID": "{ID1}", "history": [1, 2]}}}
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.job_file_path = os.path.join(self.directory.name, 'job.mpjob')
+        self.write_job(self.contents)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write_job(self, contents):
+        with open(self.job_file_path, 'w') as job_file:
+            json.dump(contents, job_file)
+
+    def test_cache_written_and_used(self):
+        cold = JobSettings.from_path(self.job_file_path)
+        self.assertTrue(os.path.isfile(job_cache_path(self.job_file_path)))
+        with unittest.mock.patch.object(JobSettings, 'from_json') as from_json:
+            warm = JobSettings.from_path(self.job_file_path)
+            from_json.assert_not_called()
+        self.assertEqual(cold.serialize(), warm.serialize())
+        self.assertEqual('Acme', warm.get_property('CUSTOMER', None))
+        self.assertEqual('{ID1}', warm.get('files').get('list.xlsx').get('id'))
+
+    def test_changed_job_file_reparsed(self):
+        JobSettings.from_path(self.job_file_path)
+        self.write_job({"Properties": {"Customer": "Other company"}})
+        os.utime(self.job_file_path, ns=(0, 0))
+        self.assertEqual('Other company', JobSettings.from_path(self.job_file_path).get_property('customer', None))
+
+    def test_same_size_edit_with_unchanged_mtime_reparsed(self):
+        JobSettings.from_path(self.job_file_path)
+        stat_result = os.stat(self.job_file_path)
+        self.write_job({"Properties": {"Customer": "Acmf"}, "Files": self.contents["Files"]})
+        os.utime(self.job_file_path, ns=(stat_result.st_atime_ns, stat_result.st_mtime_ns))
+        self.assertEqual(stat_result.st_size, os.stat(self.job_file_path).st_size)
+        self.assertEqual('Acmf', JobSettings.from_path(self.job_file_path).get_property('customer', None))
+
+    def test_touched_job_file_uses_cache(self):
+        JobSettings.from_path(self.job_file_path)
+        os.utime(self.job_file_path, ns=(0, 0))
+        with unittest.mock.patch.object(JobSettings, 'from_json') as from_json:
+            self.assertEqual('Acme', JobSettings.from_path(self.job_file_path).get_property('customer', None))
+            from_json.assert_not_called()
+
+    def test_corrupt_cache_ignored(self):
+        with open(job_cache_path(self.job_file_path), 'wb') as cache_file:
+            cache_file.write(b'not a cache')
+        self.assertEqual('Acme', JobSettings.from_path(self.job_file_path).get_property('customer', None))
@@ -0,0 +1,36 @@
+import unittest
+
+from PySide2.QtCore import Qt
+from mailprepgui.model.property_model import PropertyModel
+from mailprepgui.model.qt_edit_types import QtEditTypes
+from mailprepgui.model.qt_user_roles import QtUserRole
+
+
+class TestPropertyModel(unittest.TestCase):
+
+    properties = [
+        ('Customer Information', 'Customer', QtEditTypes.Str, 'Acme'),
+        ('Merge Settings', 'Use Custom Campus', QtEditTypes.Bool, False),
+        ('Customer Information', 'Department', QtEditTypes.Str, None),
+    ]
+
+    def test_load_groups_properties(self):
+        model = PropertyModel()
+        model.load(self.properties)
+        self.assertEqual(2, model.rowCount())
+        self.assertEqual(['Customer Information', 'Merge Settings'], list(model.groups))
+        self.assertEqual(2, model.groups['Customer Information'].rowCount())
+
+    def test_load_values_and_edit_types(self):
+        model = PropertyModel()
+        model.load(self.properties)
+        value_item = model.groups['Merge Settings'].child(0, 1)
+        self.assertIs(False, value_item.data(Qt.DisplayRole))
+        self.assertEqual(QtEditTypes.Bool, value_item.data(QtUserRole.EditTypeRole))
+
+    def test_load_replaces_properties(self):
+        model = PropertyModel()
+        model.load(self.properties)
+        model.load(self.properties[:1])
+        self.assertEqual(1, model.rowCount())
+        self.assertEqual(['Customer Information'], list(model.groups))
@@ -12,3 +12,33 @@ class TestModuleImport(unittest.TestCase):
         """Simply tries to import utils module then assert True. If import fails then exception will be thrown and test will fail."""
         import utils
         self.assertTrue(True)
+
+    def test_import_mailprepgui_models_without_qt(self):
+        """Models such as job settings are importable without loading PySide2 through the package"""
+        import sys
+        import mailprepgui.model.settings.job_settings
+        self.assertNotIn('mailprepgui.view.mainwindow', sys.modules)
+
+    def test_import_main_window_controller_defers_job_models(self):
+        """Job file models and their spreadsheet readers are only imported once the window shows"""
+        import os
+        import sys
+        import subprocess
+        import importlib.util
+        if importlib.util.find_spec('PySide2') is None:
+            self.skipTest('PySide2 is not installed')
+        # A fresh interpreter, as other tests may already have imported the deferred modules
+        code = (
+            'import sys, mailprepgui.controller.mainwindow_controller;'
+            'print(*sorted(sys.modules))')
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+        modules = subprocess.run(
+            [sys.executable, '-c', code], env=env, stdout=subprocess.PIPE, check=True,
+            universal_newlines=True).stdout.split()
+        self.assertIn('mailprepgui.controller.std_stream_monitor', modules)
+        for module in (
+                'mailprepgui.controller.job_file_system_model',
+                'mailprepgui.controller.job_autosaver',
+                'mailprepgui.controller.task_scheduler',
+                'mailprep.header_index'):
+            self.assertNotIn(module, modules)
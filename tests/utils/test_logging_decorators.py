@@ -0,0 +1,65 @@
+import logging
+import unittest
+
+from utils.logging_decorators import call_stats, format_call_stats, log_call, reset_call_stats
+
+
+log = logging.getLogger(__name__)
+
+
+class ReprCounter:
+
+    def __init__(self):
+        self.repr_calls = 0
+
+    def __repr__(self):
+        self.repr_calls += 1
+        return 'ReprCounter()'
+
+
+@log_call(log)
+def untimed_function(value):
+    return value
+
+
+@log_call(log, timed=True)
+def timed_function(value):
+    return value
+
+
+class TestLogCall(unittest.TestCase):
+
+    def setUp(self):
+        reset_call_stats()
+        self.addCleanup(log.setLevel, log.level)
+
+    def test_return_value(self):
+        self.assertEqual(1, untimed_function(1))
+
+    def test_no_repr_when_debug_disabled(self):
+        log.setLevel(logging.INFO)
+        argument = ReprCounter()
+        untimed_function(argument)
+        self.assertEqual(0, argument.repr_calls)
+
+    def test_logs_truncated_arguments(self):
+        log.setLevel(logging.DEBUG)
+        with self.assertLogs(log, logging.DEBUG) as logs:
+            untimed_function('x' * 1000)
+        self.assertEqual(1, len(logs.output))
+        self.assertIn('Calling untimed_function(', logs.output[0])
+        self.assertLess(len(logs.output[0]), 200)
+
+    def test_call_counts(self):
+        untimed_function(1)
+        untimed_function(2)
+        stats = call_stats[f'{__name__}.untimed_function']
+        self.assertEqual(2, stats.count)
+        self.assertEqual(0.0, stats.total_seconds)
+
+    def test_timed_latency(self):
+        timed_function(1)
+        stats = call_stats[f'{__name__}.timed_function']
+        self.assertEqual(1, stats.count)
+        self.assertGreater(stats.total_seconds, 0.0)
+        self.assertEqual(1, len([line for line in format_call_stats() if 'timed_function' in line]))
@@ -1,6 +1,9 @@
+import contextlib
+import io
 import unittest
 
-from utils.mapping import CaseInsensitiveDict, recursive_merge
+from utils import mapping
+from utils.mapping import CaseInsensitiveDict, normalize_key, recursive_merge
 
 
 class TestInsensitiveDict(unittest.TestCase):
@@ -38,6 +41,40 @@ class TestInsensitiveDict(unittest.TestCase):
         test_dict = CaseInsensitiveDict({ "a": 1 })
         assert test_dict.get("b", 2) == 2
 
+    def test_insensitive_dict_contains(self):
+        test_dict = CaseInsensitiveDict({ "Custom  Campus": 1 })
+        assert " custom campus" in test_dict
+        assert "campus" not in test_dict
+
+    def test_insensitive_dict_unicode_keys(self):
+        test_dict = CaseInsensitiveDict({ "Straße": 1, "ﬁle": 2 })
+        assert test_dict["STRASSE"] == 1
+        assert test_dict["file"] == 2
+
+    def test_insensitive_dict_non_string_keys(self):
+        test_dict = CaseInsensitiveDict({ 1: "a" })
+        assert test_dict[1] == "a"
+
+    def test_insensitive_dict_nested_set_silent(self):
+        stdout = io.StringIO()
+        with contextlib.redirect_stdout(stdout):
+            CaseInsensitiveDict({ "a": { "b": 1 } })
+        assert stdout.getvalue() == ""
+
+
+class TestNormalizeKey(unittest.TestCase):
+
+    def test_normalize_key_ascii(self):
+        assert normalize_key("  Use   Custom\tCampus ") == "use custom campus"
+
+    def test_normalize_key_matches_unicode_path(self):
+        assert normalize_key("Ｃａｍｐｕｓ") == "campus"
+
+    def test_normalize_key_cache_bounded(self):
+        for i in range(mapping.NORMALIZED_KEY_CACHE_SIZE + 10):
+            normalize_key(f"Key {i}")
+        assert len(mapping._normalized_keys) <= mapping.NORMALIZED_KEY_CACHE_SIZE
+
 
 class TestRecusiveMerge(unittest.TestCase):
 
@@ -63,3 +100,49 @@ class TestRecusiveMerge(unittest.TestCase):
         assert origin_dict["b"] == { "c": 3 }
         assert len(origin_dict) == 2  # Make sure no other keys added
 
+    def test_recursive_merge_overwrite_dict_over_value(self):
+        origin_dict = { "a": 'c' }
+        merge_dict = { "a": { "b": 2 } }
+        recursive_merge(origin_dict, merge_dict)
+        assert origin_dict["a"] == { "b": 2 }
+
+    def test_recursive_merge_deep_nesting(self):
+        origin_dict = {}
+        merge_dict = current = {}
+        for _ in range(5000):
+            current["a"] = current = {}
+        current["b"] = 1
+        recursive_merge(origin_dict, merge_dict)
+        assert origin_dict == merge_dict
+
+    def test_recursive_merge_changed_paths(self):
+        origin_dict = { "a": { "b": 2, "c": 3 }, "d": 4 }
+        merge_dict = { "a": { "b": 2, "c": 5, "e": 6 }, "d": 4, "f": {} }
+        actual = recursive_merge(origin_dict, merge_dict)
+        assert actual == { ("a", "c"), ("a", "e"), ("f",) }
+
+    def test_recursive_merge_case_insensitive_keys(self):
+        origin_dict = CaseInsensitiveDict({ "Properties": { "Name": "value" } })
+        merge_dict = { "PROPERTIES": { "name": "value", "Other  Name": "value2" } }
+        actual = recursive_merge(origin_dict, merge_dict, default=CaseInsensitiveDict)
+        assert actual == { ("properties", "other name") }
+        assert origin_dict["properties"]["other name"] == "value2"
+
+    def test_recursive_merge_default_dict_into_case_insensitive_origin(self):
+        origin_dict = CaseInsensitiveDict({ "a": 1 })
+        actual = recursive_merge(origin_dict, { "A": { "B": { "C": 1 } }, "D": { "E": 2 } })
+        assert origin_dict["a"]["b"]["c"] == 1
+        assert origin_dict["d"]["e"] == 2
+        assert actual == { ("a", "b"), ("d",) }
+
+    def test_recursive_merge_normalizes_new_subtrees(self):
+        origin_dict = CaseInsensitiveDict()
+        recursive_merge(origin_dict, { "A": { "B": { "C": 1 } } }, default=CaseInsensitiveDict)
+        assert isinstance(origin_dict["a"]["b"], CaseInsensitiveDict)
+        assert origin_dict["a"]["b"]["c"] == 1
+
+    def test_recursive_merge_shares_unchanged_subtrees(self):
+        subtree = CaseInsensitiveDict({ "b": 1 })
+        origin_dict = CaseInsensitiveDict()
+        recursive_merge(origin_dict, { "a": subtree }, default=CaseInsensitiveDict)
+        assert origin_dict["a"] is subtree
@@ -0,0 +1,61 @@
+import io
+import sys
+import json  # pylint: disable = unused-import  (already imported modules are not traced)
+import builtins
+import unittest
+
+from utils.startup_profiler import StartupProfiler
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        self.now += 0.001
+        return self.now
+
+
+class TestStartupProfiler(unittest.TestCase):
+
+    def test_phases_recorded(self):
+        profiler = StartupProfiler(clock=FakeClock())
+        with profiler.phase('first'):
+            pass
+        self.assertEqual([('first', 0.001)], [(name, round(seconds, 6)) for name, seconds in profiler.phases])
+
+    def test_disabled_records_nothing(self):
+        profiler = StartupProfiler(enabled=False)
+        profiler.start_import_trace()
+        with profiler.phase('first'):
+            pass
+        profiler.write_report(io.StringIO())
+        self.assertEqual([], profiler.phases)
+        self.assertIsNone(profiler._original_import)
+
+    def test_first_imports_traced(self):
+        sys.modules.pop('colorsys', None)
+        original_import = builtins.__import__
+        profiler = StartupProfiler()
+        profiler.start_import_trace()
+        try:
+            import colorsys  # pylint: disable = unused-import, import-outside-toplevel
+            import json  # pylint: disable = reimported, redefined-outer-name, import-outside-toplevel
+        finally:
+            profiler.stop_import_trace()
+        self.assertEqual(['colorsys'], [name for _, name, _, _ in profiler.imports])
+        self.assertIs(original_import, builtins.__import__)
+
+    def test_report_format(self):
+        profiler = StartupProfiler(clock=FakeClock())
+        profiler.imports.append((1, 'package.module', 0.000250, 0.001))
+        with profiler.phase('show'):
+            pass
+        stream = io.StringIO()
+        profiler.write_report(stream)
+        lines = stream.getvalue().splitlines()
+        self.assertEqual('import time: self [us] | cumulative | imported package', lines[0])
+        self.assertEqual('import time:       250 |       1000 |   package.module', lines[1])
+        self.assertEqual('startup phase:       1.0 ms | show', lines[2])
+        self.assertTrue(lines[3].startswith('startup total:'))